@@ -0,0 +1,120 @@
+import uuid
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db.models import F
+from django.db.models.functions import Mod
+
+from books.cache import invalidate_catalog
+from books.models import Book, BookStats
+from borrowings.models import Borrowing
+from borrowings.stats import refresh_overdue_loans
+from users.serializers import TokenObtainPairSerializer
+
+PASSWORD = "bench-password"
+BATCH_SIZE = 10_000
+# Loans are backdated by this much, so some active ones are overdue.
+BACKDATE = timedelta(days=30)
+
+
+class Dataset:
+    """Synthetic users, books and borrowings created by ``seed()``."""
+
+    def __init__(self, tag, users, book_ids, borrowings, active) -> None:
+        self.tag = tag
+        self.users = users
+        self.book_ids = book_ids
+        # Borrowing ids by user id, and the (user id, id) of active loans.
+        self.borrowings = borrowings
+        self.borrowers = list(borrowings)
+        self.active = active
+        self.tokens = {
+            user.id: str(TokenObtainPairSerializer.get_token(user).access_token)
+            for user in users
+        }
+
+
+def seed(users, books, borrowings, rng) -> Dataset:
+    """
+    Create ``users`` users and ``books`` books with ``borrowings`` loans
+    spread over them. Loans with an even id are returned; of the rest,
+    those due in the last 30 days are overdue.
+    """
+    tag = uuid.uuid4().hex[:8]
+    # Hashed once: hashing per user would dominate seeding.
+    password = make_password(PASSWORD)
+    created_users = get_user_model().objects.bulk_create(
+        get_user_model()(email=f"bench-{tag}-{i}@example.com", password=password)
+        for i in range(users)
+    )
+
+    book_ids = []
+    for start in range(0, books, BATCH_SIZE):
+        book_ids += [
+            book.id for book in Book.objects.bulk_create(
+                Book(
+                    title=f"Bench book {tag} {i}",
+                    author=f"Bench {tag}",
+                    inventory=1_000_000,
+                    daily_fee=Decimal(rng.randint(10, 500)) / 100,
+                )
+                for i in range(start, min(start + BATCH_SIZE, books))
+            )
+        ]
+    invalidate_catalog()
+
+    by_user = defaultdict(list)
+    active = []
+    total_loans, active_loans = Counter(), Counter()
+    today = date.today()
+
+    for start in range(0, borrowings, BATCH_SIZE):
+        created = Borrowing.objects.bulk_create(
+            Borrowing(
+                user=rng.choice(created_users),
+                book_id=rng.choice(book_ids),
+                expected_return_date=today + timedelta(days=rng.randint(0, 59)),
+            )
+            for _ in range(start, min(start + BATCH_SIZE, borrowings))
+        )
+        for borrowing in created:
+            by_user[borrowing.user_id].append(borrowing.id)
+            total_loans[borrowing.book_id] += 1
+            if borrowing.id % 2:
+                active.append((borrowing.user_id, borrowing.id))
+                active_loans[borrowing.book_id] += 1
+
+    seeded = Borrowing.objects.filter(user__email__startswith=f"bench-{tag}-")
+    seeded.update(
+        borrow_date=F("borrow_date") - BACKDATE,
+        expected_return_date=F("expected_return_date") - BACKDATE,
+    )
+    seeded.alias(parity=Mod("id", 2)).filter(parity=0).update(
+        actual_return_date=F("expected_return_date")
+    )
+
+    BookStats.objects.bulk_create(
+        BookStats(
+            book_id=book_id,
+            total_loans=total_loans[book_id],
+            active_loans=active_loans[book_id],
+            last_borrow_date=today - BACKDATE,
+        )
+        for book_id in total_loans
+    )
+    refresh_overdue_loans()
+
+    return Dataset(tag, created_users, book_ids, dict(by_user), active)
+
+
+def cleanup(dataset) -> None:
+    """Delete everything ``seed()`` created and the benchmark's own loans."""
+    users = get_user_model().objects.filter(
+        email__startswith=f"bench-{dataset.tag}-"
+    )
+    Borrowing.objects.filter(user__in=users).delete()
+    users.delete()
+    Book.objects.filter(author=f"Bench {dataset.tag}").delete()
@@ -0,0 +1,70 @@
+from datetime import date, timedelta
+
+from django.urls import reverse
+
+from benchmarks.dataset import PASSWORD
+
+
+def auth(dataset, user_id) -> dict:
+    return {"Authorization": f"Bearer {dataset.tokens[user_id]}"}
+
+
+def books_list(dataset, rng) -> tuple:
+    user = rng.choice(dataset.users)
+    return "GET", reverse("books:book-list"), {}, auth(dataset, user.id)
+
+
+def book_detail(dataset, rng) -> tuple:
+    user = rng.choice(dataset.users)
+    path = reverse("books:book-detail", args=[rng.choice(dataset.book_ids)])
+    return "GET", path, {}, auth(dataset, user.id)
+
+
+def borrowings_list(dataset, rng) -> tuple:
+    user = rng.choice(dataset.users)
+    path = reverse("borrowings:borrowing-list-create")
+    return "GET", path, {}, auth(dataset, user.id)
+
+
+def borrowing_detail(dataset, rng) -> tuple:
+    user_id = rng.choice(dataset.borrowers)
+    path = reverse(
+        "borrowings:borrowing-detail",
+        args=[rng.choice(dataset.borrowings[user_id])],
+    )
+    return "GET", path, {}, auth(dataset, user_id)
+
+
+def borrow(dataset, rng) -> tuple:
+    user = rng.choice(dataset.users)
+    data = {
+        "book": rng.choice(dataset.book_ids),
+        "expected_return_date": (date.today() + timedelta(days=14)).isoformat(),
+    }
+    path = reverse("borrowings:borrowing-list-create")
+    return "POST", path, data, auth(dataset, user.id)
+
+
+def return_borrowing(dataset, rng) -> tuple:
+    # Each active loan can be returned once, so they are used up.
+    user_id, borrowing_id = dataset.active.pop(rng.randrange(len(dataset.active)))
+    path = reverse("borrowings:borrowing-return", args=[borrowing_id])
+    return "PATCH", path, {}, auth(dataset, user_id)
+
+
+def token(dataset, rng) -> tuple:
+    user = rng.choice(dataset.users)
+    data = {"email": user.email, "password": PASSWORD}
+    return "POST", reverse("users:token_obtain_pair"), data, {}
+
+
+# Run in this order; each builds the (method, path, data, headers) of a call.
+ENDPOINTS = {
+    "books-list": books_list,
+    "book-detail": book_detail,
+    "borrowings-list": borrowings_list,
+    "borrowing-detail": borrowing_detail,
+    "borrow": borrow,
+    "return": return_borrowing,
+    "token": token,
+}
@@ -0,0 +1,144 @@
+import json
+import random
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from benchmarks.dataset import cleanup, seed
+from benchmarks.endpoints import ENDPOINTS
+from benchmarks.runner import run
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic users, books and borrowings, drive the API endpoints "
+        "with concurrent clients and print latency percentiles, throughput "
+        "and query counts per endpoint as JSON. Run it against a development "
+        "database: borrowing creates real outbox notifications."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=100,
+            help="Synthetic users (default: 100).",
+        )
+        parser.add_argument(
+            "--books",
+            type=int,
+            default=1000,
+            help="Synthetic books (default: 1000).",
+        )
+        parser.add_argument(
+            "--borrowings",
+            type=int,
+            default=10_000,
+            help="Synthetic borrowings, half of them active (default: 10000).",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Requests per endpoint (default: 200).",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=10,
+            help="Clients sending requests at once (default: 10).",
+        )
+        parser.add_argument(
+            "--endpoints",
+            nargs="+",
+            choices=ENDPOINTS,
+            default=list(ENDPOINTS),
+            help="Endpoints to benchmark (default: all).",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Random seed for the data and the requests.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the JSON report to this file instead of stdout.",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the synthetic data instead of deleting it afterwards.",
+        )
+
+    def handle(self, *args, **options):
+        requests = options["requests"]
+        if requests < 2 or options["concurrency"] < 1:
+            raise CommandError(
+                "--requests must be at least 2 and --concurrency positive."
+            )
+        if options["users"] < 1 or options["books"] < 1:
+            raise CommandError("--users and --books must be positive.")
+        if options["borrowings"] < 2 * requests:
+            # Half are active, and every return needs its own.
+            raise CommandError("--borrowings must be at least twice --requests.")
+
+        rng = random.Random(options["seed"])
+        dataset = seed(
+            options["users"], options["books"], options["borrowings"], rng
+        )
+        self.stderr.write(
+            f"Seeded {options['users']} users, {options['books']} books and "
+            f"{options['borrowings']} borrowings."
+        )
+
+        try:
+            results = {}
+            for name in options["endpoints"]:
+                calls = [ENDPOINTS[name](dataset, rng) for _ in range(requests)]
+                results[name] = run(calls, options["concurrency"])
+                self.stderr.write(
+                    f"{name}: p95 {results[name]['latency_ms']['p95']}ms"
+                )
+        finally:
+            if not options["keep"]:
+                cleanup(dataset)
+
+        report = json.dumps(
+            {
+                "commit": self.commit(),
+                "database": connection.vendor,
+                "debug": settings.DEBUG,
+                "scale": {
+                    "users": options["users"],
+                    "books": options["books"],
+                    "borrowings": options["borrowings"],
+                },
+                "requests": requests,
+                "concurrency": options["concurrency"],
+                "endpoints": results,
+            },
+            indent=2,
+        )
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(report + "\n")
+        else:
+            self.stdout.write(report)
+
+    @staticmethod
+    def commit() -> str | None:
+        """The checked-out commit, so reports can be told apart."""
+        try:
+            result = subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return result.stdout.strip()
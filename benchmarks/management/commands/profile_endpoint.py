@@ -0,0 +1,212 @@
+import cProfile
+import io
+import json
+import pstats
+import random
+import threading
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from benchmarks.dataset import cleanup, seed
+from benchmarks.runner import send, server_name
+from users.serializers import TokenObtainPairSerializer
+
+# Self time is summed by where the code lives, to split a request's cost.
+LAYERS = (
+    ("auth", ("users/authentication.py", "rest_framework_simplejwt/", "/jwt/")),
+    (
+        "serialization",
+        (
+            "rest_framework/serializers.py",
+            "rest_framework/fields.py",
+            "rest_framework/relations.py",
+            "rest_framework/renderers.py",
+            "/json/",
+        ),
+    ),
+    ("orm", ("django/db/",)),
+    ("database driver", ("psycopg",)),
+)
+
+
+def layer_of(filename: str) -> str:
+    if filename == "~":
+        # Built-ins: C calls, socket I/O and the threads waiting on each other.
+        return "builtins and waits"
+    for layer, paths in LAYERS:
+        if any(path in filename for path in paths):
+            return layer
+    return "other"
+
+
+def layer_times(stats: pstats.Stats) -> Counter:
+    times = Counter()
+    for (filename, _, _), (_, _, self_time, _, _) in stats.stats.items():
+        times[layer_of(filename)] += self_time
+    return times
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic users, books and borrowings, replay a request to a "
+        "URL under cProfile as one of the seeded borrowers and print the "
+        "time spent in auth, serialization, the ORM and the database driver, "
+        "then the top functions. Run it against a development database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="URL path, e.g. /api/borrowings/.")
+        parser.add_argument(
+            "--method",
+            default="GET",
+            help="HTTP method (default: GET).",
+        )
+        parser.add_argument(
+            "--data",
+            default="{}",
+            help="JSON query parameters or request body.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=50,
+            help="Profiled requests, after one warm-up request (default: 50).",
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=100,
+            help="Synthetic users (default: 100).",
+        )
+        parser.add_argument(
+            "--books",
+            type=int,
+            default=1000,
+            help="Synthetic books (default: 1000).",
+        )
+        parser.add_argument(
+            "--borrowings",
+            type=int,
+            default=10_000,
+            help="Synthetic borrowings, half of them active (default: 10000).",
+        )
+        parser.add_argument(
+            "--staff",
+            action="store_true",
+            help="Send the requests as a staff user.",
+        )
+        parser.add_argument(
+            "--sort",
+            default="cumulative",
+            choices=[key.value for key in pstats.SortKey],
+            help="Order of the function table (default: cumulative).",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=30,
+            help="Functions to list (default: 30).",
+        )
+        parser.add_argument(
+            "--output",
+            help="Also save the raw profile here, for snakeviz or pstats.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Random seed for the data.",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the synthetic data instead of deleting it afterwards.",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests must be positive.")
+        if min(options["users"], options["books"], options["borrowings"]) < 1:
+            raise CommandError("--users, --books and --borrowings must be positive.")
+        try:
+            data = json.loads(options["data"])
+        except ValueError as exc:
+            raise CommandError(f"--data is not valid JSON: {exc}")
+
+        dataset = seed(
+            options["users"],
+            options["books"],
+            options["borrowings"],
+            random.Random(options["seed"]),
+        )
+        self.stderr.write(
+            f"Seeded {options['users']} users, {options['books']} books and "
+            f"{options['borrowings']} borrowings."
+        )
+
+        try:
+            profiles = self.profile(dataset, options, data)
+        finally:
+            if not options["keep"]:
+                cleanup(dataset)
+
+        table = io.StringIO()
+        stats = pstats.Stats(*profiles, stream=table)
+        times = layer_times(stats)
+        total = sum(times.values()) or 1
+        self.stdout.write(
+            f"{options['requests']} requests, {total:.3f}s profiled over all threads"
+        )
+        for layer, seconds in times.most_common():
+            self.stdout.write(f"  {layer:<20} {seconds:8.3f}s {seconds / total:6.1%}")
+        stats.sort_stats(options["sort"]).print_stats(options["limit"])
+        self.stdout.write(table.getvalue())
+        if options["output"]:
+            stats.dump_stats(options["output"])
+
+    def profile(self, dataset, options, data) -> list[cProfile.Profile]:
+        """
+        Profile the requests on this thread and any thread they start: under
+        the test client, async views run on an event loop thread that
+        asgiref starts for each request.
+        """
+        # The borrower with the most loans, so list pages are full.
+        user_id = max(dataset.borrowers, key=lambda b: len(dataset.borrowings[b]))
+        user = next(user for user in dataset.users if user.id == user_id)
+        if options["staff"]:
+            user.is_staff = True
+            user.save(update_fields=["is_staff"])
+        token = TokenObtainPairSerializer.get_token(user).access_token
+        call = (
+            options["method"].upper(),
+            options["path"],
+            data,
+            {"Authorization": f"Bearer {token}"},
+        )
+
+        client = Client(SERVER_NAME=server_name(), raise_request_exception=False)
+        status_code = send(client, *call)
+        if status_code >= 400:
+            raise CommandError(
+                f"{call[0]} {call[1]} returned HTTP {status_code}; "
+                f"check the path, --method and --data."
+            )
+
+        profiles = [cProfile.Profile()]
+
+        def profile_thread(*args) -> None:
+            # Called once per new thread: enabling cProfile replaces it.
+            profiles.append(cProfile.Profile())
+            profiles[-1].enable()
+
+        threading.setprofile(profile_thread)
+        try:
+            for _ in range(options["requests"]):
+                profiles[0].enable()
+                send(client, *call)
+                profiles[0].disable()
+        finally:
+            threading.setprofile(None)
+        return profiles
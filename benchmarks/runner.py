@@ -0,0 +1,109 @@
+import json
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.test import Client
+
+from library_service_project.queries import QueryRecorder
+
+
+def run(calls, concurrency) -> dict:
+    """
+    Send ``calls`` from ``concurrency`` threads and summarize them.
+
+    Each thread is a test client going through the full middleware stack
+    in process, so each call's queries can be counted. Async views run
+    through ``async_to_sync`` here; compare results with each other, and
+    use the ``loadtest`` command for a running ASGI server.
+    """
+    pending = iter(calls)
+    lock = threading.Lock()
+    samples = []
+
+    def worker() -> None:
+        client = Client(SERVER_NAME=server_name(), raise_request_exception=False)
+        try:
+            with QueryRecorder() as recorder:
+                while True:
+                    with lock:
+                        call = next(pending, None)
+                    if call is None:
+                        return
+                    recorder.queries.clear()
+                    started = time.perf_counter()
+                    status_code = send(client, *call)
+                    elapsed = time.perf_counter() - started
+                    samples.append((elapsed, len(recorder.queries), status_code))
+                    # What the request_finished signal does after a response.
+                    close_old_connections()
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(samples, time.perf_counter() - started)
+
+
+def server_name() -> str:
+    """A host the requests pass ``ALLOWED_HOSTS`` validation with."""
+    hosts = [host for host in settings.ALLOWED_HOSTS if host != "*"]
+    # Without DEBUG, an empty ALLOWED_HOSTS rejects every host anyway.
+    return hosts[0].lstrip(".") if hosts else "localhost"
+
+
+def send(client, method, path, data, headers) -> int:
+    if method == "GET":
+        response = client.get(path, data, headers=headers)
+    else:
+        response = client.generic(
+            method, path, json.dumps(data), "application/json", headers=headers
+        )
+    return response.status_code
+
+
+def summarize(samples, elapsed) -> dict:
+    """
+    Summarize the ``(seconds, queries, status_code)`` samples of a run that
+    took ``elapsed`` seconds. ``queries`` is None where they weren't counted.
+    """
+    latencies = [latency * 1000 for latency, _, _ in samples]
+    queries = [count for _, count, _ in samples if count is not None]
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    summary = {
+        "requests": len(samples),
+        "errors": sum(status_code >= 400 for _, _, status_code in samples),
+        "throughput": round(len(samples) / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 2),
+            "p50": round(percentiles[49], 2),
+            "p95": round(percentiles[94], 2),
+            "p99": round(percentiles[98], 2),
+            "max": round(max(latencies), 2),
+        },
+    }
+    if queries:
+        summary["queries"] = {
+            "mean": round(statistics.fmean(queries), 2),
+            "max": max(queries),
+        }
+    return summary
+
+
+def describe(name: str, summary: dict) -> str:
+    """``summarize()``'s result as the one line the bench commands print."""
+    latency = summary["latency_ms"]
+    line = (
+        f"{name}: {summary['requests']} requests, {summary['throughput']} req/s, "
+        f"mean {latency['mean']}ms, p50 {latency['p50']}ms, "
+        f"p95 {latency['p95']}ms, p99 {latency['p99']}ms"
+    )
+    if summary["errors"]:
+        line += f", {summary['errors']} errors"
+    return line
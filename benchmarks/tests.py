@@ -0,0 +1,127 @@
+import io
+import json
+import pstats
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from books.models import Book
+from benchmarks.endpoints import ENDPOINTS
+from benchmarks.runner import describe, summarize
+from borrowings.models import Borrowing
+from library_service_project.db_routers import REPLICA_DB_ALIAS, replica_configured
+
+
+# Transactional: the benchmark's clients run on their own threads and
+# connections, so they must see committed data.
+@patch("borrowings.serializers.send_pending_notifications.delay")
+class BenchCommandTests(TransactionTestCase):
+    databases = {"default", REPLICA_DB_ALIAS} if replica_configured() else {"default"}
+
+    def bench(self, *args) -> dict:
+        out = io.StringIO()
+        call_command(
+            "bench",
+            "--users=3",
+            "--books=5",
+            "--borrowings=20",
+            "--requests=5",
+            "--concurrency=2",
+            *args,
+            stdout=out,
+            stderr=io.StringIO(),
+        )
+        return json.loads(out.getvalue())
+
+    def test_reports_every_endpoint(self, mock_delay) -> None:
+        report = self.bench()
+
+        self.assertEqual(list(report["endpoints"]), list(ENDPOINTS))
+        for name, result in report["endpoints"].items():
+            with self.subTest(endpoint=name):
+                self.assertEqual(result["requests"], 5)
+                self.assertEqual(result["errors"], 0)
+                self.assertLessEqual(
+                    result["latency_ms"]["p50"], result["latency_ms"]["p99"]
+                )
+                self.assertGreater(result["queries"]["max"], 0)
+
+    def test_synthetic_data_is_removed(self, mock_delay) -> None:
+        self.bench("--endpoints", "borrow", "return")
+
+        self.assertFalse(get_user_model().objects.exists())
+        self.assertFalse(Book.objects.exists())
+        self.assertFalse(Borrowing.objects.exists())
+
+    def test_keep(self, mock_delay) -> None:
+        self.bench("--endpoints", "books-list", "--keep")
+
+        self.assertEqual(get_user_model().objects.count(), 3)
+        self.assertEqual(Borrowing.objects.count(), 20)
+
+
+class ProfileEndpointCommandTests(TestCase):
+    databases = {"default", REPLICA_DB_ALIAS} if replica_configured() else {"default"}
+
+    def profile(self, path, *args) -> str:
+        out = io.StringIO()
+        call_command(
+            "profile_endpoint",
+            path,
+            "--users=2",
+            "--books=3",
+            "--borrowings=10",
+            "--requests=2",
+            *args,
+            stdout=out,
+            stderr=io.StringIO(),
+        )
+        return out.getvalue()
+
+    def test_async_view_layers(self) -> None:
+        output = self.profile("/api/borrowings/")
+
+        self.assertIn("2 requests", output)
+        # Run by the async view on its event loop thread.
+        self.assertRegex(output, r"\n  serialization +[0-9.]+s")
+        self.assertRegex(output, r"\n  auth +[0-9.]+s")
+        self.assertFalse(get_user_model().objects.exists())
+
+    def test_output(self) -> None:
+        with tempfile.NamedTemporaryFile(suffix=".prof") as output:
+            self.profile("/api/books/", "--staff", f"--output={output.name}")
+
+            self.assertTrue(pstats.Stats(output.name).total_calls)
+
+    def test_error_response(self) -> None:
+        with self.assertRaisesMessage(CommandError, "returned HTTP 404"):
+            self.profile("/api/no-such-endpoint/")
+
+        self.assertFalse(Book.objects.exists())
+
+
+class SummaryTests(SimpleTestCase):
+    def test_summarize(self) -> None:
+        samples = [(seconds / 1000, None, 200) for seconds in range(1, 101)]
+
+        summary = summarize(samples, elapsed=2)
+
+        self.assertEqual(summary["requests"], 100)
+        self.assertEqual(summary["throughput"], 50)
+        self.assertEqual(summary["latency_ms"]["p50"], 50.5)
+        self.assertEqual(summary["latency_ms"]["max"], 100)
+        # Not counted in any sample.
+        self.assertNotIn("queries", summary)
+
+    def test_describe(self) -> None:
+        summary = summarize([(0.01, 2, 200), (0.03, 4, 500)], elapsed=1)
+
+        self.assertEqual(
+            describe("books", summary),
+            "books: 2 requests, 2.0 req/s, mean 20.0ms, p50 20.0ms, "
+            "p95 29.0ms, p99 29.8ms, 1 errors",
+        )
+        self.assertEqual(summary["queries"], {"mean": 3, "max": 4})
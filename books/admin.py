@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from books.models import Book
+from books.search import search_query
 
 
 @admin.register(Book)
@@ -8,3 +9,9 @@ class BookAdmin(admin.ModelAdmin):
     list_display = ("title", "author", "inventory", "daily_fee", "cover")
     list_filter = ("cover",)
     search_fields = ("title", "author")
+
+    def get_search_results(self, request, queryset, search_term):
+        # Use the indexed search vector rather than icontains on each field.
+        if not search_term:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(search_vector=search_query(search_term)), False
@@ -0,0 +1,47 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from library_service_project.db_routers import pin_to_primary
+
+CATALOG_VERSION_KEY = "books:catalog:version"
+# Keeps catalog reads on the primary while a change replicates, so a cache
+# miss can't store the replica's stale copy under the new version.
+CATALOG_PIN = "books:catalog"
+
+
+def catalog_version() -> int:
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version() -> None:
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        # Start from a fresh value so entries cached under an evicted
+        # version can never be served again.
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_catalog() -> None:
+    """
+    Drop every cached catalog response.
+
+    The version is bumped straight away so this request sees its own
+    writes, and again on commit so a reader that raced the transaction
+    can't keep stale data cached under the new version.
+    """
+    bump_catalog_version()
+    pin_to_primary(CATALOG_PIN)
+    transaction.on_commit(bump_catalog_version)
+
+
+def catalog_cache_key(request) -> str:
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f"books:catalog:{catalog_version()}:{url}"
@@ -0,0 +1,124 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+
+from benchmarks.runner import describe, summarize
+from books.models import Book
+from books.search import search_books
+
+WORDS = (
+    "shadow night river empire winter garden silent crown dragon glass "
+    "storm hollow iron ember forest city ocean letter secret king queen "
+    "house fire stone wind summer bridge journey machine memory island "
+    "mountain moon star sea war peace love death time light dark road"
+).split()
+SURNAMES = (
+    "Smith Johnson Garcia Brown Miller Davis Wilson Moore Taylor Clark "
+    "Lewis Walker Hall Young King Wright Scott Green Baker Adams Nelson "
+    "Carter Mitchell Roberts Turner Phillips Campbell Parker Evans Edwards"
+).split()
+MODES = ("icontains", "search")
+BATCH_SIZE = 10_000
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare book search with icontains against the full-text index, "
+        "optionally after topping the catalog up with generated books. "
+        "The generated books are rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--catalog-size",
+            type=int,
+            default=0,
+            help="Generate books until the catalog has this many (default: 0).",
+        )
+        parser.add_argument(
+            "--queries",
+            type=int,
+            default=200,
+            help="Searches per mode (default: 200).",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=20,
+            help="Results fetched per search (default: 20).",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Random seed for generated books and search terms.",
+        )
+
+    def handle(self, *args, **options):
+        queries = options["queries"]
+        if queries < 2:
+            raise CommandError("--queries must be at least 2.")
+
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            self.fill_catalog(options["catalog_size"], rng)
+
+            books = Book.objects.count()
+            terms = [rng.choice(WORDS + SURNAMES) for _ in range(queries)]
+            self.stdout.write(f"Searching {books} books.")
+
+            for mode in MODES:
+                summary = self.run(mode, terms, options["page_size"])
+                self.stdout.write(self.style.SUCCESS(describe(mode, summary)))
+
+            transaction.set_rollback(True)
+
+    def fill_catalog(self, size, rng) -> None:
+        missing = size - Book.objects.count()
+        if missing <= 0:
+            return
+
+        for start in range(0, missing, BATCH_SIZE):
+            Book.objects.bulk_create(
+                self.generate_book(rng)
+                for _ in range(min(BATCH_SIZE, missing - start))
+            )
+        # Plan the searches for the filled catalog; rolled back with it.
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Book._meta.db_table}")
+        self.stdout.write(f"Generated {missing} books.")
+
+    @staticmethod
+    def generate_book(rng) -> Book:
+        return Book(
+            title=" ".join(rng.sample(WORDS, rng.randint(1, 4))).title(),
+            author=f"{rng.choice(WORDS).title()} {rng.choice(SURNAMES)}",
+            cover=rng.choice(Book.CoverChoices.values),
+            inventory=rng.randint(0, 20),
+            daily_fee=rng.randint(10, 500) / 100,
+        )
+
+    @staticmethod
+    def run(mode, terms, page_size) -> dict:
+        samples = []
+
+        run_started = time.perf_counter()
+        for term in terms:
+            started = time.perf_counter()
+            if mode == "icontains":
+                # What the admin and a naive ?search= did before.
+                queryset = Book.objects.filter(
+                    Q(title__icontains=term) | Q(author__icontains=term)
+                )
+            else:
+                # Includes the query that decides on the trigram fallback.
+                queryset = search_books(Book.objects.all(), term).order_by(
+                    "-search_rank", "id"
+                )
+            list(queryset[:page_size])
+            samples.append((time.perf_counter() - started, None, 200))
+
+        return summarize(samples, time.perf_counter() - run_started)
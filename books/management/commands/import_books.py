@@ -0,0 +1,155 @@
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from rest_framework.exceptions import ValidationError
+
+from books.cache import invalidate_catalog
+from books.models import Book
+from books.serializers import BookSerializer
+
+UPDATE_FIELDS = ["title", "author", "cover", "inventory", "daily_fee"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream books from a CSV or JSONL file (or stdin) into the catalog. "
+        "Rows with an id update that book, other rows are inserted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or '-' for stdin.")
+        parser.add_argument(
+            "--format",
+            choices=("csv", "jsonl"),
+            help="Input format. Guessed from the file extension by default.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows validated and upserted per query (default: 5000).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        input_format = options["format"] or (
+            "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+        )
+        batch_size = options["batch_size"]
+        self.verbosity = options["verbosity"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        try:
+            stream = (
+                sys.stdin if path == "-"
+                else open(path, newline="", encoding="utf-8")
+            )
+        except OSError as error:
+            raise CommandError(f"Cannot read {path}: {error.strerror}.")
+        imported = invalid = 0
+        started = time.perf_counter()
+
+        try:
+            rows = self.read_rows(stream, input_format)
+            while batch := list(islice(rows, batch_size)):
+                batch_imported, batch_invalid = self.import_batch(batch)
+                imported += batch_imported
+                invalid += batch_invalid
+                self.report(imported, started, verbosity=2)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        self.reset_id_sequence()
+        invalidate_catalog()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} books ({invalid} invalid rows skipped) "
+            f"in {elapsed:.1f}s, {imported / max(elapsed, 1e-9):.0f} rows/s."
+        ))
+
+    def read_rows(self, stream, input_format):
+        """Yield ``(line_number, row)`` pairs without loading the whole file."""
+        if input_format == "csv":
+            reader = csv.DictReader(stream)
+            for row in reader:
+                yield reader.line_num, row
+            return
+
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as error:
+                yield line_number, error
+
+    def import_batch(self, batch) -> tuple[int, int]:
+        serializer = BookSerializer()
+        new_books = []
+        # Postgres rejects an upsert that touches the same row twice, so a
+        # repeated id in one batch keeps only its last row.
+        books_by_id = {}
+        invalid = 0
+
+        for line_number, row in batch:
+            if isinstance(row, Exception):
+                self.stderr.write(f"Line {line_number}: invalid JSON ({row}).")
+                invalid += 1
+                continue
+            try:
+                data = serializer.run_validation(row)
+                book_id = self.parse_id(row.get("id"))
+            except ValidationError as error:
+                self.stderr.write(f"Line {line_number}: {json.dumps(error.detail)}")
+                invalid += 1
+                continue
+            if book_id is None:
+                new_books.append(Book(**data))
+            else:
+                books_by_id[book_id] = Book(id=book_id, **data)
+
+        books = new_books + list(books_by_id.values())
+        with transaction.atomic():
+            Book.objects.bulk_create(
+                books,
+                update_conflicts=True,
+                unique_fields=["id"],
+                update_fields=UPDATE_FIELDS,
+            )
+
+        return len(books), invalid
+
+    @staticmethod
+    def parse_id(value) -> int | None:
+        if value in (None, ""):
+            return None
+        try:
+            book_id = int(value)
+        except (TypeError, ValueError):
+            book_id = 0
+        if book_id < 1:
+            raise ValidationError({"id": ["A valid positive integer is required."]})
+        return book_id
+
+    def reset_id_sequence(self) -> None:
+        """Explicit ids don't advance the sequence; move it past the maximum."""
+        statements = connection.ops.sequence_reset_sql(no_style(), [Book])
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def report(self, imported: int, started: float, verbosity: int) -> None:
+        if self.verbosity >= verbosity:
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{imported} rows, {imported / max(elapsed, 1e-9):.0f} rows/s"
+            )
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.2 on 2026-10-18 14:25
+
+from django.db import migrations
+
+TRIGRAM_INDEXES = {
+    "book_title_trgm_idx": "title",
+    "book_author_trgm_idx": "author",
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """
+    Install pg_trgm and index title and author for the typo fallback.
+
+    Not every Postgres build ships the contrib extensions, so this is
+    skipped when pg_trgm is unavailable; search then works without the
+    fallback (see ``books.search.trigram_available()``).
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        if cursor.fetchone() is None:
+            return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON books_book "
+            f"USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0003_book_search_vector"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.2 on 2026-10-18 15:10
+
+from datetime import date
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def backfill_book_stats(apps, schema_editor):
+    """Count the loans made before the stats were maintained."""
+    Borrowing = apps.get_model("borrowings", "Borrowing")
+    BookStats = apps.get_model("books", "BookStats")
+    active = Q(actual_return_date__isnull=True)
+
+    loans = Borrowing.objects.order_by().values("book_id").annotate(
+        active_loans=Count("id", filter=active),
+        total_loans=Count("id"),
+        overdue_loans=Count(
+            "id", filter=active & Q(expected_return_date__lt=date.today())
+        ),
+        last_borrow_date=Max("borrow_date"),
+    )
+    BookStats.objects.bulk_create(
+        (BookStats(**row) for row in loans.iterator()), batch_size=2000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0004_book_trigram_indexes"),
+        ("borrowings", "0006_borrowing_date_constraints"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookStats",
+            fields=[
+                (
+                    "book",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="books.book",
+                    ),
+                ),
+                ("active_loans", models.PositiveIntegerField(default=0)),
+                ("total_loans", models.PositiveIntegerField(default=0)),
+                ("overdue_loans", models.PositiveIntegerField(default=0)),
+                ("last_borrow_date", models.DateField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name_plural": "book stats",
+            },
+        ),
+        migrations.RunPython(backfill_book_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.2 on 2026-10-18 05:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0005_bookstats"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["author", "title", "id"], name="book_author_title_idx"
+            ),
+        ),
+    ]
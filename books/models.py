@@ -1,5 +1,9 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 
+from books.search import SEARCH_CONFIG
+
 
 class Book(models.Model):
     class CoverChoices(models.TextChoices):
@@ -15,9 +19,48 @@ class Book(models.Model):
     )
     inventory = models.PositiveIntegerField()
     daily_fee = models.DecimalField(max_digits=5, decimal_places=2)
+    # Computed by Postgres, so bulk imports and update() keep it current too.
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("title", weight="A", config=SEARCH_CONFIG)
+            + SearchVector("author", weight="B", config=SEARCH_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     def __str__(self):
         return f"{self.title} by {self.author}"
 
     class Meta:
-        ordering = ["author", "title"]
+        ordering = ["author", "title", "id"]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="book_search_vector_idx"),
+            # The catalog's keyset pagination order.
+            models.Index(
+                fields=["author", "title", "id"], name="book_author_title_idx"
+            ),
+        ]
+
+
+class BookStats(models.Model):
+    """
+    Loan counters for a book, kept current by ``borrowings.stats``.
+
+    Rows are created on a book's first loan. ``overdue_loans`` also changes
+    as loans fall due, so it is recounted every hour.
+    """
+
+    book = models.OneToOneField(
+        Book, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    active_loans = models.PositiveIntegerField(default=0)
+    total_loans = models.PositiveIntegerField(default=0)
+    overdue_loans = models.PositiveIntegerField(default=0)
+    last_borrow_date = models.DateField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "book stats"
+
+    def __str__(self) -> str:
+        return f"Stats for book #{self.book_id}"
@@ -0,0 +1,11 @@
+from library_service_project.pagination import KeysetCursorPagination
+
+
+class BookCursorPagination(KeysetCursorPagination):
+    ordering = ("author", "title", "id")
+
+
+class BookSearchPagination(KeysetCursorPagination):
+    """Pages search results by relevance, best match first."""
+
+    ordering = ("-search_rank", "id")
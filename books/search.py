@@ -0,0 +1,53 @@
+from functools import cache
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db import connections
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast, Greatest
+
+SEARCH_CONFIG = "english"
+
+
+def search_query(terms: str) -> SearchQuery:
+    """Parse ``terms`` like a search box: words, "phrases", or, -excluded."""
+    return SearchQuery(terms, config=SEARCH_CONFIG, search_type="websearch")
+
+
+@cache
+def trigram_available(using: str) -> bool:
+    """Whether the pg_trgm extension is installed in database ``using``."""
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def search_books(queryset, terms: str):
+    """
+    Books in ``queryset`` matching ``terms``, annotated with ``search_rank``.
+
+    Full-text matches on title and author are ranked with ``ts_rank``. When
+    nothing matches, e.g. because of a typo, books whose title or author
+    contain a word similar to ``terms`` are ranked by trigram similarity
+    instead, provided pg_trgm is installed.
+    """
+    query = search_query(terms)
+    matches = queryset.filter(search_vector=query)
+    if matches.exists() or not trigram_available(queryset.db):
+        rank = SearchRank(F("search_vector"), query)
+    else:
+        matches = queryset.filter(
+            Q(title__trigram_word_similar=terms)
+            | Q(author__trigram_word_similar=terms)
+        )
+        rank = Greatest(
+            TrigramWordSimilarity(terms, "title"),
+            TrigramWordSimilarity(terms, "author"),
+        )
+
+    # Both ranks are float4, which don't survive the round trip through
+    # the pagination cursor exactly; double precision does.
+    return matches.annotate(search_rank=Cast(rank, FloatField()))
@@ -1,9 +1,29 @@
 from rest_framework import serializers
 
-from books.models import Book
+from books.models import Book, BookStats
+
+
+class BookStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BookStats
+        fields = ("active_loans", "total_loans", "overdue_loans", "last_borrow_date")
 
 
 class BookSerializer(serializers.ModelSerializer):
+    stats = serializers.SerializerMethodField()
+
     class Meta:
         model = Book
-        fields = ("id", "title", "author", "cover", "inventory", "daily_fee")
+        fields = (
+            "id",
+            "title",
+            "author",
+            "cover",
+            "inventory",
+            "daily_fee",
+            "stats",
+        )
+
+    def get_stats(self, book) -> dict:
+        # Books that have never been borrowed have no stats row yet.
+        return BookStatsSerializer(getattr(book, "stats", None) or BookStats()).data
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from books.cache import invalidate_catalog
+from books.models import Book
+
+
+@receiver([post_save, post_delete], sender=Book)
+def invalidate_catalog_on_book_change(sender, **kwargs) -> None:
+    invalidate_catalog()
@@ -1,12 +1,25 @@
+import io
+import json
+import os
+import tempfile
+from unittest import skipUnless
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 
 from rest_framework.test import APIClient
 from books.models import Book
+from books.search import trigram_available
 from books.serializers import BookSerializer
 from decimal import Decimal
+from library_service_project.testing import QueryBudgetMixin
+from users.serializers import TokenObtainPairSerializer
 
 BOOK_URL = reverse("books:book-list")
 
@@ -52,7 +65,21 @@ class UnauthenticatedBookApiTests(TestCase):
         serializer = BookSerializer(books, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
+
+    def test_list_books_cursor_pagination(self):
+        for title in ("C", "A", "B", "A"):
+            sample_book(title=title)
+
+        titles = []
+        url = f"{BOOK_URL}?page_size=3"
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            titles.extend(book["title"] for book in res.data["results"])
+            url = res.data["next"]
+
+        self.assertEqual(titles, ["A", "A", "B", "C"])
 
     def test_retriewe_book_detail(self):
         book = sample_book()
@@ -181,3 +208,299 @@ class AdminBookApiTests(TestCase):
         res = self.client.delete(url)
 
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN output is Postgres-specific")
+class BookIndexTests(TestCase):
+    def test_catalog_page_uses_ordering_index(self):
+        for i in range(10):
+            sample_book(title=f"Book {i}")
+        # The test table is tiny, so stop the planner preferring a seq scan.
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"ANALYZE {Book._meta.db_table}")
+
+        plan = Book.objects.order_by("author", "title", "id")[:10].explain()
+
+        self.assertIn("book_author_title_idx", plan, msg=plan)
+
+
+class BookQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        admin = get_user_model().objects.create_user(
+            "admin@admin.com", "testpass", is_staff=True
+        )
+        token = TokenObtainPairSerializer.get_token(admin).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.books = [sample_book(title=f"Book {i}") for i in range(3)]
+        self.payload = {
+            "title": "New Book",
+            "author": "New Author",
+            "cover": "HARD",
+            "inventory": 2,
+            "daily_fee": 2.5,
+        }
+
+    def test_every_route_has_a_budget(self) -> None:
+        self.assertRoutesBudgeted("books.urls")
+
+    def test_api_root(self) -> None:
+        self.assertWithinQueryBudget("GET", reverse("books:api-root"))
+
+    def test_list(self) -> None:
+        self.assertWithinQueryBudget("GET", BOOK_URL)
+
+    def test_search(self) -> None:
+        self.assertWithinQueryBudget("GET", f"{BOOK_URL}?search=book")
+
+    def test_retrieve(self) -> None:
+        self.assertWithinQueryBudget("GET", detail_url(self.books[0].id))
+
+    def test_create(self) -> None:
+        self.assertWithinQueryBudget("POST", BOOK_URL, self.payload)
+
+    def test_update(self) -> None:
+        url = detail_url(self.books[0].id)
+        self.assertWithinQueryBudget("PUT", url, self.payload)
+        self.assertWithinQueryBudget("PATCH", url, {"inventory": 5})
+
+    def test_delete(self) -> None:
+        self.assertWithinQueryBudget("DELETE", detail_url(self.books[0].id))
+
+
+class BookCatalogCacheTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.book = sample_book()
+
+    def test_list_served_from_cache(self):
+        first = self.client.get(BOOK_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(BOOK_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_cache_keyed_on_query_params(self):
+        sample_book(title="Another book")
+        self.client.get(BOOK_URL, {"page_size": 1})
+
+        res = self.client.get(BOOK_URL, {"page_size": 2})
+
+        self.assertEqual(len(res.data["results"]), 2)
+
+    def test_if_none_match_returns_not_modified(self):
+        etag = self.client.get(BOOK_URL)["ETag"]
+
+        res = self.client.get(BOOK_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+
+    def test_detail_if_none_match_returns_not_modified(self):
+        url = detail_url(self.book.id)
+        etag = self.client.get(url)["ETag"]
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_book_update_invalidates_cache(self):
+        etag = self.client.get(BOOK_URL)["ETag"]
+        admin = get_user_model().objects.create_user(
+            "admin@admin.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(admin)
+        self.client.patch(detail_url(self.book.id), {"title": "Renamed"})
+
+        res = self.client.get(BOOK_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+        self.assertEqual(res.data["results"][0]["title"], "Renamed")
+
+    def test_book_delete_invalidates_cache(self):
+        self.client.get(BOOK_URL)
+        self.book.delete()
+
+        res = self.client.get(BOOK_URL)
+
+        self.assertEqual(res.data["results"], [])
+
+
+class BookSearchTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+
+    def search(self, terms, **params):
+        res = self.client.get(BOOK_URL, {"search": terms, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [book["title"] for book in res.data["results"]]
+
+    def test_search_ranks_title_above_author(self):
+        sample_book(title="Ancillary Justice", author="Ann Leckie")
+        sample_book(title="Dragon Keeper", author="Robin Hobb")
+        sample_book(title="Silent Night", author="Tom Dragon")
+
+        self.assertEqual(self.search("dragons"), ["Dragon Keeper", "Silent Night"])
+
+    def test_search_websearch_syntax(self):
+        sample_book(title="The Dragon Reborn", author="Robert Jordan")
+        sample_book(title="Dragon Keeper", author="Robin Hobb")
+
+        self.assertEqual(self.search("dragon -hobb"), ["The Dragon Reborn"])
+
+    def test_search_cursor_pagination(self):
+        for title in ("Dune", "Dune Messiah", "Children of Dune", "Emma"):
+            sample_book(title=title)
+
+        titles = []
+        url = f"{BOOK_URL}?search=dune&page_size=2"
+        while url:
+            res = self.client.get(url)
+            titles.extend(book["title"] for book in res.data["results"])
+            url = res.data["next"]
+
+        self.assertEqual(
+            sorted(titles), ["Children of Dune", "Dune", "Dune Messiah"]
+        )
+
+    def test_search_vector_follows_updates(self):
+        book = sample_book(title="Emma")
+        Book.objects.filter(id=book.id).update(title="Persuasion")
+
+        self.assertEqual(self.search("persuasion"), ["Persuasion"])
+        self.assertEqual(self.search("emma"), [])
+
+    def test_search_falls_back_to_trigrams(self):
+        if not trigram_available(DEFAULT_DB_ALIAS):
+            self.skipTest("pg_trgm is not installed.")
+        sample_book(title="Neuromancer", author="William Gibson")
+
+        self.assertEqual(self.search("neuromancr"), ["Neuromancer"])
+
+
+class ImportBooksCommandTests(TestCase):
+    def import_books(self, content: str, suffix: str, *args) -> tuple[str, str]:
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=suffix, delete=False, encoding="utf-8"
+        ) as source:
+            source.write(content)
+        self.addCleanup(os.remove, source.name)
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command(
+            "import_books", source.name, *args, stdout=stdout, stderr=stderr
+        )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_csv(self):
+        content = (
+            "title,author,cover,inventory,daily_fee\n"
+            "Dune,Frank Herbert,HARD,3,1.50\n"
+            "Emma,Jane Austen,SOFT,1,0.75\n"
+        )
+
+        stdout, stderr = self.import_books(content, ".csv", "--batch-size", "1")
+
+        self.assertIn("Imported 2 books", stdout)
+        self.assertIn("rows/s", stdout)
+        self.assertEqual(stderr, "")
+        book = Book.objects.get(title="Dune")
+        self.assertEqual(book.inventory, 3)
+        self.assertEqual(book.daily_fee, Decimal("1.50"))
+
+    def test_import_jsonl_from_stdin(self):
+        rows = [
+            {"title": "Dune", "author": "Frank Herbert", "cover": "HARD",
+             "inventory": 3, "daily_fee": "1.50"},
+            {"title": "Emma", "author": "Jane Austen", "cover": "SOFT",
+             "inventory": 1, "daily_fee": "0.75"},
+        ]
+        stdin = io.StringIO("\n".join(json.dumps(row) for row in rows))
+
+        with patch("sys.stdin", stdin):
+            call_command(
+                "import_books", "-", "--format", "jsonl", stdout=io.StringIO()
+            )
+
+        self.assertEqual(Book.objects.count(), 2)
+
+    def test_import_upserts_rows_with_id(self):
+        book = sample_book(title="Old title", inventory=1)
+        content = "\n".join([
+            json.dumps({"id": book.id, "title": "New title", "author": "A",
+                        "cover": "HARD", "inventory": 5, "daily_fee": "2.00"}),
+            json.dumps({"title": "Another", "author": "B", "cover": "SOFT",
+                        "inventory": 1, "daily_fee": "1.00"}),
+        ])
+
+        self.import_books(content, ".jsonl")
+
+        book.refresh_from_db()
+        self.assertEqual(book.title, "New title")
+        self.assertEqual(book.inventory, 5)
+        self.assertEqual(Book.objects.count(), 2)
+
+        created = sample_book(title="After import")
+        self.assertGreater(created.id, book.id)
+
+    def test_import_repeated_id_keeps_last_row(self):
+        book = sample_book(title="Old title", inventory=1)
+        content = "\n".join(
+            json.dumps({"id": book.id, "title": title, "author": "A",
+                        "cover": "HARD", "inventory": inventory,
+                        "daily_fee": "2.00"})
+            for title, inventory in (("First", 2), ("Second", 4))
+        )
+
+        stdout, stderr = self.import_books(content, ".jsonl")
+
+        self.assertIn("Imported 1 books (0 invalid rows skipped)", stdout)
+        self.assertEqual(stderr, "")
+        book.refresh_from_db()
+        self.assertEqual(book.title, "Second")
+        self.assertEqual(book.inventory, 4)
+        self.assertEqual(Book.objects.count(), 1)
+
+    def test_import_skips_invalid_rows(self):
+        content = (
+            "title,author,cover,inventory,daily_fee\n"
+            "Dune,Frank Herbert,HARD,-1,1.50\n"
+            "Emma,Jane Austen,PAPER,1,0.75\n"
+            "Ulysses,James Joyce,SOFT,2,1.00\n"
+        )
+
+        stdout, stderr = self.import_books(content, ".csv")
+
+        self.assertIn("Imported 1 books (2 invalid rows skipped)", stdout)
+        self.assertIn("Line 2:", stderr)
+        self.assertIn("Line 3:", stderr)
+        self.assertEqual(
+            list(Book.objects.values_list("title", flat=True)), ["Ulysses"]
+        )
+
+    def test_import_invalidates_catalog_cache(self):
+        cache.clear()
+        self.client.get(BOOK_URL)
+
+        self.import_books(
+            "title,author,cover,inventory,daily_fee\nDune,F,HARD,3,1.50\n", ".csv"
+        )
+
+        res = self.client.get(BOOK_URL)
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_import_missing_file(self):
+        path = os.path.join(tempfile.gettempdir(), "missing-books.csv")
+
+        with self.assertRaisesMessage(
+            CommandError, f"Cannot read {path}: No such file or directory."
+        ):
+            call_command("import_books", path, stdout=io.StringIO())
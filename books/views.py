@@ -1,12 +1,74 @@
-from rest_framework import viewsets
+import hashlib
+import json
 
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status, viewsets
+from rest_framework.response import Response
+
+from books.cache import CATALOG_PIN, catalog_cache_key
 from books.models import Book
+from books.pagination import BookCursorPagination, BookSearchPagination
+from books.search import search_books
 from books.serializers import BookSerializer
 
 from books.permissions import IsAdminOrReadOnly
+from library_service_project.db_routers import ReplicaReadMixin
 
 
-class BookViewSet(viewsets.ModelViewSet):
-    queryset = Book.objects.all()
+class BookViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
+    queryset = Book.objects.select_related("stats")
     serializer_class = BookSerializer
     permission_classes = [IsAdminOrReadOnly]
+    pagination_class = BookCursorPagination
+    primary_pins = (CATALOG_PIN,)
+
+    @property
+    def search_terms(self) -> str:
+        if self.action != "list":
+            return ""
+        return self.request.query_params.get("search", "").strip()
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if self.search_terms:
+                self._paginator = BookSearchPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.search_terms:
+            queryset = search_books(queryset, self.search_terms)
+        return queryset
+
+    def list(self, request, *args, **kwargs) -> Response:
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, view, request, *args, **kwargs) -> Response:
+        """Serve a GET from the catalog cache, answering 304 on a matching ETag."""
+        key = catalog_cache_key(request)
+        cached = cache.get(key)
+
+        if cached is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+            content = json.dumps(response.data, cls=DjangoJSONEncoder, sort_keys=True)
+            etag = quote_etag(hashlib.md5(content.encode()).hexdigest())
+            cached = (response.data, etag)
+            cache.set(key, cached, settings.BOOK_CATALOG_CACHE_TIMEOUT)
+
+        data, etag = cached
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        return Response(data, headers={"ETag": etag})
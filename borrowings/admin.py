@@ -1,5 +1,7 @@
 from django.contrib import admin
-from borrowings.models import Borrowing
+
+from books.search import search_query
+from borrowings.models import ArchivedBorrowing, Borrowing, Notification
 
 
 @admin.register(Borrowing)
@@ -13,5 +15,37 @@ class BorrowingAdmin(admin.ModelAdmin):
         "actual_return_date",
     )
     list_filter = ("borrow_date", "expected_return_date", "actual_return_date")
-    search_fields = ("book__title", "user__email")
+    search_fields = ("user__email",)
     raw_id_fields = ("book", "user")
+
+    def get_search_results(self, request, queryset, search_term):
+        """Match the user's email, or the book through its search vector."""
+        results, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        if search_term:
+            results |= queryset.filter(
+                book__search_vector=search_query(search_term)
+            )
+        return results, may_have_duplicates
+
+
+@admin.register(ArchivedBorrowing)
+class ArchivedBorrowingAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "book",
+        "user",
+        "borrow_date",
+        "expected_return_date",
+        "actual_return_date",
+    )
+    list_filter = ("borrow_date", "actual_return_date")
+    raw_id_fields = ("book", "user")
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ("id", "created_at", "sent_at", "attempts", "next_attempt_at")
+    list_filter = ("sent_at",)
+    readonly_fields = ("created_at",)
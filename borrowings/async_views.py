@@ -0,0 +1,71 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import aget_object_or_404
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from borrowings import views
+from borrowings.filters import BorrowingFilter
+from borrowings.models import BorrowingHistory
+from borrowings.pagination import BorrowingCursorPagination
+from borrowings.serializers import (
+    BorrowingDetailSerializer,
+    BorrowingListSerializer,
+    BorrowingSummarySerializer,
+)
+from borrowings.summary import aborrowing_summary, summary_cache_key
+from library_service_project.async_views import AsyncAPIView
+
+
+class BorrowingQuerysetMixin:
+    def get_queryset(self):
+        queryset = BorrowingHistory.objects.select_related("book", "user")
+
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user_id=self.request.user.id)
+
+        return queryset
+
+
+class BorrowingListView(BorrowingQuerysetMixin, AsyncAPIView):
+    """Async ``GET`` of the borrowing list; ``POST`` goes to the sync view."""
+
+    sync_view = staticmethod(views.BorrowingListView.as_view())
+
+    async def get(self, request, *args, **kwargs) -> Response:
+        filterset = BorrowingFilter(
+            request.query_params, queryset=self.get_queryset(), request=request
+        )
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+
+        paginator = BorrowingCursorPagination()
+        page = await paginator.apaginate_queryset(filterset.qs, request, view=self)
+        serializer = BorrowingListSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class BorrowingRetrieveView(BorrowingQuerysetMixin, AsyncAPIView):
+    async def get(self, request, pk, *args, **kwargs) -> Response:
+        borrowing = await aget_object_or_404(
+            self.get_queryset().select_related("book__stats"), pk=pk
+        )
+        return Response(BorrowingDetailSerializer(borrowing).data)
+
+
+class BorrowingSummaryView(AsyncAPIView):
+    """The signed-in user's borrowing counts and charges, cached per user."""
+
+    async def get(self, request, *args, **kwargs) -> Response:
+        today = date.today()
+        key = summary_cache_key(request.user.id, today)
+        data = await cache.aget(key)
+
+        if data is None:
+            summary = await aborrowing_summary(request.user.id, today)
+            data = BorrowingSummarySerializer(summary).data
+            await cache.aset(key, data, settings.BORROWING_SUMMARY_CACHE_TIMEOUT)
+
+        return Response(data)
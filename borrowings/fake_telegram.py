@@ -0,0 +1,108 @@
+import json
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SEND_MESSAGE_PATH = re.compile(r"^/bot(?P<token>[^/]+)/sendMessage$")
+
+
+class FakeTelegramServer:
+    """
+    Local stand-in for the Bot API ``sendMessage`` endpoint.
+
+    Runs a real HTTP server on a random localhost port so tests and
+    benchmarks exercise the client's connection pool, rate limiting and
+    429 handling without network access. Delivered messages are recorded
+    in ``messages``; ``fail_next`` queues error responses.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.messages = []
+        self.failures = deque()
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self.handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeTelegramServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+    def __enter__(self) -> "FakeTelegramServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.messages.clear()
+            self.failures.clear()
+
+    def fail_next(self, status: int = 500, times: int = 1, retry_after=None) -> None:
+        body = {"ok": False, "error_code": status, "description": "Fake failure"}
+        if retry_after is not None:
+            body["parameters"] = {"retry_after": retry_after}
+        with self.lock:
+            self.failures.extend([(status, body)] * times)
+
+    def respond(self, payload: dict) -> tuple[int, dict]:
+        with self.lock:
+            if self.failures:
+                return self.failures.popleft()
+
+            self.messages.append(payload)
+            message_id = len(self.messages)
+
+        return 200, {
+            "ok": True,
+            "result": {
+                "message_id": message_id,
+                "chat": {"id": payload.get("chat_id")},
+                "date": int(time.time()),
+                "text": payload.get("text"),
+            },
+        }
+
+    def handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+
+                if not SEND_MESSAGE_PATH.match(self.path):
+                    status, body = 404, {"ok": False, "description": "Not Found"}
+                else:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    status, body = server.respond(payload)
+
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.db.models import DecimalField, F, Func, IntegerField, Value
+from django.db.models.functions import Round
+
+CENT = Decimal("0.01")
+
+
+def to_cents(amount: Decimal) -> Decimal:
+    # ROUND_HALF_UP rounds like Postgres round(), so both modes agree.
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def borrowing_charges(borrowing, return_date: date) -> tuple[Decimal, Decimal]:
+    """
+    The fee and the fine for ``borrowing`` returned on ``return_date``.
+
+    The fee is the book's daily fee for every day borrowed, at least one.
+    The fine is ``FINE_MULTIPLIER`` times the daily fee for every day past
+    the expected return date.
+    """
+    daily_fee = borrowing.book.daily_fee
+    days = max((return_date - borrowing.borrow_date).days, 1)
+    fee = to_cents(daily_fee * days)
+
+    if borrowing.expected_return_date is None:
+        return fee, Decimal("0.00")
+    return fee, fine_for(daily_fee, return_date - borrowing.expected_return_date)
+
+
+def fine_for(daily_fee: Decimal, overdue: timedelta) -> Decimal:
+    days = max(overdue.days, 0)
+    return to_cents(daily_fee * Decimal(str(settings.FINE_MULTIPLIER)) * days)
+
+
+class DaysBetween(Func):
+    """Whole days from ``start`` to ``end``: Postgres ``date - date``."""
+
+    arg_joiner = " - "
+    template = "(%(expressions)s)"
+    output_field = IntegerField()
+
+    def __init__(self, end, start, **extra):
+        super().__init__(end, start, **extra)
+
+
+def fine_due(as_of: date) -> Round:
+    """Database expression for a loan's fine if it were returned on ``as_of``."""
+    return Round(
+        DaysBetween(Value(as_of), F("expected_return_date"))
+        * F("book__daily_fee")
+        * Value(Decimal(str(settings.FINE_MULTIPLIER))),
+        2,
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+def outstanding_fines(queryset, as_of: date):
+    """
+    Active loans in ``queryset`` overdue on ``as_of``, with their fines.
+
+    Each row is annotated with ``overdue_days`` and ``fine_due``, computed
+    by the database in the same query, so fines for every overdue loan
+    are one pass over the overdue index rather than a loop in Python.
+    """
+    return queryset.filter(
+        actual_return_date__isnull=True, expected_return_date__lt=as_of
+    ).annotate(
+        overdue_days=DaysBetween(Value(as_of), F("expected_return_date")),
+        fine_due=fine_due(as_of),
+    )
@@ -1,5 +1,5 @@
 from django_filters import rest_framework as filters
-from borrowings.models import Borrowing
+from borrowings.models import BorrowingHistory
 
 
 class BorrowingFilter(filters.FilterSet):
@@ -7,7 +7,7 @@ class BorrowingFilter(filters.FilterSet):
     user_id = filters.NumberFilter(field_name="user__id")
 
     class Meta:
-        model = Borrowing
+        model = BorrowingHistory
         fields = ("is_active", "user_id")
 
     def filter_is_active(self, queryset, name, value):
@@ -0,0 +1,87 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from borrowings.models import ArchivedBorrowing, Borrowing
+
+ARCHIVED_FIELDS = (
+    "id",
+    "borrow_date",
+    "expected_return_date",
+    "actual_return_date",
+    "fee",
+    "fine",
+    "book_id",
+    "user_id",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Move returned borrowings older than --older-than days to the archive "
+        "table, one bounded batch per transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=settings.BORROWING_ARCHIVE_AFTER_DAYS,
+            help="Archive borrowings returned more than this many days ago "
+                 "(default: BORROWING_ARCHIVE_AFTER_DAYS).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Borrowings moved per transaction (default: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1 or options["older_than"] < 0:
+            raise CommandError(
+                "--batch-size must be positive and --older-than not negative."
+            )
+
+        cutoff = date.today() - timedelta(days=options["older_than"])
+        archived = 0
+        last_id = 0
+
+        while True:
+            moved = self.archive_batch(cutoff, last_id, batch_size)
+            if not moved:
+                break
+            archived += len(moved)
+            last_id = moved[-1]
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} borrowings returned before {cutoff}."
+        ))
+
+    @staticmethod
+    @transaction.atomic
+    def archive_batch(cutoff, last_id, batch_size) -> list[int]:
+        """
+        Move the next batch after ``last_id``; return the moved ids.
+
+        Walking the primary key keeps each batch an index range scan, and
+        rows locked by a concurrent request are left for the next run.
+        """
+        rows = list(
+            Borrowing.objects.select_for_update(skip_locked=True)
+            .filter(id__gt=last_id, actual_return_date__lt=cutoff)
+            .order_by("id")
+            .values(*ARCHIVED_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return []
+
+        ids = [row["id"] for row in rows]
+        ArchivedBorrowing.objects.bulk_create(
+            ArchivedBorrowing(**row) for row in rows
+        )
+        Borrowing.objects.filter(id__in=ids).delete()
+        return ids
@@ -0,0 +1,85 @@
+import copy
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from benchmarks.runner import describe, summarize
+from borrowings.models import Borrowing
+
+MODES = ("none", "persistent", "pool")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-request database latency with no connection reuse, "
+        "persistent connections and the connection pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Simulated requests per mode (default: 500).",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=MODES,
+            action="append",
+            help="Mode to measure; repeat for several (default: all).",
+        )
+
+    def handle(self, *args, **options):
+        requests = options["requests"]
+        if requests < 2:
+            raise CommandError("--requests must be at least 2.")
+
+        for mode in options["mode"] or MODES:
+            connection = self.connect(mode)
+            try:
+                summary = self.run(connection, requests)
+            finally:
+                connection.close()
+                if mode == "pool":
+                    connection.close_pool()
+                del connections[connection.alias]
+                del connections.settings[connection.alias]
+
+            self.stdout.write(self.style.SUCCESS(describe(mode, summary)))
+
+    @staticmethod
+    def connect(mode):
+        """A connection to the default database configured for ``mode``."""
+        database = copy.deepcopy(connections.settings[DEFAULT_DB_ALIAS])
+        pool = database["OPTIONS"].pop("pool", None)
+        database["CONN_MAX_AGE"] = 0
+
+        if mode == "persistent":
+            database["CONN_MAX_AGE"] = None
+        elif mode == "pool":
+            database["OPTIONS"]["pool"] = pool or True
+
+        # A separate alias, since pools are shared by alias. It's registered
+        # because django.contrib.postgres looks new connections up by alias.
+        connections.settings["bench"] = database
+        return connections["bench"]
+
+    @staticmethod
+    def run(connection, requests) -> dict:
+        """Time a small query wrapped in the request start/finish bookkeeping."""
+        sql, params = Borrowing.objects.order_by("id")[:20].query.sql_with_params()
+        samples = []
+
+        run_started = time.perf_counter()
+        for _ in range(requests):
+            started = time.perf_counter()
+            # What close_old_connections() does on request_started/finished.
+            connection.close_if_unusable_or_obsolete()
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                cursor.fetchall()
+            connection.close_if_unusable_or_obsolete()
+            samples.append((time.perf_counter() - started, None, 200))
+
+        return summarize(samples, time.perf_counter() - run_started)
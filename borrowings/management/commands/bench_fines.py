@@ -0,0 +1,111 @@
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from books.models import Book
+from borrowings.fees import fine_for, outstanding_fines
+from borrowings.models import Borrowing
+
+BATCH_SIZE = 10_000
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare computing the fines of every overdue loan in Python with the "
+        "set-based query, over synthetic borrowings that are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--borrowings",
+            type=int,
+            default=1_000_000,
+            help="Synthetic active borrowings (default: 1000000).",
+        )
+        parser.add_argument(
+            "--books",
+            type=int,
+            default=1000,
+            help="Synthetic books they are spread over (default: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        if options["borrowings"] < 1 or options["books"] < 1:
+            raise CommandError("--borrowings and --books must be positive.")
+
+        with transaction.atomic():
+            user = self.create_borrowings(options["borrowings"], options["books"])
+            # Every synthetic loan is due within the next 60 days.
+            as_of = date.today() + timedelta(days=60)
+            borrowings = Borrowing.objects.filter(user=user)
+
+            started = time.perf_counter()
+            count, total = self.python_fines(borrowings, as_of)
+            self.report("python", count, total, time.perf_counter() - started)
+
+            started = time.perf_counter()
+            result = outstanding_fines(borrowings, as_of).aggregate(
+                count=Count("id"), total=Sum("fine_due")
+            )
+            self.report(
+                "sql", result["count"], result["total"],
+                time.perf_counter() - started
+            )
+
+            transaction.set_rollback(True)
+
+    def create_borrowings(self, count, books):
+        rng = random.Random(0)
+        user = get_user_model().objects.create_user(
+            email=f"bench-fines-{uuid.uuid4().hex}@example.com"
+        )
+        book_ids = [
+            book.id for book in Book.objects.bulk_create(
+                Book(
+                    title=f"Bench book {i}",
+                    author="Bench",
+                    inventory=count,
+                    daily_fee=Decimal(rng.randint(10, 500)) / 100,
+                )
+                for i in range(books)
+            )
+        ]
+
+        today = date.today()
+        for start in range(0, count, BATCH_SIZE):
+            Borrowing.objects.bulk_create(
+                Borrowing(
+                    user=user,
+                    book_id=rng.choice(book_ids),
+                    expected_return_date=today + timedelta(days=rng.randint(0, 59)),
+                )
+                for _ in range(min(BATCH_SIZE, count - start))
+            )
+        self.stdout.write(f"Created {count} borrowings of {books} books.")
+        return user
+
+    @staticmethod
+    def python_fines(borrowings, as_of) -> tuple[int, Decimal]:
+        """Fetch every overdue loan and price it one at a time."""
+        rows = borrowings.filter(
+            actual_return_date__isnull=True, expected_return_date__lt=as_of
+        ).values_list("expected_return_date", "book__daily_fee")
+
+        count, total = 0, Decimal("0.00")
+        for expected_return_date, daily_fee in rows.iterator(chunk_size=BATCH_SIZE):
+            count += 1
+            total += fine_for(daily_fee, as_of - expected_return_date)
+        return count, total
+
+    def report(self, mode, count, total, elapsed) -> None:
+        self.stdout.write(self.style.SUCCESS(
+            f"{mode}: fines for {count} overdue loans, total {total}, "
+            f"{elapsed * 1000:.0f}ms"
+        ))
@@ -0,0 +1,134 @@
+import asyncio
+import time
+import uuid
+
+import httpx
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test import AsyncRequestFactory
+from django.urls import reverse
+
+from benchmarks.runner import describe, summarize
+from borrowings import async_views, views
+from users.serializers import TokenObtainPairSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the borrowing list. By default the sync and async views are "
+        "run in process the way the ASGI handler runs them; with --url "
+        "requests go to a running server instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Requests per run (default: 500).",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=50,
+            help="Requests in flight at once (default: 50).",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=20,
+            help="Borrowings per page (default: 20).",
+        )
+        parser.add_argument(
+            "--url",
+            help="Base URL of a running server, e.g. http://localhost:8000.",
+        )
+
+    def handle(self, *args, **options):
+        requests = options["requests"]
+        concurrency = options["concurrency"]
+        if requests < 2 or concurrency < 1:
+            raise CommandError(
+                "--requests must be at least 2 and --concurrency positive."
+            )
+
+        user = get_user_model().objects.create_user(
+            email=f"loadtest-{uuid.uuid4().hex}@example.com", is_staff=True
+        )
+        token = str(TokenObtainPairSerializer.get_token(user).access_token)
+        params = {"page_size": options["page_size"]}
+
+        try:
+            if options["url"]:
+                runs = {options["url"]: self.http_caller(options["url"], token, params)}
+            else:
+                runs = {
+                    "sync view": self.view_caller(
+                        views.BorrowingListView.as_view(), token, params
+                    ),
+                    "async view": self.view_caller(
+                        async_views.BorrowingListView.as_view(), token, params
+                    ),
+                }
+
+            for name, call in runs.items():
+                summary = asyncio.run(self.run(call, requests, concurrency))
+                self.stdout.write(self.style.SUCCESS(
+                    describe(f"{name}, {concurrency} in flight", summary)
+                ))
+        finally:
+            user.delete()
+
+    @staticmethod
+    def view_caller(view, token, params):
+        """Call a view like ``ASGIHandler``: one thread-sensitive context each."""
+        factory = AsyncRequestFactory()
+        url = reverse("borrowings:borrowing-list-create")
+
+        if asyncio.iscoroutinefunction(view):
+            handler = view
+        else:
+            handler = sync_to_async(lambda request: view(request).render())
+
+        async def call() -> int:
+            request = factory.get(
+                url, params, headers={"Authorization": f"Bearer {token}"}
+            )
+            request.META["HTTP_HOST"] = "localhost"
+            async with ThreadSensitiveContext():
+                response = await handler(request)
+                await sync_to_async(close_old_connections)()
+            return response.status_code
+
+        return call
+
+    @staticmethod
+    def http_caller(base_url, token, params):
+        client = httpx.AsyncClient(
+            base_url=base_url, headers={"Authorization": f"Bearer {token}"}
+        )
+        url = reverse("borrowings:borrowing-list-create")
+
+        async def call() -> int:
+            response = await client.get(url, params=params)
+            return response.status_code
+
+        return call
+
+    async def run(self, call, requests, concurrency) -> dict:
+        semaphore = asyncio.Semaphore(concurrency)
+        samples = []
+
+        async def timed() -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                status_code = await call()
+                samples.append((time.perf_counter() - started, None, status_code))
+            if status_code != 200:
+                raise CommandError(f"Request failed with HTTP {status_code}.")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(timed() for _ in range(requests)))
+        return summarize(samples, time.perf_counter() - started)
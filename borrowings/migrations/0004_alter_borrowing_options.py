@@ -0,0 +1,17 @@
+# Generated by Django 5.2.2 on 2026-10-18 02:51
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowings", "0003_notification"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="borrowing",
+            options={"ordering": ["borrow_date", "id"]},
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.2 on 2026-10-18 03:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0002_alter_book_options"),
+        ("borrowings", "0005_borrowing_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="borrowing",
+            constraint=models.CheckConstraint(
+                condition=models.Q(
+                    ("expected_return_date__isnull", True),
+                    ("expected_return_date__gte", models.F("borrow_date")),
+                    _connector="OR",
+                ),
+                name="borrowing_expected_return_after_borrow",
+                violation_error_message=(
+                    "Expected return date cannot be earlier than borrow date."
+                ),
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="borrowing",
+            constraint=models.CheckConstraint(
+                condition=models.Q(
+                    ("actual_return_date__isnull", True),
+                    ("actual_return_date__gte", models.F("borrow_date")),
+                    _connector="OR",
+                ),
+                name="borrowing_actual_return_after_borrow",
+                violation_error_message=(
+                    "Actual return date cannot be earlier than borrow date."
+                ),
+            ),
+        ),
+    ]
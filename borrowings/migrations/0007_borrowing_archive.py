@@ -0,0 +1,109 @@
+# Generated by Django 5.2.2 on 2026-10-18 16:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+HISTORY_COLUMNS = (
+    "id, borrow_date, expected_return_date, actual_return_date, book_id, user_id"
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0005_bookstats"),
+        ("borrowings", "0006_borrowing_date_constraints"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedBorrowing",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("borrow_date", models.DateField()),
+                ("expected_return_date", models.DateField(blank=True, null=True)),
+                ("actual_return_date", models.DateField()),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="archived_borrowings",
+                        to="books.book",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="archived_borrowings",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["borrow_date", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "borrow_date", "id"],
+                        name="archived_user_borrow_date_idx",
+                    ),
+                    models.Index(
+                        fields=["borrow_date", "id"], name="archived_borrow_date_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.RunSQL(
+            f"""
+            CREATE VIEW borrowings_borrowing_history AS
+            SELECT {HISTORY_COLUMNS} FROM borrowings_borrowing
+            UNION ALL
+            SELECT {HISTORY_COLUMNS} FROM borrowings_archivedborrowing
+            """,
+            "DROP VIEW borrowings_borrowing_history",
+        ),
+        migrations.CreateModel(
+            name="BorrowingHistory",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("borrow_date", models.DateField()),
+                ("expected_return_date", models.DateField(blank=True, null=True)),
+                ("actual_return_date", models.DateField(blank=True, null=True)),
+                (
+                    "book",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="books.book",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "borrowing history",
+                "db_table": "borrowings_borrowing_history",
+                "ordering": ["borrow_date", "id"],
+                "managed": False,
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.2 on 2026-10-18 17:00
+
+from django.db import migrations, models
+
+OLD_COLUMNS = (
+    "id, borrow_date, expected_return_date, actual_return_date, book_id, user_id"
+)
+HISTORY_COLUMNS = f"{OLD_COLUMNS}, fee, fine"
+
+
+def history_view(columns: str, replace: bool = False) -> str:
+    return f"""
+        CREATE {"OR REPLACE " if replace else ""}VIEW borrowings_borrowing_history AS
+        SELECT {columns} FROM borrowings_borrowing
+        UNION ALL
+        SELECT {columns} FROM borrowings_archivedborrowing
+    """
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowings", "0007_borrowing_archive"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedborrowing",
+            name="fee",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=8, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedborrowing",
+            name="fine",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=8, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="borrowing",
+            name="fee",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=8, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="borrowing",
+            name="fine",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=8, null=True
+            ),
+        ),
+        migrations.RunSQL(
+            history_view(HISTORY_COLUMNS, replace=True),
+            [
+                "DROP VIEW borrowings_borrowing_history",
+                history_view(OLD_COLUMNS),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.2 on 2026-10-18 05:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0006_book_author_title_index"),
+        ("borrowings", "0008_borrowing_charges"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                fields=["borrow_date", "id"], name="borrowing_borrow_date_idx"
+            ),
+        ),
+    ]
@@ -3,22 +3,66 @@ from datetime import date
 from django.db import models
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from books.models import Book
+from library_service_project.tracing import span
 
 
 class Borrowing(models.Model):
     borrow_date = models.DateField(auto_now_add=True)
     expected_return_date = models.DateField(null=True, blank=True)
     actual_return_date = models.DateField(null=True, blank=True)
+    # Charged on return, see borrowings.fees.
+    fee = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    fine = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
     book = models.ForeignKey(Book, on_delete=models.PROTECT, related_name="borrowings")
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.PROTECT,
-        related_name="borrowings"
+        related_name="borrowings",
+        db_index=False,
     )
 
     class Meta:
-        ordering = ["borrow_date"]
+        ordering = ["borrow_date", "id"]
+        indexes = [
+            models.Index(
+                fields=["user", "borrow_date", "id"],
+                name="borrowing_user_borrow_date_idx",
+            ),
+            models.Index(
+                fields=["expected_return_date"],
+                condition=models.Q(actual_return_date__isnull=True),
+                name="borrowing_overdue_idx",
+            ),
+            models.Index(
+                fields=["borrow_date", "id"],
+                condition=models.Q(actual_return_date__isnull=True),
+                name="borrowing_active_idx",
+            ),
+            # The staff list pages through every borrowing in this order.
+            models.Index(
+                fields=["borrow_date", "id"], name="borrowing_borrow_date_idx"
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(expected_return_date__isnull=True)
+                | models.Q(expected_return_date__gte=models.F("borrow_date")),
+                name="borrowing_expected_return_after_borrow",
+                violation_error_message=(
+                    "Expected return date cannot be earlier than borrow date."
+                ),
+            ),
+            models.CheckConstraint(
+                condition=models.Q(actual_return_date__isnull=True)
+                | models.Q(actual_return_date__gte=models.F("borrow_date")),
+                name="borrowing_actual_return_after_borrow",
+                violation_error_message=(
+                    "Actual return date cannot be earlier than borrow date."
+                ),
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.user.first_name} {self.user.last_name} borrows " \
@@ -36,8 +80,111 @@ class Borrowing(models.Model):
                                        "be earlier than borrow date."}
             )
 
-    def save(self, *args, **kwargs):
+    def save(self, *args, validate: bool = True, **kwargs):
+        """
+        Save the borrowing, running ``full_clean`` unless ``validate=False``.
+
+        Internal paths that already called ``clean`` pass ``validate=False``
+        to skip the per-field and foreign key queries; the date invariants
+        are still enforced by the database check constraints.
+        """
         if not self.borrow_date:
             self.borrow_date = date.today()
-        self.full_clean()
+        if validate:
+            with span("Borrowing.full_clean"):
+                self.full_clean()
         super().save(*args, **kwargs)
+
+
+class ArchivedBorrowing(models.Model):
+    """
+    A returned borrowing moved out of the ``Borrowing`` table.
+
+    ``manage.py archive_borrowings`` moves old returned borrowings here,
+    keeping their ids, so the table that active loans, returns and the
+    overdue scan work on stays small.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    borrow_date = models.DateField()
+    expected_return_date = models.DateField(null=True, blank=True)
+    actual_return_date = models.DateField()
+    fee = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    fine = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    book = models.ForeignKey(
+        Book, on_delete=models.PROTECT, related_name="archived_borrowings"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.PROTECT,
+        related_name="archived_borrowings",
+        db_index=False,
+    )
+
+    class Meta:
+        ordering = ["borrow_date", "id"]
+        indexes = [
+            models.Index(
+                fields=["user", "borrow_date", "id"],
+                name="archived_user_borrow_date_idx",
+            ),
+            models.Index(fields=["borrow_date", "id"], name="archived_borrow_date_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Archived borrowing #{self.id}"
+
+
+class BorrowingHistory(models.Model):
+    """
+    Read-only view of every borrowing: ``Borrowing`` UNION ALL the archive.
+
+    Filtering on ``actual_return_date__isnull=True`` skips the archive,
+    since its column is NOT NULL.
+    """
+
+    borrow_date = models.DateField()
+    expected_return_date = models.DateField(null=True, blank=True)
+    actual_return_date = models.DateField(null=True, blank=True)
+    fee = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    fine = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    book = models.ForeignKey(
+        Book, on_delete=models.DO_NOTHING, related_name="+", db_constraint=False
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        related_name="+",
+        db_constraint=False,
+    )
+
+    class Meta:
+        managed = False
+        db_table = "borrowings_borrowing_history"
+        ordering = ["borrow_date", "id"]
+        verbose_name_plural = "borrowing history"
+
+
+class Notification(models.Model):
+    """Telegram message waiting in the outbox to be delivered by a worker."""
+
+    message = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(sent_at__isnull=True),
+                name="notification_pending_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        status = "sent" if self.sent_at else "pending"
+        return f"Notification #{self.id} ({status})"
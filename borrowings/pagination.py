@@ -0,0 +1,5 @@
+from library_service_project.pagination import KeysetCursorPagination
+
+
+class BorrowingCursorPagination(KeysetCursorPagination):
+    ordering = ("borrow_date", "id")
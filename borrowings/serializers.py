@@ -1,12 +1,22 @@
+from collections import Counter
 from datetime import date
 
-from asgiref.sync import async_to_sync
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError as DRFValidationError
 from django.core.exceptions import ValidationError as DjangoValidationError
-from borrowings.models import Borrowing
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, When
+from borrowings.fees import borrowing_charges
+from borrowings.models import Borrowing, Notification
+from books.cache import invalidate_catalog
+from books.models import Book
 from books.serializers import BookSerializer
-from borrowings.telegram import send_telegram_message
+from library_service_project.db_routers import pin_to_primary, user_pin
+from library_service_project.tracing import TracedSerializerMixin
+from borrowings.stats import record_borrowings, record_returns
+from borrowings.summary import invalidate_summary
+from borrowings.tasks import send_pending_notifications
+from borrowings.telegram import DigestBuilder
 
 
 class BorrowingListSerializer(serializers.ModelSerializer):
@@ -17,6 +27,8 @@ class BorrowingListSerializer(serializers.ModelSerializer):
             "borrow_date",
             "expected_return_date",
             "actual_return_date",
+            "fee",
+            "fine",
             "book",
             "user",
         )
@@ -33,12 +45,112 @@ class BorrowingDetailSerializer(serializers.ModelSerializer):
             "borrow_date",
             "expected_return_date",
             "actual_return_date",
+            "fee",
+            "fine",
             "book",
             "user",
         )
 
 
-class CreateBorrowingSerializer(serializers.ModelSerializer):
+class BorrowingSummarySerializer(serializers.Serializer):
+    active = serializers.IntegerField()
+    overdue = serializers.IntegerField()
+    returned = serializers.IntegerField()
+    fees = serializers.DecimalField(max_digits=12, decimal_places=2)
+    fines = serializers.DecimalField(max_digits=12, decimal_places=2)
+    fines_accruing = serializers.DecimalField(max_digits=12, decimal_places=2)
+    amount_owed = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+NEW_BORROWINGS_HEADER = "<b>New borrowings</b>"
+
+
+def new_borrowing_entry(user, borrowing: Borrowing) -> str:
+    return (
+        f"<b>User:</b> {user.email}\n"
+        f"<b>Book:</b> {borrowing.book.title}\n"
+        f"<b>Borrow date:</b> {borrowing.borrow_date}\n"
+        f"<b>Expected return:</b> {borrowing.expected_return_date}"
+    )
+
+
+class BookField(serializers.PrimaryKeyRelatedField):
+    """A book by primary key, taken from ``books`` if it was fetched already."""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(queryset=Book.objects.all(), **kwargs)
+        self.books = {}
+
+    def to_internal_value(self, data):
+        book = self.books.get(str(data))
+        return book if book is not None else super().to_internal_value(data)
+
+
+class BulkCreateBorrowingSerializer(TracedSerializerMixin, serializers.ListSerializer):
+    """Borrow a cart of books with one inventory UPDATE and one INSERT."""
+
+    def to_internal_value(self, data):
+        # Fetch the cart's books at once rather than one query per item.
+        if isinstance(data, list) and len(data) <= (self.max_length or len(data)):
+            ids = {str(item.get("book")) for item in data if isinstance(item, dict)}
+            self.child.fields["book"].books = {
+                str(book.pk): book
+                for book in Book.objects.filter(
+                    pk__in=[pk for pk in ids if pk.isdigit()]
+                )
+            }
+        return super().to_internal_value(data)
+
+    @transaction.atomic
+    def create(self, validated_data):
+        user = self.context["request"].user
+        borrowings = [
+            Borrowing(user_id=user.id, borrow_date=date.today(), **item)
+            for item in validated_data
+        ]
+
+        errors = []
+        for borrowing in borrowings:
+            try:
+                borrowing.clean()
+            except DjangoValidationError as e:
+                errors.append(e.message_dict)
+            else:
+                errors.append({})
+        if any(errors):
+            raise DRFValidationError(errors)
+
+        quantities = Counter(borrowing.book_id for borrowing in borrowings)
+        requested = Case(
+            *(When(pk=book_id, then=count) for book_id, count in quantities.items()),
+            output_field=IntegerField(),
+        )
+        in_stock = Book.objects.filter(
+            pk__in=quantities, inventory__gte=requested
+        ).update(inventory=F("inventory") - requested)
+        if in_stock != len(quantities):
+            raise serializers.ValidationError("The book is out of stock.")
+        invalidate_catalog()
+
+        Borrowing.objects.bulk_create(borrowings)
+        record_borrowings(borrowings)
+        pin_to_primary(user_pin(user.id))
+        invalidate_summary(user.id)
+
+        digest = DigestBuilder(NEW_BORROWINGS_HEADER)
+        messages = [digest.add(new_borrowing_entry(user, b)) for b in borrowings]
+        messages.append(digest.flush())
+        Notification.objects.bulk_create(
+            Notification(message=message) for message in messages if message
+        )
+        transaction.on_commit(send_pending_notifications.delay, robust=True)
+
+        return borrowings
+
+
+class CreateBorrowingSerializer(TracedSerializerMixin, serializers.ModelSerializer):
+    book = BookField()
+
     class Meta:
         model = Borrowing
         fields = (
@@ -47,17 +159,13 @@ class CreateBorrowingSerializer(serializers.ModelSerializer):
             "expected_return_date",
             "book",
         )
+        list_serializer_class = BulkCreateBorrowingSerializer
 
+    @transaction.atomic
     def create(self, validated_data):
         book = validated_data["book"]
-        if book.inventory == 0:
-            raise serializers.ValidationError("The book is out of stock.")
-
-        book.inventory -= 1
-        book.save()
-
         user = self.context["request"].user
-        borrowing = Borrowing(user=user, **validated_data)
+        borrowing = Borrowing(user_id=user.id, **validated_data)
 
         borrowing.borrow_date = date.today()
 
@@ -66,22 +174,27 @@ class CreateBorrowingSerializer(serializers.ModelSerializer):
         except DjangoValidationError as e:
             raise DRFValidationError(e.message_dict)
 
-        borrowing.save()
-
-        message = (
-            f"<b>New borrowings</b>\n"
-            f"<b>User:</b> {user.email}\n"
-            f"<b>Book:</b> {book.title}\n"
-            f"<b>Borrow date:s</b> {borrowing.borrow_date}\n"
-            f"<b>Expected return:</b> {borrowing.expected_return_date}"
+        in_stock = Book.objects.filter(pk=book.pk, inventory__gt=0).update(
+            inventory=F("inventory") - 1
         )
+        if not in_stock:
+            raise serializers.ValidationError("The book is out of stock.")
+        invalidate_catalog()
 
-        async_to_sync(send_telegram_message)(message)
+        borrowing.save(validate=False)
+        record_borrowings([borrowing])
+        pin_to_primary(user_pin(user.id))
+        invalidate_summary(user.id)
+
+        Notification.objects.create(
+            message=f"{NEW_BORROWINGS_HEADER}\n{new_borrowing_entry(user, borrowing)}"
+        )
+        transaction.on_commit(send_pending_notifications.delay, robust=True)
 
         return borrowing
 
 
-class BorrowingReturnSerializer(serializers.ModelSerializer):
+class BorrowingReturnSerializer(TracedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Borrowing
         fields = ("actual_return_date",)
@@ -93,3 +206,76 @@ class BorrowingReturnSerializer(serializers.ModelSerializer):
                 "Actual return date cannot be earlier than borrow date."
             )
         return value
+
+
+class BulkReturnBorrowingSerializer(TracedSerializerMixin, serializers.ListSerializer):
+    """Return many borrowings with one UPDATE per table."""
+
+    def validate(self, attrs):
+        ids = [item["id"] for item in attrs]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Each borrowing can be returned once.")
+        return attrs
+
+    @transaction.atomic
+    def create(self, validated_data):
+        user = self.context["request"].user
+        return_dates = {
+            item["id"]: item.get("actual_return_date") or date.today()
+            for item in validated_data
+        }
+        borrowings = list(
+            Borrowing.objects.select_for_update(of=("self",))
+            .select_related("book")
+            .filter(pk__in=return_dates, user_id=user.id)
+        )
+
+        errors = []
+        missing = set(return_dates) - {borrowing.id for borrowing in borrowings}
+        if missing:
+            errors.append(f"Borrowings not found: {sorted(missing)}.")
+
+        for borrowing in borrowings:
+            if borrowing.actual_return_date:
+                errors.append(
+                    f"Borrowing {borrowing.id} has already been returned."
+                )
+            elif return_dates[borrowing.id] < borrowing.borrow_date:
+                errors.append(
+                    f"Borrowing {borrowing.id}: actual return date cannot "
+                    f"be earlier than borrow date."
+                )
+            borrowing.actual_return_date = return_dates[borrowing.id]
+            borrowing.fee, borrowing.fine = borrowing_charges(
+                borrowing, borrowing.actual_return_date
+            )
+
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        Borrowing.objects.bulk_update(
+            borrowings, ["actual_return_date", "fee", "fine"]
+        )
+        record_returns(borrowings)
+        pin_to_primary(user_pin(user.id))
+        invalidate_summary(user.id)
+
+        quantities = Counter(borrowing.book_id for borrowing in borrowings)
+        Book.objects.filter(pk__in=quantities).update(
+            inventory=F("inventory") + Case(
+                *(When(pk=book_id, then=count)
+                  for book_id, count in quantities.items()),
+                output_field=IntegerField(),
+            )
+        )
+        invalidate_catalog()
+
+        return borrowings
+
+
+class BorrowingBulkReturnSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    actual_return_date = serializers.DateField(required=False)
+
+    class Meta:
+        list_serializer_class = BulkReturnBorrowingSerializer
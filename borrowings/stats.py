@@ -0,0 +1,87 @@
+from collections import Counter
+from datetime import date
+
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest
+
+from books.models import BookStats
+from borrowings.models import Borrowing
+
+
+def per_book(counts: Counter) -> Case:
+    """``counts`` of the book in the row being updated, 0 for other books."""
+    return Case(
+        *(When(book_id=book_id, then=Value(count))
+          for book_id, count in counts.items()),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def record_borrowings(borrowings) -> None:
+    """Count new ``borrowings`` in their books' stats, one UPDATE for all."""
+    loans = Counter(borrowing.book_id for borrowing in borrowings)
+    BookStats.objects.bulk_create(
+        (BookStats(book_id=book_id) for book_id in loans), ignore_conflicts=True
+    )
+    BookStats.objects.filter(book_id__in=loans).update(
+        active_loans=F("active_loans") + per_book(loans),
+        total_loans=F("total_loans") + per_book(loans),
+        last_borrow_date=date.today(),
+    )
+
+
+def record_returns(borrowings) -> None:
+    """
+    Take returned ``borrowings`` off their books' active and overdue loans.
+
+    A loan counts as overdue here if it was due before today, which is
+    what the last ``refresh_overdue_loans()`` counted.
+    """
+    today = date.today()
+    returned = Counter(borrowing.book_id for borrowing in borrowings)
+    overdue = Counter(
+        borrowing.book_id
+        for borrowing in borrowings
+        if borrowing.expected_return_date
+        and borrowing.expected_return_date < today
+    )
+
+    BookStats.objects.filter(book_id__in=returned).update(
+        active_loans=F("active_loans") - per_book(returned),
+        # Floored in case a loan fell due since the last refresh.
+        overdue_loans=Greatest(F("overdue_loans") - per_book(overdue), Value(0)),
+    )
+
+
+def refresh_overdue_loans() -> int:
+    """
+    Recount every book's overdue loans in one UPDATE.
+
+    Only rows whose count changed are written; returns how many were.
+    """
+    overdue = (
+        Borrowing.objects.filter(
+            book_id=OuterRef("book_id"),
+            actual_return_date__isnull=True,
+            expected_return_date__lt=date.today(),
+        )
+        .order_by()
+        .values("book_id")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    return (
+        BookStats.objects.annotate(overdue=Coalesce(Subquery(overdue), Value(0)))
+        .exclude(overdue_loans=F("overdue"))
+        .update(overdue_loans=F("overdue"))
+    )
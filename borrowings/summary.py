@@ -0,0 +1,61 @@
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from borrowings.fees import fine_due
+from borrowings.models import BorrowingHistory
+
+
+def summary_cache_key(user_id, today: date) -> str:
+    # Dated, since loans become overdue without any write.
+    return f"borrowings:summary:{user_id}:{today.isoformat()}"
+
+
+def invalidate_summary(user_id) -> None:
+    """
+    Drop the user's cached summary after they borrow or return.
+
+    Deleted now so the request sees its own writes, and again on commit
+    so a summary computed while the transaction was open isn't kept.
+    """
+    key = summary_cache_key(user_id, date.today())
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def money(expression, condition) -> Coalesce:
+    return Coalesce(
+        Sum(expression, filter=condition),
+        Value(Decimal("0.00")),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+def summary_aggregates(today: date) -> dict:
+    active = Q(actual_return_date__isnull=True)
+    overdue = active & Q(expected_return_date__lt=today)
+    returned = Q(actual_return_date__isnull=False)
+
+    return {
+        "active": Count("id", filter=active),
+        "overdue": Count("id", filter=overdue),
+        "returned": Count("id", filter=returned),
+        "fees": money("fee", returned),
+        "fines": money("fine", returned),
+        "fines_accruing": money(fine_due(today), overdue),
+    }
+
+
+async def aborrowing_summary(user_id, today: date) -> dict:
+    """Counts and charges of the user's borrowings, archive included."""
+    summary = await BorrowingHistory.objects.filter(user_id=user_id).aaggregate(
+        **summary_aggregates(today)
+    )
+    summary["amount_owed"] = (
+        summary["fees"] + summary["fines"] + summary["fines_accruing"]
+    )
+    return summary
@@ -1,29 +1,143 @@
+import asyncio
+from datetime import timedelta
+
 from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
 from django.utils.timezone import now
-from borrowings.models import Borrowing
-from borrowings.telegram import send_telegram_message
+from books.cache import invalidate_catalog
+from borrowings.fees import outstanding_fines
+from borrowings.models import Borrowing, Notification
+from borrowings.stats import refresh_overdue_loans
+from borrowings.telegram import DigestBuilder, get_client, send_telegram_message
+from library_service_project.db_routers import read_replica
 from asgiref.sync import async_to_sync
 
 
+def overdue_entry(borrowing: Borrowing) -> str:
+    return (
+        f"👤 <b>User:</b> {borrowing.user.email}\n"
+        f"📖 <b>Book:</b> {borrowing.book.title}\n"
+        f"📅 <b>Borrow date:</b> {borrowing.borrow_date}\n"
+        f"📆 <b>Expected return:</b> {borrowing.expected_return_date}\n"
+        f"💰 <b>Fine so far:</b> {borrowing.fine_due}"
+    )
+
+
+async def send_overdue_digests(borrowings) -> int:
+    """Stream overdue borrowings into digests and send them concurrently.
+
+    At most ``TELEGRAM_CONCURRENCY`` messages are in flight; the producer
+    waits for a free slot before building the next digest, so memory stays
+    bounded by the chunk size regardless of how many loans are overdue.
+    """
+    semaphore = asyncio.Semaphore(settings.TELEGRAM_CONCURRENCY)
+    digest = DigestBuilder("⚠️ <b>Overdue borrowings</b>")
+    pending = []
+
+    async def send(message: str) -> None:
+        try:
+            await session.send_message(message)
+        finally:
+            semaphore.release()
+
+    async def schedule(message: str | None) -> None:
+        if message:
+            await semaphore.acquire()
+            pending.append(asyncio.create_task(send(message)))
+
+    async with get_client().session() as session:
+        async for borrowing in borrowings.aiterator(
+            chunk_size=settings.OVERDUE_NOTIFICATION_CHUNK_SIZE
+        ):
+            await schedule(digest.add(overdue_entry(borrowing)))
+        await schedule(digest.flush())
+
+        results = await asyncio.gather(*pending, return_exceptions=True)
+
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+
+    return len(pending)
+
+
 @shared_task
-def notify_overdue_borrowings():
+def notify_overdue_borrowings() -> int:
     today = now().date()
-    borrowings = Borrowing.objects.filter(
-        expected_return_date__lt=today,
-        actual_return_date__isnull=True
-    ).select_related("book", "user")
+    borrowings = outstanding_fines(
+        Borrowing.objects.using(read_replica()), today
+    ).select_related("book", "user").order_by("expected_return_date", "id")
+
+    sent = async_to_sync(send_overdue_digests)(borrowings)
 
-    if not borrowings.exists():
+    if not sent:
         message = "No overdue borrowing today!"
-        async_to_sync(send_telegram_message)(message)
-        return
-
-    for borrowing in borrowings:
-        message = (
-            f"⚠️ <b>Delay!</b>\n"
-            f"👤 <b>User:</b> {borrowing.user.email}\n"
-            f"📖 <b>Book:</b> {borrowing.book.title}\n"
-            f"📅 <b>Borrow date:</b> {borrowing.borrow_date}\n"
-            f"📆 <b>Expected return:</b> {borrowing.expected_return_date}"
+        send_telegram_message(message)
+
+    return sent
+
+
+@shared_task
+def refresh_book_overdue_loans() -> int:
+    """Recount overdue loans in the book stats as loans fall due."""
+    updated = refresh_overdue_loans()
+    if updated:
+        invalidate_catalog()
+    return updated
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff between delivery attempts, capped at one hour."""
+    return timedelta(seconds=min(30 * 2 ** (attempts - 1), 60 * 60))
+
+
+@shared_task
+def send_pending_notifications(batch_size: int = None) -> int:
+    """Drain one batch of the notification outbox and return how many were sent.
+
+    Rows are claimed with ``SKIP LOCKED`` in a short transaction that bumps
+    their attempts and leases them for ``NOTIFICATION_LEASE``, so several
+    workers can drain the outbox concurrently without holding row locks
+    while Telegram responds. A worker that dies mid-batch leaves its rows to
+    be retried once the lease runs out. A failed delivery is rescheduled
+    with backoff until ``NOTIFICATION_MAX_ATTEMPTS`` is reached.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+    sent = 0
+
+    with transaction.atomic():
+        notifications = list(
+            Notification.objects.select_for_update(skip_locked=True).filter(
+                sent_at__isnull=True,
+                next_attempt_at__lte=now(),
+                attempts__lt=settings.NOTIFICATION_MAX_ATTEMPTS,
+            )[:batch_size]
+        )
+        Notification.objects.filter(
+            pk__in=[notification.pk for notification in notifications]
+        ).update(
+            attempts=F("attempts") + 1,
+            next_attempt_at=now() + settings.NOTIFICATION_LEASE,
         )
-        async_to_sync(send_telegram_message)(message)
+
+    for notification in notifications:
+        attempts = notification.attempts + 1
+        try:
+            send_telegram_message(notification.message)
+        except Exception as error:
+            Notification.objects.filter(pk=notification.pk).update(
+                last_error=repr(error),
+                next_attempt_at=now() + retry_delay(attempts),
+            )
+        else:
+            Notification.objects.filter(pk=notification.pk).update(
+                sent_at=now(), last_error=""
+            )
+            sent += 1
+
+    if len(notifications) == batch_size:
+        send_pending_notifications.delay(batch_size)
+
+    return sent
@@ -1,12 +1,261 @@
-from telegram import Bot
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from functools import cache
+
+import httpx
 from django.conf import settings
 
-bot = Bot(token=settings.TELEGRAM_API_KEY)
+from library_service_project.metrics import (
+    TELEGRAM_FAILURES,
+    TELEGRAM_REQUEST_DURATION,
+)
+from library_service_project.tracing import span
+
+# Telegram rejects messages longer than this many characters.
+MESSAGE_LIMIT = 4096
+
+
+class TelegramError(Exception):
+    pass
+
+
+@contextmanager
+def observed_call(method: str):
+    """Time and trace a Bot API request, counting transport errors as failures."""
+    started = time.perf_counter()
+    try:
+        with span(f"telegram {method}", **{"rpc.method": method}):
+            yield
+    except httpx.TransportError:
+        TELEGRAM_FAILURES.labels(method, "network").inc()
+        raise
+    finally:
+        TELEGRAM_REQUEST_DURATION.labels(method).observe(
+            time.perf_counter() - started
+        )
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second.
+
+    ``reserve`` always takes a token and returns how long the caller must
+    wait before using it, so callers queue up in arrival order instead of
+    polling.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.rate)
+
+
+class RateLimiter:
+    """Telegram's limits: a global bucket plus one bucket per chat.
+
+    The buckets live in this process only. Each gunicorn or Celery worker
+    process has its own, so the bot may send up to the process count times
+    the configured rates; the ``429`` handling covers the excess.
+    """
+
+    def __init__(self, chat_rate: float, chat_burst: float, global_rate: float):
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_buckets = {}
+        self.lock = threading.Lock()
+
+    def reserve(self, chat_id) -> float:
+        with self.lock:
+            bucket = self.chat_buckets.get(chat_id)
+            if bucket is None:
+                bucket = TokenBucket(self.chat_rate, self.chat_burst)
+                self.chat_buckets[chat_id] = bucket
+        return max(self.global_bucket.reserve(), bucket.reserve())
+
+
+class TelegramClient:
+    """Bot API client reusing one HTTP connection pool across messages.
+
+    ``send_message`` is synchronous and safe to share between threads. For
+    sending many messages concurrently open ``session()`` on an event loop;
+    it keeps an async pool for the lifetime of that loop. Both paths share
+    the rate limiter and wait out ``429 Too Many Requests`` responses.
+
+    ``transport`` and ``async_transport`` replace the HTTP transports of
+    the sync and async pools, e.g. with ``httpx.MockTransport`` in tests.
+    """
+
+    method = "sendMessage"
+
+    def __init__(
+        self,
+        token: str,
+        chat_id,
+        *,
+        api_url: str = "https://api.telegram.org",
+        chat_rate: float = 1.0,
+        chat_burst: float = 1.0,
+        global_rate: float = 30.0,
+        max_retries: int = 3,
+        timeout: float = 10.0,
+        transport: httpx.BaseTransport | None = None,
+        async_transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.chat_id = chat_id
+        self.url = f"{api_url.rstrip('/')}/bot{token}/{self.method}"
+        self.rate_limiter = RateLimiter(chat_rate, chat_burst, global_rate)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.transport = transport
+        self.async_transport = async_transport
+        self._http = None
+        self._http_lock = threading.Lock()
+
+    @property
+    def http(self) -> httpx.Client:
+        if self._http is None:
+            with self._http_lock:
+                if self._http is None:
+                    self._http = httpx.Client(
+                        timeout=self.timeout, transport=self.transport
+                    )
+        return self._http
 
+    def close(self) -> None:
+        if self._http is not None:
+            self._http.close()
+            self._http = None
 
-async def send_telegram_message(text: str) -> None:
-    await bot.send_message(
-        chat_id=settings.TELEGRAM_CHAT_ID,
-        text=text,
-        parse_mode="HTML"
+    def payload(self, text: str, chat_id=None) -> dict:
+        return {
+            "chat_id": chat_id or self.chat_id,
+            "text": text,
+            "parse_mode": "HTML",
+        }
+
+    def send_message(self, text: str, chat_id=None) -> dict:
+        payload = self.payload(text, chat_id)
+        for _ in range(self.max_retries + 1):
+            time.sleep(self.rate_limiter.reserve(payload["chat_id"]))
+            with observed_call(self.method):
+                response = self.http.post(self.url, json=payload)
+            retry_after = self.retry_after(response)
+            if retry_after is None:
+                return self.result(response)
+            time.sleep(retry_after)
+
+        raise TelegramError("Telegram rate limit retries exhausted")
+
+    @asynccontextmanager
+    async def session(self):
+        async with httpx.AsyncClient(
+            timeout=self.timeout, transport=self.async_transport
+        ) as http:
+            yield AsyncTelegramSession(self, http)
+
+    @classmethod
+    def retry_after(cls, response: httpx.Response) -> float | None:
+        if response.status_code != 429:
+            return None
+        TELEGRAM_FAILURES.labels(cls.method, "rate_limited").inc()
+        try:
+            parameters = response.json().get("parameters", {})
+        except ValueError:
+            # Proxies in front of the Bot API may answer 429 without JSON.
+            parameters = {}
+        return float(parameters.get("retry_after", 1))
+
+    @classmethod
+    def result(cls, response: httpx.Response) -> dict:
+        try:
+            data = response.json()
+        except ValueError:
+            TELEGRAM_FAILURES.labels(cls.method, "api_error").inc()
+            raise TelegramError(f"Telegram returned HTTP {response.status_code}")
+
+        if not data.get("ok"):
+            TELEGRAM_FAILURES.labels(cls.method, "api_error").inc()
+            raise TelegramError(data.get("description", "Unknown Telegram error"))
+        return data["result"]
+
+
+class AsyncTelegramSession:
+    def __init__(self, client: TelegramClient, http: httpx.AsyncClient) -> None:
+        self.client = client
+        self.http = http
+
+    async def send_message(self, text: str, chat_id=None) -> dict:
+        client = self.client
+        payload = client.payload(text, chat_id)
+        for _ in range(client.max_retries + 1):
+            await asyncio.sleep(client.rate_limiter.reserve(payload["chat_id"]))
+            with observed_call(client.method):
+                response = await self.http.post(client.url, json=payload)
+            retry_after = client.retry_after(response)
+            if retry_after is None:
+                return client.result(response)
+            await asyncio.sleep(retry_after)
+
+        raise TelegramError("Telegram rate limit retries exhausted")
+
+
+@cache
+def get_client() -> TelegramClient:
+    return TelegramClient(
+        settings.TELEGRAM_API_KEY,
+        settings.TELEGRAM_CHAT_ID,
+        api_url=settings.TELEGRAM_API_URL,
+        chat_rate=settings.TELEGRAM_CHAT_RATE_LIMIT,
+        chat_burst=settings.TELEGRAM_CHAT_BURST,
+        global_rate=settings.TELEGRAM_GLOBAL_RATE_LIMIT,
     )
+
+
+def send_telegram_message(text: str) -> dict:
+    return get_client().send_message(text)
+
+
+class DigestBuilder:
+    """Packs entries under a header into as few messages as the limit allows."""
+
+    separator = "\n\n"
+
+    def __init__(self, header: str, limit: int = MESSAGE_LIMIT) -> None:
+        self.header = header
+        self.limit = limit
+        self.entries = []
+        self.length = len(header)
+
+    def add(self, entry: str) -> str | None:
+        """Add an entry, returning the finished message if it had to be flushed."""
+        message = None
+        added_length = len(self.separator) + len(entry)
+        if self.entries and self.length + added_length > self.limit:
+            message = self.flush()
+
+        self.entries.append(entry)
+        self.length += added_length
+        return message
+
+    def flush(self) -> str | None:
+        if not self.entries:
+            return None
+
+        message = self.separator.join([self.header, *self.entries])
+        self.entries = []
+        self.length = len(self.header)
+        return message
@@ -1,22 +1,66 @@
+import asyncio
+import io
 import json
-from unittest.mock import patch, AsyncMock
+import threading
+from unittest.mock import patch
 from django.conf import settings
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections, transaction
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from datetime import date, timedelta, datetime
+from decimal import Decimal
+from unittest import skipUnless
 
+import httpx
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from books.models import Book
+from books.cache import invalidate_catalog
+from books.models import Book, BookStats
+from borrowings.fees import borrowing_charges, fine_for, outstanding_fines
 from borrowings.filters import BorrowingFilter
-from borrowings.models import Borrowing
+from borrowings.models import ArchivedBorrowing, Borrowing, Notification
 from borrowings.serializers import BorrowingListSerializer, BorrowingDetailSerializer
+from borrowings.tasks import (
+    notify_overdue_borrowings,
+    refresh_book_overdue_loans,
+    send_pending_notifications,
+)
+from borrowings.fake_telegram import FakeTelegramServer
+from borrowings.telegram import (
+    DigestBuilder,
+    TelegramClient,
+    TelegramError,
+    TokenBucket,
+    get_client,
+)
+from library_service_project.db_routers import (
+    REPLICA_DB_ALIAS,
+    read_replica,
+    replica_configured,
+    use_replica,
+)
+from library_service_project import metrics
+from library_service_project.testing import QueryBudgetMixin, metric_value
+from users.serializers import TokenObtainPairSerializer
 from users.tests import create_user
 
 BORROWINGS_URL = reverse("borrowings:borrowing-list-create")
+BULK_BORROW_URL = reverse("borrowings:borrowing-bulk-create")
+BULK_RETURN_URL = reverse("borrowings:borrowing-bulk-return")
+SUMMARY_URL = reverse("borrowings:borrowing-summary")
 
 
 def sample_book(**params):
@@ -50,10 +94,43 @@ def sample_borrowing(user=None, book=None, **params):
     return Borrowing.objects.create(**defaults)
 
 
+def days_from_today(days: int) -> str:
+    return str(date.today() + timedelta(days=days))
+
+
 def detail_url(borrowing_id):
     return reverse("borrowings:borrowing-detail", args=[borrowing_id])
 
 
+class FakeTelegramMixin:
+    """Point the Telegram client at a local fake Bot API server."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.telegram = FakeTelegramServer().start()
+        cls.addClassCleanup(cls.telegram.stop)
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.telegram.reset()
+        settings_override = override_settings(
+            TELEGRAM_API_URL=self.telegram.url,
+            TELEGRAM_CHAT_ID="123",
+            TELEGRAM_CHAT_RATE_LIMIT=1000,
+            TELEGRAM_CHAT_BURST=1000,
+            TELEGRAM_GLOBAL_RATE_LIMIT=1000,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        get_client.cache_clear()
+        self.addCleanup(get_client.cache_clear)
+
+    @property
+    def sent_texts(self) -> list:
+        return [message["text"] for message in self.telegram.messages]
+
+
 class UnauthenticatedBorrowingApiTests(TestCase):
     def setUp(self) -> None:
         self.client = APIClient()
@@ -99,8 +176,9 @@ class UnauthenticatedBorrowingApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class AuthenticatedBorrowingApiTests(TestCase):
+class AuthenticatedBorrowingApiTests(FakeTelegramMixin, TestCase):
     def setUp(self) -> None:
+        super().setUp()
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             email="test@test.com", password="test12345"
@@ -145,7 +223,7 @@ class AuthenticatedBorrowingApiTests(TestCase):
         serializer = BorrowingListSerializer(borrowings, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_list_borrowings_filtering_active_status(self) -> None:
         payload = {"actual_return_date": "2025-08-31"}
@@ -165,7 +243,7 @@ class AuthenticatedBorrowingApiTests(TestCase):
         ).qs
 
         serializer = BorrowingListSerializer(filtered_qs, many=True)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_list_borrowings_filtering_inactive_status(self) -> None:
         payload = {"actual_return_date": "2025-08-31"}
@@ -185,7 +263,7 @@ class AuthenticatedBorrowingApiTests(TestCase):
         ).qs
 
         serializer = BorrowingListSerializer(filtered_qs, many=True)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_borrowing_retrieve(self) -> None:
         url = reverse("borrowings:borrowing-detail", args=[self.borrowing.id])
@@ -202,13 +280,14 @@ class AuthenticatedBorrowingApiTests(TestCase):
         self.assertNotEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
 
-    @patch("telegram.Bot.send_message", new_callable=AsyncMock)
-    def test_create_borrowing_triggers_telegram(self, mock_send_message) -> None:
+    @patch("borrowings.serializers.send_pending_notifications.delay")
+    def test_create_borrowing_queues_telegram_notification(self, mock_delay) -> None:
         payload = {
             "expected_return_date": "2025-09-30",
             "book": self.book1.id,
         }
-        res = self.client.post(BORROWINGS_URL, payload)
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(BORROWINGS_URL, payload)
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
         borrowing = Borrowing.objects.get(pk=res.data["id"])
@@ -220,18 +299,16 @@ class AuthenticatedBorrowingApiTests(TestCase):
         ).date()
         self.assertEqual(borrowing.expected_return_date, expected_date)
 
-        self.assertEqual(mock_send_message.await_count, 1)
-
-        kwargs = mock_send_message.call_args.kwargs
+        self.assertEqual(self.telegram.messages, [])
+        mock_delay.assert_called_once()
 
-        self.assertIn(borrowing.book.title, kwargs["text"])
-        self.assertIn(str(borrowing.expected_return_date), kwargs["text"])
-        self.assertIn(self.user.email, kwargs["text"])
+        notification = Notification.objects.get()
+        self.assertIsNone(notification.sent_at)
+        self.assertIn(borrowing.book.title, notification.message)
+        self.assertIn(str(borrowing.expected_return_date), notification.message)
+        self.assertIn(self.user.email, notification.message)
 
-    @patch("telegram.Bot.send_message", new_callable=AsyncMock)
-    def test_check_book_inventory_after_create_borrowing(
-            self, mock_send_message
-    ) -> None:
+    def test_check_book_inventory_after_create_borrowing(self) -> None:
         payload = {
             "expected_return_date": "2025-09-30",
             "book": self.book1.id,
@@ -247,13 +324,25 @@ class AuthenticatedBorrowingApiTests(TestCase):
             msg="The book inventory should decrease after borrowing."
         )
 
-        mock_send_message.assert_called_once()
-        kwargs = mock_send_message.call_args.kwargs
-        self.assertEqual(kwargs["chat_id"], settings.TELEGRAM_CHAT_ID)
-        self.assertIn(self.book1.title, kwargs["text"])
+        self.assertEqual(send_pending_notifications(), 1)
+        [message] = self.telegram.messages
+        self.assertEqual(str(message["chat_id"]), settings.TELEGRAM_CHAT_ID)
+        self.assertEqual(message["parse_mode"], "HTML")
+        self.assertIn(self.book1.title, message["text"])
+
+    def test_borrow_and_return_invalidate_book_catalog(self) -> None:
+        book_url = reverse("books:book-detail", args=[self.book2.id])
+        self.client.get(book_url)
+
+        payload = {"expected_return_date": days_from_today(14), "book": self.book2.id}
+        res = self.client.post(BORROWINGS_URL, payload)
+        self.assertEqual(self.client.get(book_url).data["inventory"], 1)
+
+        return_url = reverse("borrowings:borrowing-return", args=[res.data["id"]])
+        self.client.patch(return_url, {"actual_return_date": str(date.today())})
+        self.assertEqual(self.client.get(book_url).data["inventory"], 2)
 
-    @patch("telegram.Bot.send_message", new_callable=AsyncMock)
-    def test_check_book_out_of_stock(self, mock_send_message) -> None:
+    def test_check_book_out_of_stock(self) -> None:
         payload = {
             "expected_return_date": "2025-09-30",
             "book": self.book1.id,
@@ -274,7 +363,7 @@ class AuthenticatedBorrowingApiTests(TestCase):
         expected_message = "The book is out of stock."
         self.assertEqual(response_data, [expected_message])
 
-        mock_send_message.assert_called_once()
+        self.assertEqual(Notification.objects.count(), 1)
 
     def test_create_borrowing_with_expected_return_date_past(self) -> None:
         payload = {
@@ -299,6 +388,16 @@ class AuthenticatedBorrowingApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
+    def test_return_borrowing_with_token(self) -> None:
+        url = reverse("borrowings:borrowing-return", args=[self.borrowing.id])
+        token = TokenObtainPairSerializer.get_token(self.user).access_token
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        res = client.patch(url, {"actual_return_date": str(date.today())})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
     def test_return_borrowing_with_past_date(self) -> None:
         url = reverse("borrowings:borrowing-return", args=[self.borrowing.id])
 
@@ -372,7 +471,7 @@ class AdminUserBorrowingTest(TestCase):
         serializer = BorrowingListSerializer(borrowings, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_list_borrowings_filtering_is_active_status(self) -> None:
         payload = {"actual_return_date": "2025-09-16"}
@@ -384,7 +483,7 @@ class AdminUserBorrowingTest(TestCase):
         serializer = BorrowingListSerializer(borrowings, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_borrowings_filtering_by_user_id(self) -> None:
         res = self.client.get(BORROWINGS_URL, {"user_id": self.user1.id})
@@ -392,4 +491,1065 @@ class AdminUserBorrowingTest(TestCase):
         serializer = BorrowingListSerializer(borrowings, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
+
+
+class NotificationOutboxTests(FakeTelegramMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.first = Notification.objects.create(message="First")
+        self.second = Notification.objects.create(message="Second")
+
+    def test_send_pending_notifications_marks_sent(self) -> None:
+        sent = send_pending_notifications()
+
+        self.assertEqual(sent, 2)
+        self.assertEqual(self.sent_texts, ["First", "Second"])
+        self.assertFalse(Notification.objects.filter(sent_at__isnull=True).exists())
+
+    def test_send_pending_notifications_skips_sent(self) -> None:
+        send_pending_notifications()
+        self.telegram.reset()
+
+        self.assertEqual(send_pending_notifications(), 0)
+        self.assertEqual(self.telegram.messages, [])
+
+    @patch("borrowings.tasks.send_pending_notifications.delay")
+    def test_send_pending_notifications_in_batches(self, mock_delay) -> None:
+        self.assertEqual(send_pending_notifications(batch_size=1), 1)
+
+        mock_delay.assert_called_once_with(1)
+        self.assertEqual(Notification.objects.filter(sent_at__isnull=True).count(), 1)
+
+    def test_failed_notification_is_rescheduled(self) -> None:
+        self.telegram.fail_next(status=500)
+
+        self.assertEqual(send_pending_notifications(), 1)
+
+        self.first.refresh_from_db()
+        self.assertIsNone(self.first.sent_at)
+        self.assertEqual(self.first.attempts, 1)
+        self.assertIn("Fake failure", self.first.last_error)
+        self.assertGreater(self.first.next_attempt_at, self.first.created_at)
+
+        self.assertEqual(send_pending_notifications(), 0)
+
+    def test_notification_dropped_after_max_attempts(self) -> None:
+        Notification.objects.filter(pk=self.first.pk).update(
+            attempts=settings.NOTIFICATION_MAX_ATTEMPTS
+        )
+
+        self.assertEqual(send_pending_notifications(), 1)
+        self.assertEqual(self.sent_texts, ["Second"])
+
+    def test_claimed_notifications_are_leased_while_sending(self) -> None:
+        claimed_by_others = []
+
+        def send(message):
+            # Another worker draining the outbox mid-batch.
+            claimed_by_others.append(send_pending_notifications())
+
+        with patch("borrowings.tasks.send_telegram_message", side_effect=send):
+            self.assertEqual(send_pending_notifications(), 2)
+
+        self.assertEqual(claimed_by_others, [0, 0])
+        self.assertEqual(
+            list(Notification.objects.values_list("attempts", flat=True)), [1, 1]
+        )
+
+    def test_lease_expires_for_unfinished_batch(self) -> None:
+        # The worker is killed after claiming the batch, before any send.
+        with patch("borrowings.tasks.send_telegram_message", side_effect=SystemExit):
+            with self.assertRaises(SystemExit):
+                send_pending_notifications()
+
+        self.assertEqual(send_pending_notifications(), 0)
+
+        Notification.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(send_pending_notifications(), 2)
+        self.assertEqual(
+            list(Notification.objects.values_list("attempts", flat=True)), [2, 2]
+        )
+
+
+@patch("borrowings.serializers.send_pending_notifications.delay")
+class ConcurrentBorrowingTests(TransactionTestCase):
+    THREADS = 20
+
+    def setUp(self) -> None:
+        self.book = sample_book(title="Popular Book", inventory=5)
+        self.users = [
+            create_user(email=f"reader{i}@test.com", password="readerpass")
+            for i in range(self.THREADS)
+        ]
+
+    def run_concurrently(self, requests) -> list:
+        barrier = threading.Barrier(len(requests))
+        status_codes = []
+
+        def worker(user, method, url, payload):
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                barrier.wait()
+                res = getattr(client, method)(url, payload)
+                status_codes.append(res.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=args) for args in requests]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return status_codes
+
+    def test_concurrent_borrowings_never_oversell(self, mock_delay) -> None:
+        payload = {"expected_return_date": days_from_today(14), "book": self.book.id}
+
+        status_codes = self.run_concurrently(
+            [(user, "post", BORROWINGS_URL, payload) for user in self.users]
+        )
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+        self.assertEqual(status_codes.count(status.HTTP_201_CREATED), 5)
+        self.assertEqual(
+            status_codes.count(status.HTTP_400_BAD_REQUEST), self.THREADS - 5
+        )
+        self.assertEqual(Borrowing.objects.filter(book=self.book).count(), 5)
+
+    def test_concurrent_returns_increment_inventory_once(self, mock_delay) -> None:
+        borrowing = sample_borrowing(user=self.users[0], book=self.book)
+        url = reverse("borrowings:borrowing-return", args=[borrowing.id])
+        payload = {"actual_return_date": str(date.today())}
+
+        status_codes = self.run_concurrently(
+            [(self.users[0], "patch", url, payload)] * 5
+        )
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 6)
+        self.assertEqual(status_codes.count(status.HTTP_200_OK), 1)
+
+
+class BorrowingPaginationTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@admin.com", "Testpass12345", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+
+        book = sample_book(inventory=100)
+        Borrowing.objects.bulk_create(
+            Borrowing(
+                book=book, user=self.user, expected_return_date=days_from_today(14)
+            )
+            for _ in range(25)
+        )
+
+    def test_list_borrowings_is_paginated(self) -> None:
+        res = self.client.get(BORROWINGS_URL, {"page_size": 10})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 10)
+        self.assertIsNotNone(res.data["next"])
+        self.assertIsNone(res.data["previous"])
+
+    def test_cursor_walks_every_borrowing_once(self) -> None:
+        ids = []
+        url = f"{BORROWINGS_URL}?page_size=10"
+        while url:
+            res = self.client.get(url)
+            ids.extend(borrowing["id"] for borrowing in res.data["results"])
+            url = res.data["next"]
+
+        self.assertEqual(
+            ids, list(Borrowing.objects.order_by("borrow_date", "id")
+                      .values_list("id", flat=True))
+        )
+
+    def test_previous_cursor_returns_previous_page(self) -> None:
+        first_page = self.client.get(BORROWINGS_URL, {"page_size": 10})
+        second_page = self.client.get(first_page.data["next"])
+        previous_page = self.client.get(second_page.data["previous"])
+
+        self.assertEqual(previous_page.data["results"], first_page.data["results"])
+        self.assertIsNone(previous_page.data["previous"])
+
+    def test_invalid_cursor(self) -> None:
+        res = self.client.get(BORROWINGS_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AsyncBorrowingViewTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = create_user(email="reader@test.com", password="Testpass12345")
+        self.other_user = create_user(email="other@test.com", password="Testpass12345")
+        self.book = sample_book()
+        self.borrowing = sample_borrowing(user=self.user, book=self.book)
+        self.other_borrowing = sample_borrowing(user=self.other_user, book=self.book)
+
+        token = TokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_list_with_bearer_token(self) -> None:
+        res = self.client.get(BORROWINGS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [borrowing["id"] for borrowing in res.data["results"]],
+            [self.borrowing.id],
+        )
+
+    def test_invalid_token(self) -> None:
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer not-a-token")
+
+        res = self.client.get(BORROWINGS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("WWW-Authenticate", res.headers)
+
+    def test_invalid_filter(self) -> None:
+        res = self.client.get(BORROWINGS_URL, {"user_id": "abc"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("user_id", res.data)
+
+    def test_retrieve_own_borrowing(self) -> None:
+        res = self.client.get(detail_url(self.borrowing.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["user"], self.user.email)
+        self.assertEqual(res.data["book"]["id"], self.book.id)
+
+    def test_retrieve_other_users_borrowing(self) -> None:
+        res = self.client.get(detail_url(self.other_borrowing.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_create_is_served_by_sync_view(self) -> None:
+        res = self.client.post(
+            BORROWINGS_URL,
+            {"book": self.book.id, "expected_return_date": days_from_today(7)},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+
+@skipUnless(replica_configured(), "Needs a replica alias (POSTGRES_REPLICA_HOST)")
+class ReplicaRoutingTests(TransactionTestCase):
+    # The runner checks every class's aliases, skipped or not.
+    databases = {"default", REPLICA_DB_ALIAS} if replica_configured() else set()
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(email="reader@test.com", password="Testpass12345")
+        self.client.force_authenticate(self.user)
+        self.book = sample_book()
+        sample_borrowing(user=self.user, book=self.book)
+
+    def get(self, url) -> tuple[int, int]:
+        """Queries run on the primary and the replica while fetching ``url``."""
+        with CaptureQueriesContext(connections["default"]) as primary, \
+                CaptureQueriesContext(connections[REPLICA_DB_ALIAS]) as replica:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return len(primary), len(replica)
+
+    def test_list_reads_from_replica(self) -> None:
+        primary, replica = self.get(BORROWINGS_URL)
+
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    @patch("borrowings.serializers.send_pending_notifications.delay")
+    def test_user_reads_from_primary_after_borrowing(self, mock_delay) -> None:
+        res = self.client.post(
+            BORROWINGS_URL,
+            {"book": self.book.id, "expected_return_date": days_from_today(7)},
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        primary, replica = self.get(BORROWINGS_URL)
+
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_other_users_still_read_from_replica(self) -> None:
+        sample_borrowing(book=self.book)
+        other_user = get_user_model().objects.get(email="borrower@test.com")
+        self.client.force_authenticate(other_user)
+
+        primary, replica = self.get(BORROWINGS_URL)
+
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_catalog_reads_from_primary_after_change(self) -> None:
+        invalidate_catalog()
+
+        primary, replica = self.get(reverse("books:book-list"))
+
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_transactions_read_from_primary(self) -> None:
+        self.assertEqual(read_replica(), REPLICA_DB_ALIAS)
+        with transaction.atomic(), use_replica():
+            self.assertEqual(Borrowing.objects.all().db, "default")
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN output is Postgres-specific")
+class BorrowingIndexTests(TestCase):
+    def setUp(self) -> None:
+        self.user = create_user(email="reader@test.com", password="readerpass")
+        book = sample_book(inventory=100)
+        Borrowing.objects.bulk_create(
+            Borrowing(
+                book=book, user=self.user, expected_return_date=days_from_today(14)
+            )
+            for _ in range(10)
+        )
+        # Most loans are returned and belong to others, as in production, so
+        # the partial and per-user indexes are the selective ones.
+        other_user = create_user(email="other@test.com", password="otherpass")
+        Borrowing.objects.bulk_create(
+            Borrowing(
+                book=book,
+                user=other_user,
+                expected_return_date=days_from_today(14),
+                actual_return_date=date.today(),
+            )
+            for _ in range(500)
+        )
+
+        # The test tables are tiny, so stop the planner preferring a seq scan.
+        # Fresh statistics keep it from costing the partial indexes on rows
+        # other tests left behind.
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"ANALYZE {Borrowing._meta.db_table}")
+
+    def assertUsesIndex(self, queryset, index_name) -> None:
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, msg=plan)
+
+    def test_overdue_query_uses_partial_index(self) -> None:
+        queryset = Borrowing.objects.filter(
+            expected_return_date__lt=date.today(),
+            actual_return_date__isnull=True,
+        )
+
+        self.assertUsesIndex(queryset, "borrowing_overdue_idx")
+
+    def test_active_query_uses_partial_index(self) -> None:
+        # A page of the active list, in the list's order.
+        queryset = Borrowing.objects.filter(actual_return_date__isnull=True)[:5]
+
+        self.assertUsesIndex(queryset, "borrowing_active_idx")
+
+    def test_list_page_uses_ordering_index(self) -> None:
+        queryset = Borrowing.objects.order_by("borrow_date", "id")[:10]
+
+        self.assertUsesIndex(queryset, "borrowing_borrow_date_idx")
+
+    def test_user_history_uses_composite_index(self) -> None:
+        queryset = Borrowing.objects.filter(user=self.user)
+
+        self.assertUsesIndex(queryset, "borrowing_user_borrow_date_idx")
+
+
+class OverdueNotificationTests(FakeTelegramMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = create_user(email="late@test.com", password="latepass")
+        self.book = sample_book(title="Overdue Book", inventory=100)
+
+    def create_overdue(self, count: int) -> None:
+        borrowings = Borrowing.objects.bulk_create(
+            Borrowing(book=self.book, user=self.user) for _ in range(count)
+        )
+        # borrow_date is auto_now_add, so backdate the loans after inserting.
+        Borrowing.objects.filter(pk__in=[b.pk for b in borrowings]).update(
+            borrow_date=date.today() - timedelta(days=15),
+            expected_return_date=date.today() - timedelta(days=1),
+        )
+
+    def test_no_overdue_borrowings(self) -> None:
+        sample_borrowing(user=self.user, book=self.book)
+
+        self.assertEqual(notify_overdue_borrowings(), 0)
+
+        self.assertEqual(self.sent_texts, ["No overdue borrowing today!"])
+
+    def test_overdue_borrowings_sent_as_one_digest(self) -> None:
+        self.create_overdue(3)
+        Borrowing.objects.filter(pk=Borrowing.objects.first().pk).update(
+            actual_return_date=date.today()
+        )
+        self.create_overdue(1)
+
+        self.assertEqual(notify_overdue_borrowings(), 1)
+
+        [text] = self.sent_texts
+        self.assertEqual(text.count(self.book.title), 3)
+        self.assertIn(self.user.email, text)
+        self.assertIn("<b>Fine so far:</b> 2.00", text)
+
+    def test_large_digest_split_under_message_limit(self) -> None:
+        self.create_overdue(100)
+
+        sent = notify_overdue_borrowings()
+
+        self.assertGreater(sent, 1)
+        texts = self.sent_texts
+        self.assertEqual(len(texts), sent)
+        self.assertTrue(all(len(text) <= 4096 for text in texts))
+        self.assertEqual(sum(text.count(self.book.title) for text in texts), 100)
+
+    def test_digest_builder_packs_entries(self) -> None:
+        digest = DigestBuilder("Header", limit=20)
+
+        self.assertIsNone(digest.add("a" * 5))
+        self.assertIsNone(digest.add("b" * 5))
+        self.assertEqual(digest.add("c" * 5), "Header\n\naaaaa\n\nbbbbb")
+        self.assertEqual(digest.flush(), "Header\n\nccccc")
+        self.assertIsNone(digest.flush())
+
+
+class TelegramClientTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.telegram = FakeTelegramServer().start()
+        cls.addClassCleanup(cls.telegram.stop)
+
+    def setUp(self) -> None:
+        self.telegram.reset()
+        self.client = TelegramClient(
+            "123:abc",
+            "42",
+            api_url=self.telegram.url,
+            chat_rate=1000,
+            chat_burst=1000,
+            global_rate=1000,
+        )
+        self.addCleanup(self.client.close)
+
+    def test_send_message(self) -> None:
+        result = self.client.send_message("Hello")
+
+        self.assertEqual(result["text"], "Hello")
+        self.assertEqual(
+            self.telegram.messages,
+            [{"chat_id": "42", "text": "Hello", "parse_mode": "HTML"}],
+        )
+
+    def test_send_message_reuses_http_client(self) -> None:
+        self.client.send_message("First")
+        http = self.client.http
+        self.client.send_message("Second")
+
+        self.assertIs(self.client.http, http)
+        self.assertEqual(len(self.telegram.messages), 2)
+
+    def test_retries_after_rate_limit(self) -> None:
+        self.telegram.fail_next(status=429, times=2, retry_after=0)
+
+        self.client.send_message("Hello")
+
+        self.assertEqual(len(self.telegram.messages), 1)
+
+    def test_rate_limit_retries_exhausted(self) -> None:
+        self.telegram.fail_next(status=429, times=10, retry_after=0)
+
+        with self.assertRaises(TelegramError):
+            self.client.send_message("Hello")
+
+    def test_error_response_raises(self) -> None:
+        self.telegram.fail_next(status=400)
+
+        with self.assertRaisesMessage(TelegramError, "Fake failure"):
+            self.client.send_message("Hello")
+
+    def test_metrics(self) -> None:
+        def failures(reason):
+            return metric_value(
+                metrics.TELEGRAM_FAILURES,
+                "library_telegram_failures_total",
+                method="sendMessage",
+                reason=reason,
+            )
+
+        def calls():
+            return metric_value(
+                metrics.TELEGRAM_REQUEST_DURATION,
+                "library_telegram_request_duration_seconds_count",
+                method="sendMessage",
+            )
+
+        before = calls(), failures("rate_limited"), failures("api_error")
+        self.telegram.fail_next(status=429, times=2, retry_after=0)
+        self.client.send_message("Hello")
+        self.telegram.fail_next(status=400)
+        with self.assertRaises(TelegramError):
+            self.client.send_message("Hello")
+
+        self.assertEqual(calls() - before[0], 4)
+        self.assertEqual(failures("rate_limited") - before[1], 2)
+        self.assertEqual(failures("api_error") - before[2], 1)
+
+    def test_async_session_sends_concurrently(self) -> None:
+        async def send_all():
+            async with self.client.session() as session:
+                await asyncio.gather(
+                    *(session.send_message(f"Message {i}") for i in range(10))
+                )
+
+        asyncio.run(send_all())
+
+        self.assertEqual(len(self.telegram.messages), 10)
+
+    def test_retry_after_without_json_body(self) -> None:
+        response = httpx.Response(429, text="Too Many Requests")
+
+        self.assertEqual(TelegramClient.retry_after(response), 1.0)
+
+    def test_transports(self) -> None:
+        def handler(request):
+            payload = json.loads(request.content)
+            return httpx.Response(200, json={"ok": True, "result": payload})
+
+        client = TelegramClient(
+            "123:abc",
+            "42",
+            transport=httpx.MockTransport(handler),
+            async_transport=httpx.MockTransport(handler),
+        )
+        self.addCleanup(client.close)
+
+        async def send():
+            async with client.session() as session:
+                return await session.send_message("Async")
+
+        self.assertEqual(client.send_message("Sync")["text"], "Sync")
+        self.assertEqual(asyncio.run(send())["text"], "Async")
+        self.assertEqual(self.telegram.messages, [])
+
+    def test_default_chat_limit_fits_group_chats(self) -> None:
+        bucket = TokenBucket(
+            settings.TELEGRAM_CHAT_RATE_LIMIT, settings.TELEGRAM_CHAT_BURST
+        )
+
+        waits = [bucket.reserve() for _ in range(21)]
+
+        # Telegram takes 20 messages a minute in a group chat.
+        self.assertGreaterEqual(waits[-1], 60)
+
+    def test_chat_rate_limit_spaces_messages(self) -> None:
+        bucket = TokenBucket(rate=10, capacity=2)
+
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1, places=2)
+        self.assertAlmostEqual(bucket.reserve(), 0.2, places=2)
+
+
+@patch("borrowings.serializers.send_pending_notifications.delay")
+class BulkBorrowingApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = create_user(email="desk@test.com", password="deskpass")
+        self.client.force_authenticate(self.user)
+
+        self.book1 = sample_book(title="Bulk Title1", inventory=2)
+        self.book2 = sample_book(title="Bulk Title2", inventory=1)
+
+    def bulk_borrow(self, *books):
+        payload = [
+            {"book": book.id, "expected_return_date": days_from_today(14)}
+            for book in books
+        ]
+        return self.client.post(BULK_BORROW_URL, payload, format="json")
+
+    def test_bulk_borrow(self, mock_delay) -> None:
+        res = self.bulk_borrow(self.book1, self.book1, self.book2)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 3)
+        self.assertTrue(all(item["id"] for item in res.data))
+        self.assertEqual(Borrowing.objects.filter(user=self.user).count(), 3)
+
+        self.book1.refresh_from_db()
+        self.book2.refresh_from_db()
+        self.assertEqual(self.book1.inventory, 0)
+        self.assertEqual(self.book2.inventory, 0)
+
+        notification = Notification.objects.get()
+        self.assertEqual(notification.message.count(self.user.email), 3)
+
+    def test_bulk_borrow_out_of_stock_borrows_nothing(self, mock_delay) -> None:
+        res = self.bulk_borrow(self.book1, self.book2, self.book2)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Borrowing.objects.exists())
+        self.book1.refresh_from_db()
+        self.assertEqual(self.book1.inventory, 2)
+
+    def test_bulk_borrow_validates_each_item(self, mock_delay) -> None:
+        payload = [
+            {"book": self.book1.id, "expected_return_date": days_from_today(14)},
+            {"book": self.book2.id, "expected_return_date": days_from_today(-1)},
+        ]
+        res = self.client.post(BULK_BORROW_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn("expected_return_date", res.data[1])
+        self.assertFalse(Borrowing.objects.exists())
+
+    def test_bulk_borrow_empty_list(self, mock_delay) -> None:
+        res = self.client.post(BULK_BORROW_URL, [], format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_return(self, mock_delay) -> None:
+        borrowed = self.bulk_borrow(self.book1, self.book1, self.book2).data
+        payload = [
+            {"id": borrowed[0]["id"], "actual_return_date": str(date.today())},
+            {"id": borrowed[1]["id"]},
+            {"id": borrowed[2]["id"]},
+        ]
+
+        res = self.client.post(BULK_RETURN_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(
+            Borrowing.objects.filter(actual_return_date__isnull=True).exists()
+        )
+        self.book1.refresh_from_db()
+        self.book2.refresh_from_db()
+        self.assertEqual(self.book1.inventory, 2)
+        self.assertEqual(self.book2.inventory, 1)
+
+    def test_bulk_return_already_returned(self, mock_delay) -> None:
+        borrowed = self.bulk_borrow(self.book1, self.book2).data
+        payload = [{"id": borrowed[0]["id"]}]
+        self.client.post(BULK_RETURN_URL, payload, format="json")
+
+        payload.append({"id": borrowed[1]["id"]})
+        res = self.client.post(BULK_RETURN_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        second = Borrowing.objects.get(pk=borrowed[1]["id"])
+        self.assertIsNone(second.actual_return_date)
+        self.book1.refresh_from_db()
+        self.assertEqual(self.book1.inventory, 2)
+
+    def test_bulk_return_other_users_borrowing(self, mock_delay) -> None:
+        borrowing = sample_borrowing(book=self.book1)
+
+        res = self.client.post(
+            BULK_RETURN_URL, [{"id": borrowing.id}], format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        borrowing.refresh_from_db()
+        self.assertIsNone(borrowing.actual_return_date)
+
+    def test_bulk_return_duplicate_ids(self, mock_delay) -> None:
+        borrowed = self.bulk_borrow(self.book1).data
+        payload = [{"id": borrowed[0]["id"]}, {"id": borrowed[0]["id"]}]
+
+        res = self.client.post(BULK_RETURN_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_return_date_before_borrow_date(self, mock_delay) -> None:
+        borrowed = self.bulk_borrow(self.book1).data
+        payload = [
+            {"id": borrowed[0]["id"], "actual_return_date": days_from_today(-1)}
+        ]
+
+        res = self.client.post(BULK_RETURN_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@patch("borrowings.serializers.send_pending_notifications.delay")
+class BookStatsTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = create_user(email="stats@test.com", password="statspass")
+        self.client.force_authenticate(self.user)
+
+        self.book1 = sample_book(title="Stats Title1", inventory=3)
+        self.book2 = sample_book(title="Stats Title2", inventory=3)
+
+    def borrow(self, *books):
+        payload = [
+            {"book": book.id, "expected_return_date": days_from_today(14)}
+            for book in books
+        ]
+        res = self.client.post(BULK_BORROW_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return [item["id"] for item in res.data]
+
+    def stats(self, book):
+        return BookStats.objects.get(book=book)
+
+    def test_borrow_counts_loans(self, mock_delay) -> None:
+        self.borrow(self.book1, self.book1, self.book2)
+        self.client.post(
+            BORROWINGS_URL,
+            {"book": self.book1.id, "expected_return_date": days_from_today(7)},
+        )
+
+        stats = self.stats(self.book1)
+        self.assertEqual(stats.active_loans, 3)
+        self.assertEqual(stats.total_loans, 3)
+        self.assertEqual(stats.last_borrow_date, date.today())
+        self.assertEqual(self.stats(self.book2).active_loans, 1)
+
+    def test_return_ends_active_loans(self, mock_delay) -> None:
+        first, second, _ = self.borrow(self.book1, self.book1, self.book2)
+
+        self.client.post(BULK_RETURN_URL, [{"id": first}], format="json")
+        url = reverse("borrowings:borrowing-return", args=[second])
+        self.client.patch(url, {})
+
+        stats = self.stats(self.book1)
+        self.assertEqual(stats.active_loans, 0)
+        self.assertEqual(stats.total_loans, 2)
+        self.assertEqual(self.stats(self.book2).active_loans, 1)
+
+    def test_refresh_counts_overdue_loans(self, mock_delay) -> None:
+        (borrowing_id,) = self.borrow(self.book1)
+        Borrowing.objects.filter(pk=borrowing_id).update(
+            borrow_date=date.today() - timedelta(days=20),
+            expected_return_date=date.today() - timedelta(days=6),
+        )
+
+        self.assertEqual(refresh_book_overdue_loans(), 1)
+        self.assertEqual(refresh_book_overdue_loans(), 0)
+        self.assertEqual(self.stats(self.book1).overdue_loans, 1)
+
+        self.client.post(BULK_RETURN_URL, [{"id": borrowing_id}], format="json")
+        self.assertEqual(self.stats(self.book1).overdue_loans, 0)
+
+    def test_book_api_exposes_stats(self, mock_delay) -> None:
+        self.borrow(self.book1)
+
+        res = self.client.get(reverse("books:book-list"))
+
+        stats = {book["id"]: book["stats"] for book in res.data["results"]}
+        self.assertEqual(stats[self.book1.id]["active_loans"], 1)
+        self.assertEqual(stats[self.book2.id]["total_loans"], 0)
+
+
+class ArchiveBorrowingsTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = create_user(email="archive@test.com", password="archivepass")
+        self.client.force_authenticate(self.user)
+        self.book = sample_book()
+
+        self.old = [
+            sample_borrowing(user=self.user, book=self.book) for _ in range(3)
+        ]
+        long_ago = date.today() - timedelta(days=400)
+        Borrowing.objects.filter(pk__in=[b.pk for b in self.old]).update(
+            borrow_date=long_ago,
+            expected_return_date=long_ago + timedelta(days=14),
+            actual_return_date=long_ago + timedelta(days=10),
+        )
+        self.recent = sample_borrowing(
+            user=self.user, book=self.book, actual_return_date=date.today()
+        )
+        self.active = sample_borrowing(user=self.user, book=self.book)
+
+    def archive(self, *args) -> str:
+        out = io.StringIO()
+        call_command("archive_borrowings", *args, stdout=out)
+        return out.getvalue()
+
+    def test_archives_old_returned_borrowings_in_batches(self) -> None:
+        output = self.archive("--batch-size", "2")
+
+        self.assertIn("Archived 3 borrowings", output)
+        self.assertEqual(
+            sorted(ArchivedBorrowing.objects.values_list("id", flat=True)),
+            [borrowing.id for borrowing in self.old],
+        )
+        self.assertEqual(
+            set(Borrowing.objects.values_list("id", flat=True)),
+            {self.recent.id, self.active.id},
+        )
+
+    def test_history_api_includes_archive(self) -> None:
+        self.archive()
+
+        res = self.client.get(BORROWINGS_URL)
+        ids = [item["id"] for item in res.data["results"]]
+        self.assertEqual(len(ids), 5)
+        self.assertTrue({borrowing.id for borrowing in self.old} <= set(ids))
+
+        res = self.client.get(BORROWINGS_URL, {"is_active": "true"})
+        self.assertEqual([item["id"] for item in res.data["results"]], [self.active.id])
+
+        res = self.client.get(detail_url(self.old[0].id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["book"]["id"], self.book.id)
+
+
+@override_settings(FINE_MULTIPLIER=2)
+@patch("borrowings.serializers.send_pending_notifications.delay")
+class FeeEngineTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = create_user(email="fees@test.com", password="feespass")
+        self.client.force_authenticate(self.user)
+        self.book = sample_book(daily_fee=Decimal("1.50"))
+
+    def borrowed(self, days_ago: int, due_days_ago: int) -> Borrowing:
+        borrowing = sample_borrowing(user=self.user, book=self.book)
+        Borrowing.objects.filter(pk=borrowing.pk).update(
+            borrow_date=date.today() - timedelta(days=days_ago),
+            expected_return_date=date.today() - timedelta(days=due_days_ago),
+        )
+        borrowing.refresh_from_db()
+        return borrowing
+
+    def test_borrowing_charges(self, mock_delay) -> None:
+        borrowing = self.borrowed(days_ago=10, due_days_ago=3)
+
+        self.assertEqual(
+            borrowing_charges(borrowing, date.today()),
+            (Decimal("15.00"), Decimal("9.00")),
+        )
+        self.assertEqual(
+            borrowing_charges(borrowing, borrowing.borrow_date),
+            (Decimal("1.50"), Decimal("0.00")),
+        )
+
+    def test_return_records_charges(self, mock_delay) -> None:
+        borrowing = self.borrowed(days_ago=10, due_days_ago=3)
+        url = reverse("borrowings:borrowing-return", args=[borrowing.id])
+
+        res = self.client.patch(url, {})
+
+        self.assertEqual(res.data["fee"], "15.00")
+        self.assertEqual(res.data["fine"], "9.00")
+        borrowing.refresh_from_db()
+        self.assertEqual(
+            (borrowing.fee, borrowing.fine), (Decimal("15.00"), Decimal("9.00"))
+        )
+
+    def test_bulk_return_records_charges(self, mock_delay) -> None:
+        late = self.borrowed(days_ago=10, due_days_ago=3)
+        on_time = sample_borrowing(user=self.user, book=self.book)
+
+        self.client.post(
+            BULK_RETURN_URL, [{"id": late.id}, {"id": on_time.id}], format="json"
+        )
+
+        charges = dict(
+            Borrowing.objects.values_list("id", "fine").filter(
+                id__in=[late.id, on_time.id]
+            )
+        )
+        self.assertEqual(
+            charges, {late.id: Decimal("9.00"), on_time.id: Decimal("0.00")}
+        )
+
+    def test_outstanding_fines_match_single_fines(self, mock_delay) -> None:
+        for due_days_ago in (1, 5, 30):
+            self.borrowed(days_ago=40, due_days_ago=due_days_ago)
+        self.borrowed(days_ago=5, due_days_ago=-5)
+        today = date.today()
+
+        fines = outstanding_fines(Borrowing.objects.all(), today)
+
+        self.assertEqual(len(fines), 3)
+        for borrowing in fines:
+            self.assertEqual(
+                borrowing.fine_due,
+                fine_for(
+                    self.book.daily_fee, today - borrowing.expected_return_date
+                ),
+            )
+
+
+@override_settings(FINE_MULTIPLIER=2)
+@patch("borrowings.serializers.send_pending_notifications.delay")
+class BorrowingSummaryTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(email="summary@test.com", password="summarypass")
+        token = TokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.book = sample_book(daily_fee=Decimal("2.00"))
+
+        sample_borrowing(user=self.user, book=self.book)
+        overdue = sample_borrowing(user=self.user, book=self.book)
+        returned = sample_borrowing(user=self.user, book=self.book)
+        Borrowing.objects.filter(pk=overdue.pk).update(
+            borrow_date=date.today() - timedelta(days=10),
+            expected_return_date=date.today() - timedelta(days=3),
+        )
+        Borrowing.objects.filter(pk=returned.pk).update(
+            actual_return_date=date.today(), fee="4.00", fine="1.00"
+        )
+        sample_borrowing(
+            user=create_user(email="other@test.com", password="otherpass"),
+            book=self.book,
+        )
+
+    def test_summary(self, mock_delay) -> None:
+        # The token's user state, then the summary; both are cached after.
+        with self.assertNumQueries(2):
+            res = self.client.get(SUMMARY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            {
+                "active": 2,
+                "overdue": 1,
+                "returned": 1,
+                "fees": "4.00",
+                "fines": "1.00",
+                "fines_accruing": "12.00",
+                "amount_owed": "17.00",
+            },
+        )
+
+    def test_summary_cached_until_borrow(self, mock_delay) -> None:
+        self.client.get(SUMMARY_URL)
+
+        with self.assertNumQueries(0):
+            self.client.get(SUMMARY_URL)
+
+        self.client.post(
+            BORROWINGS_URL,
+            {"book": self.book.id, "expected_return_date": days_from_today(7)},
+        )
+        self.assertEqual(self.client.get(SUMMARY_URL).data["active"], 3)
+
+    def test_summary_requires_authentication(self, mock_delay) -> None:
+        res = APIClient().get(SUMMARY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class BorrowingValidationTests(TestCase):
+    def setUp(self) -> None:
+        self.user = create_user(email="reader@test.com", password="readerpass")
+        self.book = sample_book()
+
+    def test_save_runs_full_clean_by_default(self) -> None:
+        borrowing = Borrowing(
+            book=self.book,
+            user=self.user,
+            expected_return_date=date.today() - timedelta(days=1),
+        )
+
+        with self.assertRaises(ValidationError):
+            borrowing.save()
+
+    def test_database_enforces_expected_return_date(self) -> None:
+        borrowing = Borrowing(
+            book=self.book,
+            user=self.user,
+            expected_return_date=date.today() - timedelta(days=1),
+        )
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            borrowing.save(validate=False)
+
+    def test_database_enforces_actual_return_date(self) -> None:
+        borrowing = sample_borrowing(user=self.user, book=self.book)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Borrowing.objects.filter(pk=borrowing.pk).update(
+                actual_return_date=date.today() - timedelta(days=1)
+            )
+
+    @patch("borrowings.serializers.send_pending_notifications.delay")
+    def test_borrow_skips_full_clean_queries(self, mock_delay) -> None:
+        client = APIClient()
+        client.force_authenticate(self.user)
+        payload = {"expected_return_date": days_from_today(14), "book": self.book.id}
+
+        # Book lookup, savepoint, inventory update, borrowing insert, book
+        # stats upsert and update, notification insert, release savepoint.
+        with self.assertNumQueries(8):
+            res = client.post(BORROWINGS_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+
+@patch("borrowings.serializers.send_pending_notifications.delay")
+class BorrowingQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(email="budget@test.com", password="budgetpass")
+        self.authorize(self.user)
+
+        self.books = [sample_book(title=f"Budget book {i}") for i in range(3)]
+        self.borrowings = [
+            sample_borrowing(user=self.user, book=book) for book in self.books
+        ]
+        other = create_user(email="other@test.com", password="otherpass")
+        for book in self.books:
+            sample_borrowing(user=other, book=book)
+
+    def authorize(self, user) -> None:
+        token = TokenObtainPairSerializer.get_token(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_every_route_has_a_budget(self, mock_delay) -> None:
+        self.assertRoutesBudgeted("borrowings.urls")
+
+    def test_list(self, mock_delay) -> None:
+        self.assertWithinQueryBudget("GET", BORROWINGS_URL)
+
+    def test_list_as_staff(self, mock_delay) -> None:
+        self.authorize(
+            create_user(email="staff@test.com", password="staffpass", is_staff=True)
+        )
+        self.assertWithinQueryBudget("GET", BORROWINGS_URL)
+
+    def test_retrieve(self, mock_delay) -> None:
+        self.assertWithinQueryBudget("GET", detail_url(self.borrowings[0].id))
+
+    def test_borrow(self, mock_delay) -> None:
+        payload = {"book": self.books[0].id, "expected_return_date": days_from_today(7)}
+        self.assertWithinQueryBudget("POST", BORROWINGS_URL, payload)
+
+    def test_return(self, mock_delay) -> None:
+        for method, borrowing in zip(("PATCH", "PUT"), self.borrowings):
+            url = reverse("borrowings:borrowing-return", args=[borrowing.id])
+            self.assertWithinQueryBudget(method, url, {})
+
+    def test_bulk_borrow(self, mock_delay) -> None:
+        payload = [
+            {"book": book.id, "expected_return_date": days_from_today(7)}
+            for book in self.books
+        ]
+        self.assertWithinQueryBudget("POST", BULK_BORROW_URL, payload, format="json")
+
+    def test_bulk_return(self, mock_delay) -> None:
+        payload = [{"id": borrowing.id} for borrowing in self.borrowings]
+        self.assertWithinQueryBudget("POST", BULK_RETURN_URL, payload, format="json")
+
+    def test_summary(self, mock_delay) -> None:
+        self.assertWithinQueryBudget("GET", SUMMARY_URL)
@@ -1,7 +1,12 @@
 from django.urls import path
-from borrowings.views import (
+from borrowings.async_views import (
     BorrowingListView,
     BorrowingRetrieveView,
+    BorrowingSummaryView,
+)
+from borrowings.views import (
+    BorrowingBulkCreateView,
+    BorrowingBulkReturnView,
     BorrowingReturnView,
 )
 
@@ -20,4 +25,19 @@ urlpatterns = [
         BorrowingReturnView.as_view(),
         name="borrowing-return"
     ),
+    path(
+        "borrowings/bulk/",
+        BorrowingBulkCreateView.as_view(),
+        name="borrowing-bulk-create"
+    ),
+    path(
+        "borrowings/bulk-return/",
+        BorrowingBulkReturnView.as_view(),
+        name="borrowing-bulk-return"
+    ),
+    path(
+        "me/borrowings/summary/",
+        BorrowingSummaryView.as_view(),
+        name="borrowing-summary"
+    ),
 ]
@@ -1,25 +1,47 @@
+from datetime import date
+
 from django.db import transaction
-from django.shortcuts import get_object_or_404
+from django.db.models import F
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from borrowings.fees import borrowing_charges
 from borrowings.filters import BorrowingFilter
 
-from borrowings.models import Borrowing
+from books.cache import invalidate_catalog
+from books.models import Book
+from borrowings.models import Borrowing, BorrowingHistory
+from borrowings.pagination import BorrowingCursorPagination
+from borrowings.stats import record_returns
+from borrowings.summary import invalidate_summary
+from library_service_project.db_routers import (
+    ReplicaReadMixin,
+    pin_to_primary,
+    user_pin,
+)
 from borrowings.serializers import (
     BorrowingListSerializer,
-    BorrowingDetailSerializer,
     CreateBorrowingSerializer,
     BorrowingReturnSerializer,
+    BorrowingBulkReturnSerializer,
 )
 
 
-class BorrowingListView(generics.ListCreateAPIView):
+class BulkSerializerMixin:
+    max_items = 100
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.update(many=True, allow_empty=False, max_length=self.max_items)
+        return super().get_serializer(*args, **kwargs)
+
+
+class BorrowingListView(ReplicaReadMixin, generics.ListCreateAPIView):
     serializer_class = BorrowingListSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_class = BorrowingFilter
+    pagination_class = BorrowingCursorPagination
 
     def get_serializer_class(self):
         if self.request.method == "POST":
@@ -28,32 +50,14 @@ class BorrowingListView(generics.ListCreateAPIView):
             return BorrowingListSerializer
 
     def get_queryset(self):
-        queryset = Borrowing.objects.select_related("book", "user")
+        queryset = BorrowingHistory.objects.select_related("book", "user")
 
         if not self.request.user.is_staff:
-            queryset = queryset.filter(user=self.request.user)
+            queryset = queryset.filter(user_id=self.request.user.id)
 
         return queryset
 
 
-class BorrowingRetrieveView(generics.RetrieveAPIView):
-    serializer_class = BorrowingDetailSerializer
-    permission_classes = [IsAuthenticated]
-
-    def get_queryset(self):
-        queryset = Borrowing.objects.select_related("book", "user")
-        if self.request.user.is_staff:
-            return queryset
-        else:
-            return Borrowing.objects.filter(user=self.request.user)
-
-    def get_object(self):
-        queryset = self.get_queryset()
-        obj = get_object_or_404(queryset, pk=self.kwargs["pk"])
-        self.check_object_permissions(self.request, obj)
-        return obj
-
-
 class BorrowingReturnView(generics.UpdateAPIView):
     queryset = Borrowing.objects.select_related("book", "user")
     permission_classes = [IsAuthenticated]
@@ -62,7 +66,7 @@ class BorrowingReturnView(generics.UpdateAPIView):
     def update(self, request, *args, **kwargs) -> Response:
         instance = self.get_object()
 
-        if instance.user != request.user:
+        if instance.user_id != request.user.id:
             return Response(
                 {"detail": "You do not have permission to return this borrowing."},
                 status=status.HTTP_403_FORBIDDEN
@@ -75,11 +79,55 @@ class BorrowingReturnView(generics.UpdateAPIView):
         serializer = self.get_serializer(instance, data=request.data)
         serializer.is_valid(raise_exception=True)
 
+        actual_return_date = (
+            serializer.validated_data.get("actual_return_date") or date.today()
+        )
+        fee, fine = borrowing_charges(instance, actual_return_date)
+
         with transaction.atomic():
-            serializer.save()
+            returned = Borrowing.objects.filter(
+                pk=instance.pk, actual_return_date__isnull=True
+            ).update(actual_return_date=actual_return_date, fee=fee, fine=fine)
+
+            if not returned:
+                return Response(
+                    {"detail": "This borrowing has already been returned."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            Book.objects.filter(pk=instance.book_id).update(
+                inventory=F("inventory") + 1
+            )
+            record_returns([instance])
+            invalidate_catalog()
+            pin_to_primary(user_pin(request.user.id))
+            invalidate_summary(request.user.id)
+
+        return Response(
+            {
+                "detail": "Borrowing returned successfully.",
+                "fee": str(fee),
+                "fine": str(fine),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class BorrowingBulkCreateView(BulkSerializerMixin, generics.CreateAPIView):
+    serializer_class = CreateBorrowingSerializer
+    permission_classes = [IsAuthenticated]
 
-            instance.book.inventory += 1
-            instance.book.save()
 
-        return Response({"detail": "Borrowing returned successfully."},
-                        status=status.HTTP_200_OK)
+class BorrowingBulkReturnView(BulkSerializerMixin, generics.GenericAPIView):
+    serializer_class = BorrowingBulkReturnSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        borrowings = serializer.save()
+
+        return Response(
+            {"detail": f"{len(borrowings)} borrowings returned successfully."},
+            status=status.HTTP_200_OK
+        )
@@ -0,0 +1,29 @@
+"""
+Gunicorn settings for serving the ASGI application with uvicorn workers:
+
+    gunicorn library_service_project.asgi:application -c gunicorn.conf.py
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = timeout
+keepalive = 5
+reload = os.getenv("GUNICORN_RELOAD", "false").lower() == "true"
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+
+
+def on_starting(server):
+    # Values left from the last run would otherwise be added to this one's.
+    from library_service_project.metrics import reset_multiprocess_dir
+
+    reset_multiprocess_dir()
+
+
+def child_exit(server, worker):
+    from library_service_project.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
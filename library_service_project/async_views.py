@@ -0,0 +1,122 @@
+from asgiref.sync import sync_to_async
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from library_service_project.db_routers import (
+    areplica_reads_allowed,
+    request_pins,
+    use_replica,
+)
+
+
+class AsyncAPIView(View):
+    """
+    Minimal async counterpart of DRF's ``APIView``.
+
+    DRF views are sync, so under ASGI each request occupies a thread for as
+    long as it waits on the database or the cache. Subclasses implement
+    async handlers with the async ORM instead. Requests are wrapped in a
+    DRF ``Request`` (parsed ``data``, ``query_params``), authenticated by
+    ``authentication_classes``, checked against ``permission_classes`` and answered
+    with JSON ``Response`` objects through DRF's exception handler, so the
+    API looks the same as from the sync views. Authenticators with an
+    ``aauthenticate()`` method are awaited; others run on the thread pool.
+
+    Methods without an async handler are passed to ``sync_view`` if set.
+    Safe methods read from the replica like ``ReplicaReadMixin`` views.
+    """
+
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = [IsAuthenticated]
+    primary_pins = ()
+    sync_view = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        if self.sync_view is not None and not hasattr(self, method):
+            return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+        parsers = [parser() for parser in api_settings.DEFAULT_PARSER_CLASSES]
+        self.request = Request(
+            request, parsers=parsers, authenticators=self.get_authenticators()
+        )
+        try:
+            await self.authenticate(self.request)
+            self.check_permissions(self.request)
+            replica = await areplica_reads_allowed(
+                self.request, request_pins(self.request, self.primary_pins)
+            )
+            with use_replica(replica):
+                response = await super().dispatch(self.request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        return self.finalize_response(response)
+
+    def get_authenticators(self) -> list:
+        return [authentication() for authentication in self.authentication_classes]
+
+    async def authenticate(self, request: Request) -> None:
+        """Async counterpart of ``Request._authenticate()``."""
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, "aauthenticate"):
+                    result = await authenticator.aauthenticate(request)
+                else:
+                    result = await sync_to_async(authenticator.authenticate)(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if result is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = result
+                return
+
+        request._not_authenticated()
+
+    def check_permissions(self, request) -> None:
+        for permission in self.permission_classes:
+            if not permission().has_permission(request, self):
+                if not request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied()
+
+    def handle_exception(self, exc):
+        response = exception_handler(exc, {"view": self, "request": self.request})
+        if response is None:
+            raise exc
+
+        if response.status_code == 401:
+            header = self.get_authenticate_header(self.request)
+            if header:
+                response["WWW-Authenticate"] = header
+            else:
+                response.status_code = 403
+        return response
+
+    def get_authenticate_header(self, request) -> str | None:
+        if request.authenticators:
+            return request.authenticators[0].authenticate_header(request)
+        return None
+
+    def finalize_response(self, response):
+        if not isinstance(response, Response):
+            return response
+
+        if not getattr(response, "accepted_renderer", None):
+            response.accepted_renderer = JSONRenderer()
+            response.accepted_media_type = JSONRenderer.media_type
+            response.renderer_context = {"view": self, "request": self.request}
+        return response.render()
@@ -1,5 +1,16 @@
 import os
+import time
+
 from celery import Celery
+from celery.signals import (
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_ready,
+)
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library_service_project.settings")
 
@@ -8,3 +19,94 @@ app = Celery("library_service_project")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 
 app.autodiscover_tasks()
+
+
+@worker_process_init.connect
+def reset_connection_pools(**kwargs) -> None:
+    """
+    Forget database pools inherited from the parent process.
+
+    Each child must open its own pool; closing the inherited one would also
+    close the sockets the parent is still using.
+    """
+    from django.db.backends.postgresql.base import DatabaseWrapper
+
+    DatabaseWrapper._connection_pools.clear()
+
+
+# perf_counter() at task_prerun, by task id
+_task_started = {}
+# Trace spans of running tasks, by task id
+_task_spans = {}
+
+
+@before_task_publish.connect
+def propagate_trace(headers, **kwargs) -> None:
+    """Carry the publisher's trace in the message, as ``traceparent``."""
+    from library_service_project.tracing import current_span
+
+    span = current_span()
+    if span is not None:
+        headers["traceparent"] = span.traceparent()
+
+
+@task_prerun.connect
+def start_task_observation(task_id, task, **kwargs) -> None:
+    from library_service_project.tracing import parse_traceparent, start_span
+
+    _task_started[task_id] = time.perf_counter()
+    # Eager calls keep message headers apart; workers merge them in.
+    traceparent = getattr(task.request, "traceparent", None) or (
+        task.request.headers or {}
+    ).get("traceparent")
+    _task_spans[task_id] = start_span(
+        f"run {task.name}",
+        parse_traceparent(traceparent),
+        **{"celery.task_id": task_id, "celery.task_name": task.name},
+    )
+
+
+@task_postrun.connect
+def end_task_observation(task_id, task, state, retval=None, **kwargs) -> None:
+    from library_service_project.metrics import CELERY_TASK_DURATION
+    from library_service_project.tracing import end_span
+
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        CELERY_TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(
+            time.perf_counter() - started
+        )
+
+    span = _task_spans.pop(task_id, None)
+    if span is not None:
+        span.attributes["celery.state"] = state
+        if state == "FAILURE":
+            span.record_exception(retval)
+    end_span(span)
+
+
+@worker_init.connect
+def reset_metrics(**kwargs) -> None:
+    # Before the pool forks, as gunicorn's on_starting hook does.
+    from library_service_project.metrics import reset_multiprocess_dir
+
+    reset_multiprocess_dir()
+
+
+@worker_ready.connect
+def serve_metrics(**kwargs) -> None:
+    """Expose the worker's metrics on CELERY_METRICS_PORT, if set."""
+    from django.conf import settings
+    from prometheus_client import start_http_server
+
+    from library_service_project.metrics import get_registry
+
+    if settings.CELERY_METRICS_PORT:
+        start_http_server(settings.CELERY_METRICS_PORT, registry=get_registry())
+
+
+@worker_process_shutdown.connect
+def forget_process_metrics(pid, **kwargs) -> None:
+    from library_service_project.metrics import mark_process_dead
+
+    mark_process_dead(pid)
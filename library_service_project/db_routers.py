@@ -0,0 +1,114 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA_DB_ALIAS = "replica"
+
+_use_replica = ContextVar("use_replica", default=False)
+
+
+def replica_configured() -> bool:
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def read_replica() -> str:
+    """
+    The alias for reads that tolerate replication lag.
+
+    Falls back to the primary when no replica is configured, or inside a
+    transaction on the primary so the transaction sees its own writes.
+    """
+    if not replica_configured() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+    return REPLICA_DB_ALIAS
+
+
+@contextmanager
+def use_replica(enabled: bool = True):
+    """Route reads in this context (thread or task) to ``read_replica()``."""
+    token = _use_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def primary_pin_key(pin: str) -> str:
+    return f"db:primary:{pin}"
+
+
+def user_pin(user_id) -> str:
+    return f"user:{user_id}"
+
+
+def pin_to_primary(pin: str) -> None:
+    """Read ``pin``'s data from the primary until the replica has caught up."""
+    if replica_configured():
+        cache.set(primary_pin_key(pin), True, settings.REPLICA_PIN_SECONDS)
+
+
+def replica_reads_allowed(request, pins) -> bool:
+    if not replica_configured() or request.method not in SAFE_METHODS:
+        return False
+    return not cache.get_many([primary_pin_key(pin) for pin in pins])
+
+
+async def areplica_reads_allowed(request, pins) -> bool:
+    """See replica_reads_allowed()."""
+    if not replica_configured() or request.method not in SAFE_METHODS:
+        return False
+    return not await cache.aget_many([primary_pin_key(pin) for pin in pins])
+
+
+def request_pins(request, pins=()) -> list[str]:
+    """The pins that keep this request on the primary: the user's and ``pins``."""
+    pins = list(pins)
+    if request.user.is_authenticated:
+        pins.append(user_pin(request.user.id))
+    return pins
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe-method requests of a DRF view from the read replica.
+
+    The decision is made after authentication, so a user who has just
+    written (see ``pin_to_primary()``) keeps reading from the primary.
+    ``primary_pins`` names further pins the view's data depends on.
+    """
+
+    primary_pins = ()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if replica_reads_allowed(request, request_pins(request, self.primary_pins)):
+            self._replica_token = _use_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_replica_token", None)
+        if token is not None:
+            _use_replica.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ReplicaRouter:
+    """Send reads inside ``use_replica()`` to the replica, all else to default."""
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get():
+            return read_replica()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,205 @@
+"""
+Prometheus metrics, served at ``/metrics``.
+
+With gunicorn or a prefork Celery worker every process keeps its own
+values, so set ``PROMETHEUS_MULTIPROC_DIR`` to a per-host directory: each
+process writes there and a scrape adds them up.
+"""
+import logging
+import os
+import shutil
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.utils.decorators import sync_and_async_middleware
+from kombu.exceptions import ChannelError, OperationalError
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from library_service_project.celery import app as celery_app
+from library_service_project.queries import QueryRecorder
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+REQUEST_DURATION = Histogram(
+    "library_http_request_duration_seconds",
+    "Time to respond to a request, by route.",
+    ["route", "method", "status"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "library_http_request_db_queries",
+    "Database queries run per request, by route.",
+    ["route", "method"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    "library_http_request_db_duration_seconds",
+    "Time per request spent in database queries, by route.",
+    ["route", "method"],
+)
+TELEGRAM_REQUEST_DURATION = Histogram(
+    "library_telegram_request_duration_seconds",
+    "Time of each Bot API call.",
+    ["method"],
+)
+TELEGRAM_FAILURES = Counter(
+    "library_telegram_failures",
+    "Failed Bot API calls, by reason: network, rate_limited or api_error.",
+    ["method", "reason"],
+)
+CELERY_TASK_DURATION = Histogram(
+    "library_celery_task_duration_seconds",
+    "Time to run a Celery task, by task and final state.",
+    ["task", "state"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 1800),
+)
+
+
+def route_name(request) -> str:
+    """The URL name of ``request``, e.g. ``borrowings:borrowing-detail``."""
+    match = request.resolver_match
+    # Unmatched paths are not labels, as they are unbounded.
+    if match is None or not match.url_name:
+        return "unmatched"
+    return match.view_name
+
+
+def observe_request(request, response, recorder, elapsed) -> None:
+    route, method = route_name(request), request.method
+    REQUEST_DURATION.labels(
+        route, method, f"{response.status_code // 100}xx"
+    ).observe(elapsed)
+    REQUEST_DB_QUERIES.labels(route, method).observe(len(recorder.queries))
+    REQUEST_DB_DURATION.labels(route, method).observe(recorder.duration)
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """Time every request and the queries it runs, labelled by route."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            started = time.perf_counter()
+            with QueryRecorder() as recorder:
+                response = await get_response(request)
+            observe_request(
+                request, response, recorder, time.perf_counter() - started
+            )
+            return response
+    else:
+        def middleware(request):
+            started = time.perf_counter()
+            with QueryRecorder() as recorder:
+                response = get_response(request)
+            observe_request(
+                request, response, recorder, time.perf_counter() - started
+            )
+            return response
+
+    return middleware
+
+
+def queue_depths(app) -> dict[str, int]:
+    """Messages waiting in each of ``app``'s queues, failing fast."""
+    depths = {}
+    with app.connection_for_read() as connection:
+        connection.ensure_connection(
+            max_retries=1, interval_start=0, interval_step=0, timeout=1
+        )
+        channel = connection.default_channel
+        for name in app.amqp.queues:
+            try:
+                depths[name] = channel.queue_declare(queue=name, passive=True)[1]
+            except ChannelError:
+                # Not declared until a worker consumes from it.
+                depths[name] = 0
+    return depths
+
+
+class CeleryQueueCollector:
+    """Reads the Celery queue depths from the broker on each scrape."""
+
+    def describe(self):
+        yield self.family()
+
+    def collect(self):
+        family = self.family()
+        try:
+            depths = queue_depths(celery_app)
+        except OperationalError as exc:
+            logger.warning("Could not read Celery queue depths: %s", exc)
+            depths = {}
+        for queue, depth in depths.items():
+            family.add_metric([queue], depth)
+        yield family
+
+    @staticmethod
+    def family() -> GaugeMetricFamily:
+        return GaugeMetricFamily(
+            "library_celery_queue_depth",
+            "Messages waiting in each Celery queue.",
+            labels=["queue"],
+        )
+
+
+def multiprocess_dir() -> str | None:
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+
+def reset_multiprocess_dir() -> None:
+    """Empty the multiprocess directory; call before forking any workers."""
+    path = multiprocess_dir()
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def mark_process_dead(pid: int) -> None:
+    if multiprocess_dir():
+        multiprocess.mark_process_dead(pid)
+
+
+def get_registry() -> CollectorRegistry:
+    """Every process's metrics in multiprocess mode, else this process's."""
+    if not multiprocess_dir():
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(CeleryQueueCollector())
+    return registry
+
+
+def metrics_view(request) -> HttpResponse:
+    """
+    Prometheus text format, for ``Authorization: Bearer METRICS_TOKEN``.
+    Without a token configured, only a ``DEBUG`` server serves it.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse(status=403)
+    elif not constant_time_compare(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    ):
+        return HttpResponse(status=401)
+
+    return HttpResponse(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
+
+
+if not multiprocess_dir():
+    REGISTRY.register(CeleryQueueCollector())
@@ -0,0 +1,158 @@
+"""
+On-demand profiling of live requests.
+
+A staff user's request sent with an ``X-Profile: 1`` header or a
+``profile=1`` query parameter runs under a sampling profiler. Its stacks
+are saved to ``PROFILING_DIR`` in the folded format flame graph tools
+(flamegraph.pl, speedscope, inferno) read, and the file is named in the
+response's ``X-Profile`` header. Only the newest ``PROFILING_MAX_FILES``
+profiles are kept, or all of them when it is 0.
+"""
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework.exceptions import AuthenticationFailed
+
+from library_service_project.metrics import route_name
+from users.authentication import StatelessJWTAuthentication
+
+authentication = StatelessJWTAuthentication()
+
+
+def frame_name(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+
+
+def folded_stack(frame) -> str:
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """
+    Sample the stacks of ``thread_ids`` every ``interval`` seconds from a
+    background thread while entered.
+
+    Unlike cProfile it doesn't hook every call, so it adds little to the
+    profiled request; samples are counted per distinct stack.
+    """
+
+    def __init__(self, thread_ids, interval: float = 0.001) -> None:
+        self.thread_ids = set(thread_ids)
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "SamplingProfiler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        frames = sys._current_frames()
+        for thread_id in self.thread_ids:
+            frame = frames.get(thread_id)
+            if frame is not None:
+                self.stacks[folded_stack(frame)] += 1
+
+    def folded(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+def profile_requested(request) -> bool:
+    return "1" in (request.headers.get("X-Profile"), request.GET.get("profile"))
+
+
+def is_staff(user) -> bool:
+    return user is not None and user.is_staff
+
+
+def request_user(request):
+    try:
+        result = authentication.authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return result and result[0]
+
+
+async def arequest_user(request):
+    try:
+        result = await authentication.aauthenticate(request)
+    except AuthenticationFailed:
+        return None
+    return result and result[0]
+
+
+def save_profile(request, response, profiler: SamplingProfiler) -> None:
+    route = route_name(request).replace(":", ".")
+    name = (
+        f"{time.strftime('%Y%m%dT%H%M%S')}-{request.method}-{route}-"
+        f"{secrets.token_hex(3)}.folded"
+    )
+    directory = Path(settings.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / name).write_text(profiler.folded())
+    response["X-Profile"] = name
+    remove_old_profiles(directory)
+
+
+def remove_old_profiles(directory: Path) -> None:
+    if settings.PROFILING_MAX_FILES <= 0:
+        return  # No limit.
+    # Names start with the time they were saved, so they sort oldest first.
+    profiles = sorted(directory.glob("*.folded"))
+    for path in profiles[:-settings.PROFILING_MAX_FILES]:
+        path.unlink(missing_ok=True)
+
+
+@sync_and_async_middleware
+def profiling_middleware(get_response):
+    """Profile requests that ask for it, if a staff user sent them."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            if not profile_requested(request) or not is_staff(
+                await arequest_user(request)
+            ):
+                return await get_response(request)
+
+            # Under ASGI, the request's sync code runs on one executor thread.
+            sync_thread = await sync_to_async(threading.get_ident)()
+            with SamplingProfiler(
+                {threading.get_ident(), sync_thread}, settings.PROFILING_INTERVAL
+            ) as profiler:
+                response = await get_response(request)
+            await sync_to_async(save_profile)(request, response, profiler)
+            return response
+    else:
+        def middleware(request):
+            if not profile_requested(request) or not is_staff(request_user(request)):
+                return get_response(request)
+
+            with SamplingProfiler(
+                {threading.get_ident()}, settings.PROFILING_INTERVAL
+            ) as profiler:
+                response = get_response(request)
+            save_profile(request, response, profiler)
+            return response
+
+    return middleware
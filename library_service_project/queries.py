@@ -0,0 +1,134 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger(__name__)
+
+IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+
+
+_recorders = ContextVar("query_recorders", default=())
+
+
+def record_query(execute, sql, params, many, context):
+    recorders = _recorders.get()
+    if not recorders:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        for recorder in recorders:
+            recorder.queries.append(sql)
+            recorder.duration += elapsed
+
+
+@receiver(connection_created)
+def install_recorder(connection, **kwargs) -> None:
+    # First in line, so execute_wrapper() blocks already open still pop theirs.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+class QueryRecorder:
+    """
+    Record the SQL run in this context while entered, on any connection,
+    and the total time it took.
+
+    Connections belong to threads, and async views query on executor
+    threads, so the hook goes on every connection as it is opened; what it
+    records goes to the recorders of the context the query runs in, which
+    ``sync_to_async`` carries over to those threads.
+    """
+
+    def __init__(self) -> None:
+        self.queries = []
+        self.duration = 0.0
+        self._token = None
+
+    def __enter__(self) -> "QueryRecorder":
+        for connection in connections.all(initialized_only=True):
+            install_recorder(connection)
+        self._token = _recorders.set((*_recorders.get(), self))
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _recorders.reset(self._token)
+
+
+def query_shape(sql: str) -> str:
+    """``sql`` with whitespace and ``IN`` list lengths normalized."""
+    return IN_LIST.sub("IN (...)", " ".join(sql.split()))
+
+
+def repeated_queries(queries) -> dict[str, int]:
+    """
+    SELECT shapes run more than once: the sign of an N+1.
+
+    Each row of a result set triggering its own lookup runs the same
+    statement with different parameters, so it shows up here however few
+    rows the request returned, as long as it returned more than one.
+    """
+    shapes = Counter(
+        query_shape(sql) for sql in queries if sql.lstrip().startswith("SELECT")
+    )
+    return {shape: count for shape, count in shapes.items() if count > 1}
+
+
+def route_key(request) -> str | None:
+    """The ``QUERY_BUDGETS`` key of ``request``: method and URL name."""
+    match = request.resolver_match
+    if match is None or not match.url_name:
+        return None
+    return f"{request.method} {match.view_name}"
+
+
+def inspect_queries(request, response, queries) -> None:
+    response["X-Query-Count"] = str(len(queries))
+    route = route_key(request)
+
+    budget = settings.QUERY_BUDGETS.get(route)
+    if budget is not None and len(queries) > budget:
+        logger.warning(
+            "%s ran %d queries, over its budget of %d.", route, len(queries), budget
+        )
+    for shape, count in repeated_queries(queries).items():
+        logger.warning("%s ran the same query %d times: %s", route, count, shape)
+
+
+@sync_and_async_middleware
+def query_inspection_middleware(get_response):
+    """
+    Count each request's queries in an ``X-Query-Count`` header and log
+    requests over their ``QUERY_BUDGETS`` entry or repeating a query.
+    Enabled by ``QUERY_INSPECTION``.
+    """
+    if not settings.QUERY_INSPECTION:
+        raise MiddlewareNotUsed
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            with QueryRecorder() as recorder:
+                response = await get_response(request)
+            inspect_queries(request, response, recorder.queries)
+            return response
+    else:
+        def middleware(request):
+            with QueryRecorder() as recorder:
+                response = get_response(request)
+            inspect_queries(request, response, recorder.queries)
+            return response
+
+    return middleware
@@ -9,9 +9,11 @@ https://docs.djangoproject.com/en/5.2/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
+import copy
 import os
 from datetime import timedelta
 from pathlib import Path
+from celery.schedules import crontab
 from dotenv import load_dotenv
 
 
@@ -28,6 +30,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.getenv("SECRET_KEY")
 TELEGRAM_API_KEY = os.getenv("TELEGRAM_API_KEY")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
@@ -44,17 +47,23 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework_simplejwt",
     "django_filters",
     "books",
     "users",
     "borrowings",
+    "benchmarks",
     "django_celery_beat",
 ]
 
 MIDDLEWARE = [
+    "library_service_project.tracing.tracing_middleware",
+    "library_service_project.metrics.metrics_middleware",
+    "library_service_project.profiling.profiling_middleware",
     "django.middleware.security.SecurityMiddleware",
+    "library_service_project.queries.query_inspection_middleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -96,9 +105,141 @@ DATABASES = {
         "PASSWORD": os.environ["POSTGRES_PASSWORD"],
         "HOST": os.environ["POSTGRES_HOST"],
         "PORT": os.environ["POSTGRES_PORT"],
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {},
     }
 }
 
+# How connections are reused: "pool" (a psycopg pool per process),
+# "persistent" (one connection per thread kept for DB_CONN_MAX_AGE seconds)
+# or "none" (a new connection for every request and task).
+DB_CONNECTION_MODE = os.getenv("DB_CONNECTION_MODE", "pool")
+
+# Pool sizes per process, by role: web (gunicorn worker), worker (Celery
+# child process, one task at a time) or beat (no database access).
+DB_PROCESS_ROLE = os.getenv("DB_PROCESS_ROLE", "web")
+DB_POOL_SIZES = {
+    "web": (2, 10),
+    "worker": (1, 2),
+    "beat": (0, 1),
+}
+
+if DB_CONNECTION_MODE == "pool":
+    pool_min_size, pool_max_size = DB_POOL_SIZES[DB_PROCESS_ROLE]
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", pool_min_size)),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", pool_max_size)),
+        # Seconds a request waits for a free connection before failing
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+        "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", 10 * 60)),
+    }
+elif DB_CONNECTION_MODE == "persistent":
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", 60))
+
+# Optional streaming replica. Safe-method API requests and the overdue scan
+# read from it (see library_service_project.db_routers); a user who has just
+# borrowed or returned a book reads from the primary for REPLICA_PIN_SECONDS.
+if os.getenv("POSTGRES_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **copy.deepcopy(DATABASES["default"]),
+        "HOST": os.environ["POSTGRES_REPLICA_HOST"],
+        "PORT": os.getenv("POSTGRES_REPLICA_PORT", os.environ["POSTGRES_PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+    # In tests the replica mirrors the default test database, and the runner
+    # only closes the pool of the database it destroys: a pool of its own
+    # would keep connections to it open. Keep persistent connections instead.
+    if DATABASES["replica"]["OPTIONS"].pop("pool", None) is not None:
+        DATABASES["replica"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", 60))
+
+DATABASE_ROUTERS = ["library_service_project.db_routers.ReplicaRouter"]
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 10))
+
+# Queries per request, by method and URL name, with cold caches and as
+# counted inside a test transaction (savepoints included). Asserted by each
+# app's tests; with QUERY_INSPECTION (library_service_project.queries)
+# responses get an X-Query-Count header, and going over budget or running
+# the same SELECT more than once is logged.
+QUERY_INSPECTION = DEBUG
+QUERY_BUDGETS = {
+    "GET books:api-root": 1,
+    # The search probe decides between full-text and trigram matching
+    "GET books:book-list": 3,
+    "POST books:book-list": 3,
+    "GET books:book-detail": 2,
+    "PUT books:book-detail": 3,
+    "PATCH books:book-detail": 3,
+    "DELETE books:book-detail": 6,
+    "POST users:create": 2,
+    # Plus saving the rehashed password when the hasher settings changed
+    "POST users:token_obtain_pair": 2,
+    "POST users:token_refresh": 2,
+    "POST users:token_verify": 0,
+    "GET users:manage": 1,
+    "PUT users:manage": 4,
+    "PATCH users:manage": 4,
+    "GET borrowings:borrowing-list-create": 2,
+    "POST borrowings:borrowing-list-create": 9,
+    "GET borrowings:borrowing-detail": 2,
+    "PUT borrowings:borrowing-return": 7,
+    "PATCH borrowings:borrowing-return": 7,
+    "POST borrowings:borrowing-bulk-create": 9,
+    "POST borrowings:borrowing-bulk-return": 7,
+    "GET borrowings:borrowing-summary": 2,
+}
+
+# Prometheus (library_service_project.metrics): /metrics needs
+# "Authorization: Bearer <token>", and is refused without a token unless
+# DEBUG is on; with a port, Celery workers serve their own metrics on it.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+CELERY_METRICS_PORT = int(os.getenv("CELERY_METRICS_PORT", 0)) or None
+
+# Trace spans (library_service_project.tracing) are written as JSON lines to
+# stderr with "console", or appended to TRACING_FILE with "file".
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER")
+TRACING_FILE = os.getenv("TRACING_FILE", BASE_DIR / "traces.jsonl")
+
+# Staff requests sent with "X-Profile: 1" or "?profile=1" are sampled every
+# PROFILING_INTERVAL seconds (library_service_project.profiling) and their
+# folded stacks saved here. Older profiles beyond PROFILING_MAX_FILES are
+# deleted as new ones are saved; 0 keeps them all.
+PROFILING_DIR = os.getenv("PROFILING_DIR", BASE_DIR / "profiles")
+PROFILING_INTERVAL = 0.001
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", 100))
+
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_CACHE_URL", "redis://redis:6379/1"),
+    }
+}
+
+BOOK_CATALOG_CACHE_TIMEOUT = 15 * 60
+
+
+# Password hashing
+# PASSWORD_HASHER_PROFILE picks the hasher for new hashes; the other one is kept
+# so existing hashes still verify and get upgraded on the next login.
+
+PASSWORD_HASHER_PROFILES = {
+    "argon2": "users.hashers.TunedArgon2PasswordHasher",
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+}
+PASSWORD_HASHER_PROFILE = os.getenv("PASSWORD_HASHER_PROFILE", "argon2")
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE],
+    *(
+        hasher for profile, hasher in PASSWORD_HASHER_PROFILES.items()
+        if profile != PASSWORD_HASHER_PROFILE
+    ),
+]
+
+# Argon2id costs (memory in KiB); the defaults follow the OWASP minimum
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", 2))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", 19 * 1024))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", 1))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -145,22 +286,70 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.StatelessJWTAuthentication",
     ),
     "DEFAULT_FILTER_BACKENDS": (
         "django_filters.rest_framework.DjangoFilterBackend",
     ),
+    "DEFAULT_PAGINATION_CLASS": (
+        "library_service_project.pagination.KeysetCursorPagination"
+    ),
+    "PAGE_SIZE": 20,
     "AUTH_HEADER_NAME": "HTTP_AUTHORIZE",
 }
 
 SIMPLE_JWT = {
    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
    "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
-   "ROTATE_REFRESH_TOKENS": True
+   "ROTATE_REFRESH_TOKENS": True,
+   "TOKEN_OBTAIN_SERIALIZER": "users.serializers.TokenObtainPairSerializer",
+   "TOKEN_REFRESH_SERIALIZER": "users.serializers.TokenRefreshSerializer",
+   "TOKEN_USER_CLASS": "users.authentication.TokenClaimsUser",
 }
 
+# How long StatelessJWTAuthentication trusts a cached is_active/password check
+AUTH_USER_STATE_CACHE_TIMEOUT = 60
+
 CELERY_BROKER_URL = "redis://redis:6379"
 CELERY_RESULT_BACKEND = "redis://redis:6379"
 CELERY_TIMEZONE = "Europe/Kyiv"
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
+CELERY_BEAT_SCHEDULE = {
+    "send-pending-notifications": {
+        "task": "borrowings.tasks.send_pending_notifications",
+        "schedule": timedelta(minutes=1),
+    },
+    # Hourly, so loans are counted soon after they fall due in any timezone.
+    "refresh-book-overdue-loans": {
+        "task": "borrowings.tasks.refresh_book_overdue_loans",
+        "schedule": crontab(minute=5),
+    },
+}
+
+# Telegram notification outbox, drained by borrowings.tasks
+NOTIFICATION_BATCH_SIZE = 50
+NOTIFICATION_MAX_ATTEMPTS = 5
+# How long a worker may take to send a claimed batch before others retry it
+NOTIFICATION_LEASE = timedelta(minutes=5)
+
+# Per-user borrowing summaries are also dropped on every borrow and return
+BORROWING_SUMMARY_CACHE_TIMEOUT = 15 * 60
+
+# Overdue fines are this multiple of the book's daily fee per day late
+FINE_MULTIPLIER = 2
+
+# Returned borrowings older than this move to the archive table
+# (manage.py archive_borrowings)
+BORROWING_ARCHIVE_AFTER_DAYS = int(os.getenv("BORROWING_ARCHIVE_AFTER_DAYS", 365))
+
+# Overdue digests: rows fetched per query and messages sent in parallel
+OVERDUE_NOTIFICATION_CHUNK_SIZE = 2000
+TELEGRAM_CONCURRENCY = 8
+
+# Bot API limits (messages per second), enforced by borrowings.telegram.
+# A group chat takes at most 20 messages a minute, so the burst plus a
+# minute's refill stays within 20; a private chat can take 1.0 per second.
+TELEGRAM_CHAT_RATE_LIMIT = float(os.getenv("TELEGRAM_CHAT_RATE_LIMIT", 19 / 60))
+TELEGRAM_CHAT_BURST = 1
+TELEGRAM_GLOBAL_RATE_LIMIT = 30.0
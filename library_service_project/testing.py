@@ -0,0 +1,50 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.urls import resolve
+
+from library_service_project.queries import QueryRecorder, repeated_queries
+
+
+class QueryBudgetMixin:
+    """
+    Assertions for the per-route query budgets in ``QUERY_BUDGETS``.
+
+    Budgets hold with cold caches and don't grow with the result size:
+    give list routes more than one row, and a lookup per row fails the
+    test as a repeated query even when the total is within budget.
+    """
+
+    def assertWithinQueryBudget(self, method, url, data=None, **kwargs):
+        route = f"{method} {resolve(url.split('?')[0]).view_name}"
+        with QueryRecorder() as recorder:
+            response = getattr(self.client, method.lower())(url, data, **kwargs)
+
+        self.assertLess(response.status_code, 400, response.content)
+        queries = "\n".join(recorder.queries)
+        self.assertLessEqual(
+            len(recorder.queries),
+            settings.QUERY_BUDGETS[route],
+            f"{route} ran {len(recorder.queries)} queries:\n{queries}",
+        )
+        self.assertEqual(
+            repeated_queries(recorder.queries), {}, f"{route} ran:\n{queries}"
+        )
+        return response
+
+    def assertRoutesBudgeted(self, urlconf) -> None:
+        """Every route of ``urlconf`` has a budget for some method."""
+        module = import_module(urlconf)
+        budgeted = {route.split()[1] for route in settings.QUERY_BUDGETS}
+        for pattern in module.urlpatterns:
+            with self.subTest(route=pattern.name):
+                self.assertIn(f"{module.app_name}:{pattern.name}", budgeted)
+
+
+def metric_value(metric, sample: str, **labels) -> float:
+    """The value of one of ``metric``'s samples, or 0 if not observed yet."""
+    for family in metric.collect():
+        for value in family.samples:
+            if value.name == sample and value.labels == labels:
+                return value.value
+    return 0.0
@@ -0,0 +1,451 @@
+import json
+import os
+import runpy
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from celery.signals import worker_process_init
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.backends.postgresql.base import DatabaseWrapper
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.models import Book
+from borrowings.fake_telegram import FakeTelegramServer
+from borrowings.tasks import refresh_book_overdue_loans
+from borrowings.telegram import TelegramClient
+from borrowings.tests import sample_book
+from library_service_project import metrics
+from library_service_project.celery import propagate_trace
+from library_service_project.db_routers import (
+    REPLICA_DB_ALIAS,
+    ReplicaRouter,
+    pin_to_primary,
+    replica_reads_allowed,
+    use_replica,
+    user_pin,
+)
+from library_service_project.profiling import SamplingProfiler
+from library_service_project.queries import repeated_queries
+from library_service_project.testing import metric_value
+from library_service_project.tracing import span, start_span
+from users.serializers import TokenObtainPairSerializer
+from users.tests import create_user
+
+BORROWINGS_URL = reverse("borrowings:borrowing-list-create")
+SUMMARY_URL = reverse("borrowings:borrowing-summary")
+METRICS_URL = reverse("metrics")
+
+
+class QueryInspectionTests(TestCase):
+    def test_repeated_queries_ignore_parameters(self) -> None:
+        queries = [
+            'SELECT "id" FROM "books_book" WHERE "id" IN (%s, %s)',
+            'SELECT "id"  FROM "books_book"\nWHERE "id" IN (%s)',
+            'SELECT "id" FROM "users_user" WHERE "id" = %s',
+            'UPDATE "books_book" SET "inventory" = %s',
+            'UPDATE "books_book" SET "inventory" = %s',
+        ]
+
+        self.assertEqual(
+            repeated_queries(queries),
+            {'SELECT "id" FROM "books_book" WHERE "id" IN (...)': 2},
+        )
+
+    @override_settings(
+        QUERY_INSPECTION=True,
+        QUERY_BUDGETS={"GET borrowings:borrowing-summary": 0},
+    )
+    def test_middleware_reports_queries(self) -> None:
+        cache.clear()
+        client = APIClient()
+        client.force_authenticate(
+            create_user(email="inspect@test.com", password="inspectpass")
+        )
+
+        with self.assertLogs("library_service_project.queries", "WARNING") as logs:
+            res = client.get(SUMMARY_URL)
+
+        self.assertEqual(res["X-Query-Count"], "1")
+        self.assertIn("over its budget of 0", logs.output[0])
+
+
+@override_settings(METRICS_TOKEN=None)
+class MetricsTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            create_user(email="metrics@test.com", password="metricspass")
+        )
+
+    def test_request_metrics_by_route(self) -> None:
+        route = {"route": "borrowings:borrowing-summary", "method": "GET"}
+
+        def values():
+            return (
+                metric_value(
+                    metrics.REQUEST_DURATION,
+                    "library_http_request_duration_seconds_count",
+                    status="2xx",
+                    **route,
+                ),
+                metric_value(
+                    metrics.REQUEST_DB_QUERIES,
+                    "library_http_request_db_queries_sum",
+                    **route,
+                ),
+                metric_value(
+                    metrics.REQUEST_DB_DURATION,
+                    "library_http_request_db_duration_seconds_count",
+                    **route,
+                ),
+            )
+
+        before = values()
+        self.client.get(SUMMARY_URL)
+        after = values()
+
+        self.assertEqual(after[0] - before[0], 1)
+        self.assertEqual(after[1] - before[1], 1)
+        self.assertEqual(after[2] - before[2], 1)
+
+    def test_unmatched_paths_share_a_label(self) -> None:
+        res = self.client.get("/no-such-page/")
+
+        self.assertEqual(metrics.route_name(res.wsgi_request), "unmatched")
+
+    def test_task_duration(self) -> None:
+        def runs():
+            return metric_value(
+                metrics.CELERY_TASK_DURATION,
+                "library_celery_task_duration_seconds_count",
+                task=refresh_book_overdue_loans.name,
+                state="SUCCESS",
+            )
+
+        before = runs()
+        refresh_book_overdue_loans.apply()
+
+        self.assertEqual(runs() - before, 1)
+
+    @override_settings(DEBUG=True)
+    def test_exposition(self) -> None:
+        self.client.get(SUMMARY_URL)
+
+        # The broker is unreachable here: queue depths are left out.
+        with self.assertLogs("library_service_project.metrics", "WARNING"):
+            res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn(b"library_http_request_duration_seconds_bucket", res.content)
+
+    @override_settings(METRICS_TOKEN="scrape-token")
+    def test_token(self) -> None:
+        client = APIClient()
+
+        self.assertEqual(
+            client.get(METRICS_URL).status_code, status.HTTP_401_UNAUTHORIZED
+        )
+        with self.assertLogs("library_service_project.metrics", "WARNING"):
+            res = client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer scrape-token")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_token_required_without_debug(self) -> None:
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_url_has_no_trailing_slash(self) -> None:
+        # Prometheus scrapes /metrics unless told otherwise.
+        self.assertEqual(METRICS_URL, "/metrics")
+
+
+class TracingTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        tracing = override_settings(
+            TRACING_EXPORTER="file", TRACING_FILE=f"{directory.name}/traces.jsonl"
+        )
+        tracing.enable()
+        self.addCleanup(tracing.disable)
+
+        self.user = create_user(email="tracing@test.com", password="tracingpass")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def spans(self) -> list[dict]:
+        with open(settings.TRACING_FILE) as traces:
+            return [json.loads(line) for line in traces]
+
+    def children(self, parent: dict) -> list[dict]:
+        return [s for s in self.spans() if s["parent_span_id"] == parent["span_id"]]
+
+    @patch("borrowings.serializers.send_pending_notifications.delay")
+    def test_borrow(self, mock_delay) -> None:
+        payload = {
+            "expected_return_date": date.today() + timedelta(days=7),
+            "book": sample_book().id,
+        }
+
+        res = self.client.post(BORROWINGS_URL, payload)
+
+        request = self.spans()[-1]
+        self.assertEqual(request["name"], "POST borrowings:borrowing-list-create")
+        self.assertIsNone(request["parent_span_id"])
+        self.assertEqual(request["attributes"]["http.status_code"], 201)
+        self.assertEqual(
+            res["traceparent"], f"00-{request['trace_id']}-{request['span_id']}-01"
+        )
+        self.assertEqual(
+            [child["name"] for child in self.children(request)],
+            ["CreateBorrowingSerializer.is_valid", "CreateBorrowingSerializer.save"],
+        )
+        save = self.children(request)[1]
+        statements = [child["name"] for child in self.children(save)]
+        self.assertIn("UPDATE", statements)
+        self.assertIn("INSERT", statements)
+        self.assertEqual({s["trace_id"] for s in self.spans()}, {request["trace_id"]})
+
+    def test_continues_incoming_trace(self) -> None:
+        trace_id, parent_id = "a" * 32, "b" * 16
+
+        self.client.get(SUMMARY_URL, HTTP_TRACEPARENT=f"00-{trace_id}-{parent_id}-01")
+
+        request = self.spans()[-1]
+        self.assertEqual(request["trace_id"], trace_id)
+        self.assertEqual(request["parent_span_id"], parent_id)
+        self.assertEqual(self.children(request)[0]["name"], "SELECT")
+
+    def test_task_continues_publisher_trace(self) -> None:
+        headers = {}
+        with span("publish") as publisher:
+            propagate_trace(headers=headers)
+
+        refresh_book_overdue_loans.apply(headers=headers)
+
+        task = self.spans()[-1]
+        self.assertEqual(task["name"], f"run {refresh_book_overdue_loans.name}")
+        self.assertEqual(task["trace_id"], publisher.trace_id)
+        self.assertEqual(task["parent_span_id"], publisher.span_id)
+        self.assertEqual(task["attributes"]["celery.state"], "SUCCESS")
+        self.assertTrue(self.children(task))
+
+    def test_telegram_call(self) -> None:
+        with FakeTelegramServer() as telegram:
+            client = TelegramClient("123:abc", "42", api_url=telegram.url)
+            self.addCleanup(client.close)
+            with span("notify") as notify:
+                client.send_message("Hello")
+
+        call = self.spans()[0]
+        self.assertEqual(call["name"], "telegram sendMessage")
+        self.assertEqual(call["parent_span_id"], notify.span_id)
+
+    @override_settings(TRACING_EXPORTER=None)
+    def test_disabled(self) -> None:
+        self.assertIsNone(start_span("ignored"))
+
+
+class ProfilingTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        profiling = override_settings(PROFILING_DIR=directory.name)
+        profiling.enable()
+        self.addCleanup(profiling.disable)
+
+        self.client = APIClient()
+        self.staff = create_user(
+            email="staff@test.com", password="staffpass", is_staff=True
+        )
+
+    def authorize(self, user) -> None:
+        token = TokenObtainPairSerializer.get_token(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_staff_request(self) -> None:
+        self.authorize(self.staff)
+
+        res = self.client.get(SUMMARY_URL, HTTP_X_PROFILE="1")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        with open(f"{settings.PROFILING_DIR}/{res['X-Profile']}") as profile:
+            stacks = profile.read()
+        self.assertIn("GET-borrowings.borrowing-summary", res["X-Profile"])
+        # Folded stacks: frames joined by ";", then the sample count.
+        for line in stacks.splitlines():
+            self.assertRegex(line, r"^[^ ]+ \d+$")
+
+    def test_query_flag(self) -> None:
+        self.authorize(self.staff)
+
+        res = self.client.get(BORROWINGS_URL, {"profile": "1"})
+
+        self.assertIn("X-Profile", res)
+
+    def test_other_users_are_not_profiled(self) -> None:
+        self.authorize(create_user(email="reader@test.com", password="readerpass"))
+
+        res = self.client.get(SUMMARY_URL, HTTP_X_PROFILE="1")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("X-Profile", res)
+
+    def test_unauthenticated_requests_are_not_profiled(self) -> None:
+        res = self.client.get(SUMMARY_URL, HTTP_X_PROFILE="1")
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertNotIn("X-Profile", res)
+
+    @override_settings(PROFILING_MAX_FILES=2)
+    def test_only_newest_profiles_are_kept(self) -> None:
+        self.authorize(self.staff)
+        old_profile = Path(settings.PROFILING_DIR, "20000101T000000-old.folded")
+        old_profile.write_text("")
+
+        names = [
+            self.client.get(SUMMARY_URL, HTTP_X_PROFILE="1")["X-Profile"]
+            for _ in range(2)
+        ]
+
+        self.assertEqual(
+            sorted(path.name for path in Path(settings.PROFILING_DIR).iterdir()),
+            sorted(names),
+        )
+
+    @override_settings(PROFILING_MAX_FILES=0)
+    def test_zero_max_files_keeps_every_profile(self) -> None:
+        self.authorize(self.staff)
+        old_profile = Path(settings.PROFILING_DIR, "20000101T000000-old.folded")
+        old_profile.write_text("")
+
+        self.client.get(SUMMARY_URL, HTTP_X_PROFILE="1")
+
+        self.assertTrue(old_profile.exists())
+        self.assertEqual(len(list(Path(settings.PROFILING_DIR).iterdir())), 2)
+
+    def test_sampling_profiler(self) -> None:
+        done = threading.Event()
+
+        def busy_wait() -> None:
+            while not done.is_set():
+                pass
+
+        thread = threading.Thread(target=busy_wait)
+        thread.start()
+        try:
+            with SamplingProfiler({thread.ident}, interval=0.001) as profiler:
+                time.sleep(0.05)
+        finally:
+            done.set()
+            thread.join()
+
+        self.assertTrue(profiler.stacks)
+        for stack in profiler.stacks:
+            self.assertTrue(stack.startswith("threading._bootstrap;"), stack)
+        self.assertIn("busy_wait", profiler.folded())
+
+
+class ConnectionSettingsTests(SimpleTestCase):
+    def load_settings(self, **environ) -> dict:
+        environ = {
+            key: value for key, value in os.environ.items()
+            if not key.startswith("DB_")
+        } | environ
+        # Settings are read once at startup; load a fresh copy of the module.
+        with patch.dict(os.environ, environ, clear=True):
+            return runpy.run_path(Path(__file__).with_name("settings.py"))
+
+    def test_web_pool(self) -> None:
+        database = self.load_settings(DB_PROCESS_ROLE="web")["DATABASES"]["default"]
+
+        self.assertEqual(database["OPTIONS"]["pool"]["min_size"], 2)
+        self.assertEqual(database["OPTIONS"]["pool"]["max_size"], 10)
+        self.assertNotIn("CONN_MAX_AGE", database)
+
+    def test_worker_pool(self) -> None:
+        database = self.load_settings(DB_PROCESS_ROLE="worker")["DATABASES"]["default"]
+
+        self.assertEqual(database["OPTIONS"]["pool"]["min_size"], 1)
+        self.assertEqual(database["OPTIONS"]["pool"]["max_size"], 2)
+
+    def test_persistent_connections(self) -> None:
+        database = self.load_settings(
+            DB_CONNECTION_MODE="persistent", DB_CONN_MAX_AGE="30"
+        )["DATABASES"]["default"]
+
+        self.assertEqual(database["CONN_MAX_AGE"], 30)
+        self.assertNotIn("pool", database["OPTIONS"])
+
+    def test_replica_has_no_pool(self) -> None:
+        databases = self.load_settings(
+            POSTGRES_REPLICA_HOST="replica", DB_CONN_MAX_AGE="30"
+        )["DATABASES"]
+
+        self.assertIn("pool", databases["default"]["OPTIONS"])
+        self.assertNotIn("pool", databases["replica"]["OPTIONS"])
+        self.assertEqual(databases["replica"]["CONN_MAX_AGE"], 30)
+
+    def test_worker_process_forgets_inherited_pools(self) -> None:
+        with patch.dict(DatabaseWrapper._connection_pools, {"default": object()}):
+            worker_process_init.send(sender=None)
+
+            self.assertEqual(DatabaseWrapper._connection_pools, {})
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    # No replica needed; borrowings' ReplicaRoutingTests use a real one.
+    def setUp(self) -> None:
+        cache.clear()
+        configured = patch(
+            "library_service_project.db_routers.replica_configured",
+            return_value=True,
+        )
+        self.replica_configured = configured.start()
+        self.addCleanup(configured.stop)
+        self.router = ReplicaRouter()
+
+    def test_reads_inside_use_replica_go_to_replica(self) -> None:
+        self.assertIsNone(self.router.db_for_read(Book))
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(Book), REPLICA_DB_ALIAS)
+
+    def test_writes_and_migrations_go_to_primary(self) -> None:
+        with use_replica():
+            self.assertEqual(self.router.db_for_write(Book), "default")
+        self.assertTrue(self.router.allow_migrate("default", "books"))
+        self.assertFalse(self.router.allow_migrate(REPLICA_DB_ALIAS, "books"))
+
+    def test_transactions_read_from_primary(self) -> None:
+        with patch.object(connections["default"], "in_atomic_block", True):
+            with use_replica():
+                self.assertEqual(self.router.db_for_read(Book), "default")
+
+    def test_without_replica_reads_go_to_primary(self) -> None:
+        self.replica_configured.return_value = False
+
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(Book), "default")
+
+    def test_pinned_user_reads_from_primary(self) -> None:
+        request = RequestFactory().get("/")
+
+        self.assertTrue(replica_reads_allowed(request, [user_pin(1)]))
+        pin_to_primary(user_pin(1))
+        self.assertFalse(replica_reads_allowed(request, [user_pin(1)]))
+        self.assertTrue(replica_reads_allowed(request, [user_pin(2)]))
+
+    def test_unsafe_methods_read_from_primary(self) -> None:
+        self.assertFalse(replica_reads_allowed(RequestFactory().post("/"), []))
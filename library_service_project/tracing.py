@@ -0,0 +1,239 @@
+"""
+Tracing in the shape of OpenTelemetry spans, without its SDK.
+
+Spans cover requests, ORM queries, serializer validation and saves,
+Telegram calls and Celery tasks; a task's span continues the trace of the
+request that queued it through a W3C ``traceparent`` message header.
+Finished spans are written as JSON lines to the ``TRACING_EXPORTER``:
+``console`` (stderr) or ``file`` (``TRACING_FILE``). Without one, nothing
+is traced.
+"""
+import json
+import re
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cache
+from typing import NamedTuple
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import setting_changed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils.decorators import sync_and_async_middleware
+
+from library_service_project.metrics import route_name
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+_current_span = ContextVar("trace_span", default=None)
+
+
+class SpanContext(NamedTuple):
+    trace_id: str
+    span_id: str
+
+
+class Span:
+    def __init__(self, name: str, parent: SpanContext | None, attributes) -> None:
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.status = "UNSET"
+        self.start = time.time_ns()
+        self.end = None
+        self._token = None
+
+    @property
+    def context(self) -> SpanContext:
+        return SpanContext(self.trace_id, self.span_id)
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "ERROR"
+        self.attributes["exception.type"] = type(exc).__name__
+        self.attributes["exception.message"] = str(exc)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start,
+            "end_time_unix_nano": self.end,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class JSONLinesExporter:
+    """Writes each finished span as one JSON line; safe to share."""
+
+    def __init__(self, stream) -> None:
+        self.stream = stream
+        self.lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self.lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+@cache
+def get_exporter() -> JSONLinesExporter | None:
+    if settings.TRACING_EXPORTER == "console":
+        return JSONLinesExporter(sys.stderr)
+    if settings.TRACING_EXPORTER == "file":
+        return JSONLinesExporter(open(settings.TRACING_FILE, "a"))
+    return None
+
+
+@receiver(setting_changed)
+def reset_exporter(setting, **kwargs) -> None:
+    if setting in ("TRACING_EXPORTER", "TRACING_FILE"):
+        get_exporter.cache_clear()
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def parse_traceparent(header: str | None) -> SpanContext | None:
+    match = TRACEPARENT.match(header or "")
+    return SpanContext(*match.groups()) if match else None
+
+
+def start_span(name: str, parent: SpanContext | None = None, **attributes):
+    """
+    Start a span and make it current, as a child of ``parent`` or else of
+    the current span. Returns None when tracing is off.
+    """
+    if get_exporter() is None:
+        return None
+
+    current = _current_span.get()
+    if current is None:
+        # Connections opened before this module was imported lack the hook.
+        for connection in connections.all(initialized_only=True):
+            install_query_tracing(connection)
+    elif parent is None:
+        parent = current.context
+    started = Span(name, parent, attributes)
+    started._token = _current_span.set(started)
+    return started
+
+
+def end_span(started: Span | None) -> None:
+    """End a span from ``start_span``, in the context it was started in."""
+    if started is None:
+        return
+    started.end = time.time_ns()
+    _current_span.reset(started._token)
+    exporter = get_exporter()
+    if exporter is not None:
+        exporter.export(started)
+
+
+@contextmanager
+def span(name: str, parent: SpanContext | None = None, **attributes):
+    started = start_span(name, parent, **attributes)
+    try:
+        yield started
+    except Exception as exc:
+        if started is not None:
+            started.record_exception(exc)
+        raise
+    finally:
+        end_span(started)
+
+
+class TracedSerializerMixin:
+    """Spans for a serializer's validation and save."""
+
+    def is_valid(self, *args, **kwargs):
+        with span(f"{type(self).__name__}.is_valid"):
+            return super().is_valid(*args, **kwargs)
+
+    def save(self, *args, **kwargs):
+        with span(f"{type(self).__name__}.save"):
+            return super().save(*args, **kwargs)
+
+
+def trace_query(execute, sql, params, many, context):
+    # Only inside a traced request or task, not on every management query.
+    if _current_span.get() is None:
+        return execute(sql, params, many, context)
+
+    with span(
+        sql.split(None, 1)[0].upper(),
+        **{
+            "db.system": context["connection"].vendor,
+            "db.name": context["connection"].alias,
+            "db.statement": sql,
+        },
+    ):
+        return execute(sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_tracing(connection, **kwargs) -> None:
+    if trace_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, trace_query)
+
+
+def request_span(request):
+    return start_span(
+        f"{request.method} {request.path}",
+        parse_traceparent(request.headers.get("traceparent")),
+        **{"http.method": request.method, "http.target": request.path},
+    )
+
+
+def end_request_span(current, request, response) -> None:
+    if current is not None:
+        # Named by route once resolved, as the path may hold ids.
+        current.name = f"{request.method} {route_name(request)}"
+        current.attributes["http.route"] = route_name(request)
+        current.attributes["http.status_code"] = response.status_code
+        if response.status_code >= 500:
+            current.status = "ERROR"
+        response["traceparent"] = current.traceparent()
+    end_span(current)
+
+
+@sync_and_async_middleware
+def tracing_middleware(get_response):
+    """
+    Trace each request, continuing the trace of an incoming ``traceparent``
+    header and returning the request span's own. Enabled by
+    ``TRACING_EXPORTER``.
+    """
+    if get_exporter() is None:
+        raise MiddlewareNotUsed
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            current = request_span(request)
+            response = await get_response(request)
+            end_request_span(current, request, response)
+            return response
+    else:
+        def middleware(request):
+            current = request_span(request)
+            response = get_response(request)
+            end_request_span(current, request, response)
+            return response
+
+    return middleware
@@ -17,9 +17,12 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from library_service_project.metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("books.urls", namespace="books")),
     path("api/", include("users.urls", namespace="users")),
     path("api/", include("borrowings.urls", namespace="borrowings")),
+    path("metrics", metrics_view, name="metrics"),
 ]
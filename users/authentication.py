@@ -0,0 +1,133 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+USER_CLAIMS = ("email", "is_staff")
+
+
+class TokenClaimsUser(TokenUser):
+    """Request user built from the access token claims, without a DB row."""
+
+    @cached_property
+    def id(self):
+        # The claim is a string; compare equal to the model's primary keys.
+        return get_user_model()._meta.pk.to_python(super().id)
+
+    @cached_property
+    def email(self) -> str:
+        return self.token.get("email", "")
+
+
+def user_state_cache_key(user_id) -> str:
+    # v2: states cached before is_staff was added lack it.
+    return f"users:state:v2:{user_id}"
+
+
+def user_state_queryset(user_id):
+    return get_user_model().objects.filter(
+        **{api_settings.USER_ID_FIELD: user_id}
+    ).values("is_active", "is_staff", "password")
+
+
+def make_user_state(user: dict | None) -> dict:
+    if user is None:
+        return {}
+    return {
+        "is_active": user["is_active"],
+        "is_staff": user["is_staff"],
+        "password_hash": get_md5_hash_password(user["password"]),
+    }
+
+
+def get_user_state(user_id) -> dict | None:
+    """The fields needed to reject a token, cached for a short time."""
+    key = user_state_cache_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = make_user_state(user_state_queryset(user_id).first())
+        cache.set(key, state, settings.AUTH_USER_STATE_CACHE_TIMEOUT)
+    return state or None
+
+
+async def aget_user_state(user_id) -> dict | None:
+    """See get_user_state()."""
+    key = user_state_cache_key(user_id)
+    state = await cache.aget(key)
+    if state is None:
+        state = make_user_state(await user_state_queryset(user_id).afirst())
+        await cache.aset(key, state, settings.AUTH_USER_STATE_CACHE_TIMEOUT)
+    return state or None
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the ``email`` claim.
+
+    Instead of loading the user row on every request it returns a
+    ``TokenClaimsUser`` and only checks a cached copy of the account's
+    active flag, staff flag and password hash, so deactivated users,
+    revoked tokens and tokens whose ``is_staff`` claim is out of date are
+    still rejected. Tokens issued without the claims fall back to the
+    regular database lookup.
+    """
+
+    def get_user(self, validated_token):
+        if not self.has_user_claims(validated_token):
+            return super().get_user(validated_token)
+
+        user = api_settings.TOKEN_USER_CLASS(validated_token)
+        self.check_user_state(validated_token, get_user_state(user.id))
+        return user
+
+    async def aauthenticate(self, request):
+        """Async counterpart of ``authenticate()`` for async views."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        if not self.has_user_claims(validated_token):
+            return await sync_to_async(super().get_user)(validated_token)
+
+        user = api_settings.TOKEN_USER_CLASS(validated_token)
+        self.check_user_state(validated_token, await aget_user_state(user.id))
+        return user
+
+    @staticmethod
+    def has_user_claims(validated_token) -> bool:
+        return all(claim in validated_token for claim in USER_CLAIMS)
+
+    @staticmethod
+    def check_user_state(validated_token, state: dict | None) -> None:
+        if state is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not state["is_active"]:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != state["password_hash"]:
+            raise AuthenticationFailed(
+                "The user's password has been changed.", code="password_changed"
+            )
+
+        # A demoted user must not keep staff access until the token expires.
+        if validated_token["is_staff"] != state["is_staff"]:
+            raise AuthenticationFailed(
+                "The user's role has changed.", code="user_role_changed"
+            )
@@ -0,0 +1,37 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    make_password,
+    verify_password,
+)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id with cost parameters taken from settings.
+
+    Django's defaults (100 MiB, parallelism 8) make each login expensive
+    enough to dominate CPU during bursts. Hashes made with other parameters
+    are re-hashed on the next successful login, so the costs can be changed
+    without resetting passwords.
+    """
+
+    @property
+    def time_cost(self) -> int:
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self) -> int:
+        return settings.ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self) -> int:
+        return settings.ARGON2_PARALLELISM
+
+
+# Hashing is pure CPU and argon2 releases the GIL, so async code runs it on
+# the shared thread pool rather than the single thread-sensitive executor
+# that serves sync views under ASGI.
+amake_password = sync_to_async(make_password, thread_sensitive=False)
+averify_password = sync_to_async(verify_password, thread_sensitive=False)
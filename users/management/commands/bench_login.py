@@ -0,0 +1,91 @@
+import asyncio
+import os
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncRequestFactory
+from django.urls import reverse
+
+from benchmarks.runner import describe, summarize
+from users.views import TokenObtainPairView
+
+PASSWORD = "bench-login-password"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure token endpoint throughput with the configured password "
+        "hasher and report logins per second per core."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Logins to perform (default: 200).",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=os.cpu_count(),
+            help="Logins in flight at once (default: number of CPUs).",
+        )
+
+    def handle(self, *args, **options):
+        requests = options["requests"]
+        concurrency = options["concurrency"]
+        if requests < 2 or concurrency < 1:
+            raise CommandError(
+                "--requests must be at least 2 and --concurrency positive."
+            )
+
+        email = f"bench-login-{uuid.uuid4().hex}@example.com"
+        user = get_user_model().objects.create_user(email=email, password=PASSWORD)
+        try:
+            summary = asyncio.run(self.run(email, requests, concurrency))
+        finally:
+            user.delete()
+
+        rate = summary["throughput"]
+        cores = min(concurrency, os.cpu_count())
+        hasher = get_hasher()
+        params = (
+            f"t={settings.ARGON2_TIME_COST} m={settings.ARGON2_MEMORY_COST} "
+            f"p={settings.ARGON2_PARALLELISM}"
+            if hasher.algorithm == "argon2"
+            else f"iterations={hasher.iterations}"
+        )
+        self.stdout.write(describe("login", summary))
+        self.stdout.write(self.style.SUCCESS(
+            f"{concurrency} in flight: {rate / cores:.1f} logins/s per core "
+            f"({hasher.algorithm}, {params})."
+        ))
+
+    async def run(self, email, requests, concurrency) -> dict:
+        view = TokenObtainPairView.as_view()
+        factory = AsyncRequestFactory()
+        url = reverse("users:token_obtain_pair")
+        data = {"email": email, "password": PASSWORD}
+        semaphore = asyncio.Semaphore(concurrency)
+        samples = []
+
+        async def login() -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await view(
+                    factory.post(url, data, content_type="application/json")
+                )
+                samples.append(
+                    (time.perf_counter() - started, None, response.status_code)
+                )
+            if response.status_code != 200:
+                raise CommandError(f"Login failed: {response.content.decode()}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(requests)))
+        return summarize(samples, time.perf_counter() - started)
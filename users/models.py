@@ -2,6 +2,8 @@ from django.contrib.auth.models import AbstractUser, UserManager as DjangoUserMa
 from django.db import models
 from django.utils.translation import gettext as _
 
+from users.hashers import amake_password, averify_password
+
 
 class CustomUserManager(DjangoUserManager):
     """
@@ -19,11 +21,26 @@ class CustomUserManager(DjangoUserManager):
         user.save(using=self._db)
         return user
 
+    async def _acreate_user(self, email, password, **extra_fields):
+        if not email:
+            raise ValueError(_("The Email must be set"))
+        email = self.normalize_email(email)
+        user = self.model(email=email, **extra_fields)
+        user.password = await amake_password(password)
+        user._password = password
+        await user.asave(using=self._db)
+        return user
+
     def create_user(self, email, password=None, **extra_fields):
         extra_fields.setdefault("is_staff", False)
         extra_fields.setdefault("is_superuser", False)
         return self._create_user(email, password, **extra_fields)
 
+    async def acreate_user(self, email, password=None, **extra_fields):
+        extra_fields.setdefault("is_staff", False)
+        extra_fields.setdefault("is_superuser", False)
+        return await self._acreate_user(email, password, **extra_fields)
+
     def create_superuser(self, email, password, **extra_fields):
         extra_fields.setdefault("is_staff", True)
         extra_fields.setdefault("is_superuser", True)
@@ -44,3 +61,12 @@ class User(AbstractUser):
     REQUIRED_FIELDS = []
 
     objects = CustomUserManager()
+
+    async def acheck_password(self, raw_password):
+        """Like check_password(), with the hashing done on the thread pool."""
+        is_correct, must_update = await averify_password(raw_password, self.password)
+        if is_correct and must_update:
+            self.password = await amake_password(raw_password)
+            self._password = None
+            await self.asave(update_fields=["password"])
+        return is_correct
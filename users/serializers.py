@@ -1,5 +1,7 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.settings import api_settings
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -23,3 +25,28 @@ class UserSerializer(serializers.ModelSerializer):
             user.save()
 
         return user
+
+
+def add_user_claims(token, user):
+    """Embed what StatelessJWTAuthentication needs to skip the user lookup."""
+    token["email"] = user.email
+    token["is_staff"] = user.is_staff
+    return token
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    def validate(self, attrs):
+        """Refresh the user claims too, so role changes reach new tokens."""
+        refresh = self.token_class(attrs["refresh"])
+        user = get_user_model().objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is not None:
+            attrs = {**attrs, "refresh": str(add_user_claims(refresh, user))}
+        return super().validate(attrs)
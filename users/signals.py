@@ -0,0 +1,11 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.authentication import user_state_cache_key
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def clear_cached_user_state(sender, instance, **kwargs) -> None:
+    cache.delete(user_state_cache_key(instance.pk))
@@ -1,14 +1,25 @@
+from django.contrib.auth.hashers import get_hasher, identify_hasher, make_password
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
+from library_service_project.testing import QueryBudgetMixin
+from users.authentication import TokenClaimsUser
 from users.models import User
 
 CREATE_USER_URL = reverse("users:create")
 TOKEN_URL = reverse("users:token_obtain_pair")
 ME_URL = reverse("users:manage")
+TOKEN_REFRESH_URL = reverse("users:token_refresh")
+TOKEN_VERIFY_URL = reverse("users:token_verify")
+BORROWINGS_URL = reverse("borrowings:borrowing-list-create")
+USER_LOOKUP = 'SELECT "users_user"'
 
 
 def sample_user(**params):
@@ -94,6 +105,42 @@ class PublicUserApiTests(TestCase):
         self.assertNotIn("refresh", res.data)
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_create_user_hashes_with_tuned_argon2(self) -> None:
+        res = self.client.post(CREATE_USER_URL, sample_user())
+
+        user = get_user_model().objects.get(pk=res.data["id"])
+        hasher = identify_hasher(user.password)
+        self.assertEqual(hasher.algorithm, "argon2")
+        self.assertFalse(hasher.must_update(user.password))
+
+    def test_create_token_json(self) -> None:
+        create_user(**sample_user())
+
+        res = self.client.post(TOKEN_URL, sample_user(), format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("access", res.data)
+
+    def test_create_token_upgrades_pbkdf2_hash(self) -> None:
+        data = sample_user()
+        user = create_user(email=data["email"])
+        user.password = make_password(data["password"], hasher="pbkdf2_sha256")
+        user.save()
+
+        res = self.client.post(TOKEN_URL, data)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith(f"{get_hasher().algorithm}$"))
+        self.assertTrue(user.check_password(data["password"]))
+
+    def test_create_token_inactive_user(self) -> None:
+        create_user(**sample_user(), is_active=False)
+
+        res = self.client.post(TOKEN_URL, sample_user())
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
     def test_retrieve_user_unauthorized(self) -> None:
         res = self.client.get(ME_URL)
 
@@ -136,3 +183,124 @@ class AuthenticateUserApiTests(TestCase):
         self.assertEqual(self.user.email, payload["email"])
         self.assertTrue(self.user.check_password(payload["password"]))
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = create_user(**sample_user())
+        self.client = APIClient()
+
+    def login(self) -> dict:
+        res = self.client.post(TOKEN_URL, sample_user())
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def authorize(self, access: str) -> None:
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def user_queries(self, url: str) -> list[str]:
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [
+            q["sql"] for q in ctx.captured_queries
+            if q["sql"].startswith(USER_LOOKUP)
+        ]
+
+    def test_access_token_carries_user_claims(self) -> None:
+        token = AccessToken(self.login()["access"])
+
+        self.assertEqual(token["email"], self.user.email)
+        self.assertFalse(token["is_staff"])
+
+    def test_authenticated_request_skips_user_lookup(self) -> None:
+        self.authorize(self.login()["access"])
+
+        self.assertEqual(len(self.user_queries(BORROWINGS_URL)), 1)
+        self.assertEqual(self.user_queries(BORROWINGS_URL), [])
+
+    def test_token_user_id_matches_primary_key(self) -> None:
+        token = AccessToken(self.login()["access"])
+
+        self.assertEqual(TokenClaimsUser(token).id, self.user.pk)
+
+    def test_deactivated_user_is_rejected(self) -> None:
+        self.authorize(self.login()["access"])
+        self.client.get(BORROWINGS_URL)
+
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(BORROWINGS_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_demoted_staff_is_rejected(self) -> None:
+        self.user.is_staff = True
+        self.user.save()
+        self.authorize(self.login()["access"])
+        self.client.get(BORROWINGS_URL)
+
+        self.user.is_staff = False
+        self.user.save()
+
+        res = self.client.get(BORROWINGS_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_without_claims_falls_back_to_user_lookup(self) -> None:
+        self.authorize(str(RefreshToken.for_user(self.user).access_token))
+
+        self.assertEqual(len(self.user_queries(BORROWINGS_URL)), 1)
+        self.assertEqual(len(self.user_queries(BORROWINGS_URL)), 1)
+
+    def test_refresh_updates_user_claims(self) -> None:
+        refresh = self.login()["refresh"]
+        self.user.is_staff = True
+        self.user.save()
+
+        res = self.client.post(TOKEN_REFRESH_URL, {"refresh": refresh})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(AccessToken(res.data["access"])["is_staff"])
+
+
+class UserQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = create_user(**sample_user())
+        self.client = APIClient()
+
+    def login(self) -> dict:
+        res = self.client.post(TOKEN_URL, sample_user())
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {res.data['access']}")
+        return res.data
+
+    def test_every_route_has_a_budget(self) -> None:
+        self.assertRoutesBudgeted("users.urls")
+
+    def test_register(self) -> None:
+        self.assertWithinQueryBudget(
+            "POST", CREATE_USER_URL, sample_user(email="new@user.com")
+        )
+
+    def test_token(self) -> None:
+        self.assertWithinQueryBudget("POST", TOKEN_URL, sample_user())
+
+    def test_token_refresh_and_verify(self) -> None:
+        tokens = self.login()
+
+        self.assertWithinQueryBudget(
+            "POST", TOKEN_REFRESH_URL, {"refresh": tokens["refresh"]}
+        )
+        self.assertWithinQueryBudget(
+            "POST", TOKEN_VERIFY_URL, {"token": tokens["access"]}
+        )
+
+    def test_manage(self) -> None:
+        self.login()
+
+        self.assertWithinQueryBudget("GET", ME_URL)
+        self.assertWithinQueryBudget("PATCH", ME_URL, {"email": "new@user.com"})
+        self.assertWithinQueryBudget(
+            "PUT", ME_URL, {"email": "new@user.com", "password": "newpassword"}
+        )
@@ -1,16 +1,70 @@
-from rest_framework import generics
-from users.serializers import UserSerializer
+from asgiref.sync import sync_to_async
+from django.contrib.auth import aauthenticate, get_user_model
+from django.contrib.auth.models import update_last_login
+from rest_framework import generics, status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from library_service_project.async_views import AsyncAPIView
+from users.serializers import TokenObtainPairSerializer, UserSerializer
 
 from rest_framework.permissions import IsAuthenticated
 
 
-class CreateUserView(generics.CreateAPIView):
-    serializer_class = UserSerializer
+class PasswordHashingView(AsyncAPIView):
+    """
+    Unauthenticated endpoints that hash passwords.
+
+    Under ASGI all sync views share one thread, so a burst of logins would
+    hash passwords one at a time. These views await the ORM and hash on the
+    thread pool instead (see ``users.hashers``).
+    """
+
+    authentication_classes = ()
+    permission_classes = []
+
+    def get_authenticate_header(self, request) -> str:
+        # Failed logins answer 401 like simplejwt's token views.
+        return f'{api_settings.AUTH_HEADER_TYPES[0]} realm="api"'
+
+
+class CreateUserView(PasswordHashingView):
+    async def post(self, request, *args, **kwargs) -> Response:
+        serializer = UserSerializer(data=request.data)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+
+        user = await get_user_model().objects.acreate_user(
+            **serializer.validated_data
+        )
+        return Response(UserSerializer(user).data, status=status.HTTP_201_CREATED)
+
+
+class TokenObtainPairView(PasswordHashingView):
+    async def post(self, request, *args, **kwargs) -> Response:
+        serializer = TokenObtainPairSerializer()
+        credentials = serializer.to_internal_value(request.data)
+
+        user = await aauthenticate(request._request, **credentials)
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                serializer.error_messages["no_active_account"], "no_active_account"
+            )
+
+        refresh = serializer.get_token(user)
+        if api_settings.UPDATE_LAST_LOGIN:
+            await sync_to_async(update_last_login)(None, user)
+
+        return Response(
+            {"refresh": str(refresh), "access": str(refresh.access_token)}
+        )
 
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    # Profile updates need the real user row, not the token claims.
+    authentication_classes = [JWTAuthentication]
 
     def get_object(self):
         return self.request.user